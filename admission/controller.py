@@ -0,0 +1,96 @@
+import re
+
+from starlette.routing import compile_path
+from starlette.types import Scope
+
+from admission.limits import GradientLimit
+from metrics.registry import registry
+
+limit_gauge = registry.gauge(
+    "admission_limit", "Concurrent requests admitted per route class", ("route_class",)
+)
+in_flight_gauge = registry.gauge(
+    "admission_in_flight", "Requests in flight per route class", ("route_class",)
+)
+rejections = registry.counter(
+    "admission_rejections_total",
+    "Requests shed with 503 because their route class was at its limit",
+    ("route_class",),
+)
+
+# First match wins; other API routes are metadata. Paths are relative to
+# API_ENDPOINT_PREFIX, and anything outside it is never shed.
+ROUTE_CLASSES = (
+    ("POST", "/insights", "insight"),
+    (None, "/auth/{rest:path}", "auth"),
+    (None, "/api-keys{rest:path}", "auth"),
+    ("POST", "/files", "upload"),
+    ("POST", "/files/bulk", "upload"),
+    (None, "/uploads{rest:path}", "upload"),
+    ("PUT", "/storage/{rest:path}", "upload"),
+    ("GET", "/files/{id}/content", "download"),
+    ("GET", "/storage/{rest:path}", "download"),
+)
+DEFAULT_ROUTE_CLASS = "metadata"
+
+
+class ConcurrencyLimiter:
+    """Admits requests of one route class while fewer than limit are in flight.
+
+    Acquire and release never await, so on the event loop they need no lock.
+    """
+
+    def __init__(self, route_class: str, limit: GradientLimit):
+        self.route_class = route_class
+        self.limit = limit
+        self.in_flight = 0
+        limit_gauge.labels(route_class=route_class).set(int(limit.limit))
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit.limit):
+            rejections.labels(route_class=self.route_class).inc()
+            return False
+        self.in_flight += 1
+        in_flight_gauge.labels(route_class=self.route_class).set(self.in_flight)
+        return True
+
+    def release(self, latency: float | None, dropped: bool = False) -> None:
+        """Ends a request; latency is None if it never got to respond."""
+        if dropped:
+            self.limit.drop()
+        elif latency is not None:
+            self.limit.update(latency, self.in_flight)
+        self.in_flight -= 1
+        in_flight_gauge.labels(route_class=self.route_class).set(self.in_flight)
+        limit_gauge.labels(route_class=self.route_class).set(int(self.limit.limit))
+
+
+class AdmissionController:
+    """Keeps one adaptive concurrency limit per route class."""
+
+    def __init__(self, prefix: str, initial: int, min_limit: int, max_limit: int):
+        self.prefix = prefix
+        self.routes: list[tuple[str | None, re.Pattern, str]] = [
+            (method, compile_path(f"{prefix}{path}")[0], route_class)
+            for method, path, route_class in ROUTE_CLASSES
+        ]
+        route_classes = {route_class for _, _, route_class in ROUTE_CLASSES}
+        self.limiters = {
+            route_class: ConcurrencyLimiter(
+                route_class, GradientLimit(initial, min_limit, max_limit)
+            )
+            for route_class in route_classes | {DEFAULT_ROUTE_CLASS}
+        }
+
+    def route_class(self, scope: Scope) -> str | None:
+        path = scope["path"]
+        if not path.startswith(f"{self.prefix}/"):
+            return None
+        for method, pattern, route_class in self.routes:
+            if method in (None, scope["method"]) and pattern.match(path):
+                return route_class
+        return DEFAULT_ROUTE_CLASS
+
+    def limiter(self, scope: Scope) -> ConcurrencyLimiter | None:
+        route_class = self.route_class(scope)
+        return self.limiters[route_class] if route_class else None
@@ -0,0 +1,67 @@
+import math
+
+
+class GradientLimit:
+    """Concurrency limit steered by the ratio of long-term to recent latency.
+
+    A port of the gradient algorithm from Netflix's concurrency-limits.
+    While recent latency stays within tolerance of the long-term average,
+    the limit grows by a queue allowance of sqrt(limit) per sample. As
+    latency climbs the limit shrinks in proportion, by at most half, so
+    queues drain before they build up. Failed requests cut the limit by
+    backoff, the multiplicative decrease of AIMD.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        backoff: float = 0.9,
+        short_window: int = 10,
+        long_window: int = 600,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+        self.short_latency: float | None = None
+        self.long_latency: float | None = None
+
+    def _clamp(self, limit: float) -> float:
+        return min(max(limit, self.min_limit), self.max_limit)
+
+    def update(self, latency: float, in_flight: int) -> float:
+        """Takes one latency sample from a request that completed normally."""
+        if self.long_latency is None:
+            self.short_latency = self.long_latency = latency
+        else:
+            self.short_latency += (latency - self.short_latency) * self._short_alpha
+            self.long_latency += (latency - self.long_latency) * self._long_alpha
+            # After an overload the long-term average lags; let it recover.
+            if self.long_latency > 2 * self.short_latency:
+                self.long_latency *= 0.95
+
+        # A limit the traffic never reaches says nothing about capacity.
+        if in_flight < self.limit / 2:
+            return self.limit
+
+        gradient = max(
+            0.5, min(1.0, self.tolerance * self.long_latency / self.short_latency)
+        )
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = self._clamp(
+            self.limit * (1 - self.smoothing) + target * self.smoothing
+        )
+        return self.limit
+
+    def drop(self) -> float:
+        """Backs off after a request that failed or timed out."""
+        self.limit = self._clamp(self.limit * self.backoff)
+        return self.limit
@@ -0,0 +1,65 @@
+import time
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from configs.admission import get_admission_controller
+
+
+class AdmissionMiddleware:
+    """Sheds requests with an immediate 503 once their route class is full.
+
+    Failing some requests fast keeps latency bounded for the admitted ones,
+    instead of queueing everything until the platform's timeout fires.
+    Latency runs from the last request body chunk to the response start,
+    so slow clients streaming an upload or a download do not read as a slow
+    server. The controller comes from get_admission_controller, overridable
+    like a dependency; None disables shedding.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        overrides = scope["app"].dependency_overrides
+        controller = overrides.get(get_admission_controller, get_admission_controller)()
+        limiter = controller.limiter(scope) if controller else None
+        if limiter is None:
+            return await self.app(scope, receive, send)
+
+        if not limiter.try_acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            return await response(scope, receive, send)
+
+        started_at = time.perf_counter()
+        latency = None
+        status = None
+
+        async def receive_wrapper() -> Message:
+            nonlocal started_at
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body"):
+                started_at = time.perf_counter()
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency, status
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - started_at
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            # Cancelled requests, such as client disconnects, leave status unset.
+            limiter.release(latency, dropped=status is not None and status >= 500)
@@ -6,9 +6,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import ExpiredSignatureError, JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.principals import Principal, TokenClaims, get_principal_cache
+from auth.revocation import get_revocation_list
 from configs.database import get_session
 from configs.settings import settings
-from models.user import User
+from security.tokens import api_key_prefix, token_digest
+from services.api_key import ApiKeyService
 from services.user import UserService
 
 
@@ -20,7 +23,10 @@ def create_access_token(
             "sub": str(id),
             "is_admin": is_admin,
             "exp": expires_datetime,
-            "iat": datetime.now(tz=timezone.utc),
+            # Fractional, so revoking a user's tokens spares those issued
+            # later within the same second.
+            "iat": datetime.now(tz=timezone.utc).timestamp(),
+            "jti": uuid.uuid4().hex,
         },
         key=settings.JWT_SECRET_KEY,
         algorithm=settings.JWT_ALGORITHM,
@@ -36,12 +42,15 @@ def decode_access_token(token: str) -> dict:
     )
 
 
-async def get_current_user(
-    token: str = Depends(
-        OAuth2PasswordBearer(tokenUrl=f"{settings.API_ENDPOINT_PREFIX}/auth/login")
-    ),
-    db: AsyncSession = Depends(get_session),
-) -> User:
+oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_ENDPOINT_PREFIX}/auth/login"
+)
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_ENDPOINT_PREFIX}/auth/login", auto_error=False
+)
+
+
+def _decode_claims(token: str) -> TokenClaims:
     try:
         payload = decode_access_token(token)
         user_id: str = payload.get("sub")
@@ -50,21 +59,93 @@ async def get_current_user(
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
-        user_service = UserService(db)
-        user = await user_service.get_by_id(uuid.UUID(user_id))
-        return user
+        return TokenClaims(
+            id=uuid.UUID(user_id),
+            is_admin=bool(payload.get("is_admin")),
+            jti=payload.get("jti"),
+            issued_at=payload.get("iat"),
+            expires_at=payload.get("exp"),
+        )
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication Token has expired",
         )
-    except JWTError:
+    except (JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
 
-async def only_admin_user(user: User = Depends(get_current_user)) -> bool:
+async def _unrevoked_claims(token: str, db: AsyncSession) -> TokenClaims:
+    claims = _decode_claims(token)
+    revocations = get_revocation_list()
+    if await revocations.is_revoked(db, claims.id, claims.jti, claims.issued_at):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked"
+        )
+    return claims
+
+
+async def get_optional_token_claims(
+    token: str | None = Depends(optional_oauth2_scheme),
+) -> TokenClaims | None:
+    """The bearer token's claims, or None if there is no valid JWT."""
+    if token is None or api_key_prefix(token):
+        return None
+    try:
+        return _decode_claims(token)
+    except HTTPException:
+        return None
+
+
+async def _api_key_principal(key: str, db: AsyncSession) -> Principal:
+    principals = get_principal_cache()
+    cache_key = ApiKeyService.principal_cache_key(token_digest(key))
+    principal = principals.get(cache_key)
+    if principal is None:
+        user = await ApiKeyService(db).authenticate(key)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
+            )
+        principal = Principal.from_user(user)
+        principals.set(principal, key=cache_key)
+    return principal
+
+
+async def get_token_claims(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_session)
+) -> TokenClaims:
+    """Authenticates from the token alone, for endpoints that need no user row.
+
+    API keys carry no claims, so they resolve through the principal cache.
+    """
+    if api_key_prefix(token):
+        principal = await _api_key_principal(token, db)
+        return TokenClaims(id=principal.id, is_admin=principal.is_admin)
+    return await _unrevoked_claims(token, db)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_session)
+) -> Principal:
+    """Authenticates a bearer JWT or API key as a cached principal."""
+    if api_key_prefix(token):
+        return await _api_key_principal(token, db)
+
+    claims = await _unrevoked_claims(token, db)
+    principals = get_principal_cache()
+    principal = principals.get(claims.id)
+    if principal is None:
+        # Misses read the primary so a lagging replica never gets cached.
+        user = await UserService(db).get_by_id(claims.id)
+        principal = Principal.from_user(user)
+        principals.set(principal)
+    return principal
+
+
+async def only_admin_user(user: Principal = Depends(get_current_user)) -> bool:
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
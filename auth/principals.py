@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Hashable
+
+from configs.settings import settings
+from metrics.registry import registry
+from models.user import User
+
+cache_hits = registry.counter(
+    "principal_cache_hits_total", "Authenticated users served from the cache"
+)
+cache_misses = registry.counter(
+    "principal_cache_misses_total", "Authenticated users loaded from the database"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class TokenClaims:
+    """What a verified access token says, without touching the database."""
+
+    id: uuid.UUID
+    is_admin: bool
+    jti: str | None = None
+    # POSIX timestamps of the iat and exp claims.
+    issued_at: float | None = None
+    expires_at: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Snapshot of the authenticated user, safe to share across sessions."""
+
+    id: uuid.UUID
+    email: str
+    username: str
+    is_admin: bool
+    created_at: datetime
+    updated_at: datetime
+    last_login_at: datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            last_login_at=user.last_login_at,
+        )
+
+
+class PrincipalCache:
+    """LRU cache of principals, each kept for ttl seconds.
+
+    Entries are keyed by user id, or by another credential such as an API
+    key digest. Services invalidate a user's entries when they change the
+    user; the TTL bounds how long other processes keep serving a stale one.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[Principal, float]] = OrderedDict()
+        self._keys_by_user: dict[uuid.UUID, set[Hashable]] = {}
+        self._lock = threading.Lock()
+        registry.gauge(
+            "principal_cache_size",
+            "Authenticated users currently cached",
+            callback=lambda: len(self._entries),
+        )
+
+    def get(self, key: Hashable) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                principal, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    cache_hits.inc()
+                    return principal
+                self._remove(key)
+        cache_misses.inc()
+        return None
+
+    def set(self, principal: Principal, key: Hashable | None = None) -> None:
+        key = principal.id if key is None else key
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (principal, expires_at)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drops every entry for the user, whatever it is keyed by."""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user[entry[0].id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[entry[0].id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache
+def get_principal_cache() -> PrincipalCache:
+    return PrincipalCache(
+        max_size=settings.PRINCIPAL_CACHE_SIZE,
+        ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
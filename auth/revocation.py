@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from metrics.registry import registry
+from repositories.revoked_token import RevokedTokenRepository
+
+lookups = registry.counter(
+    "token_revocation_lookups_total",
+    "Tokens the Bloom filter could not clear, checked against the database",
+    ("result",),
+)
+filter_entries = registry.gauge(
+    "token_revocation_filter_entries", "Revocations loaded into the Bloom filter"
+)
+
+
+def jti_key(jti: str) -> str:
+    return f"jti:{jti}"
+
+
+def user_key(user_id: uuid.UUID) -> str:
+    return f"user:{user_id}"
+
+
+class BloomFilter:
+    """Set membership with no false negatives and about error_rate false positives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one digest.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """Per-process Bloom filter over the revoked_tokens table.
+
+    Almost every token is not revoked, and the filter clears those with a
+    few hash probes; only its positives are confirmed in the database.
+    Every refresh_interval seconds the filter loads revocations recorded
+    since the last sync, re-reading an overlap window so rows committed out
+    of order are not missed. Every rebuild_interval seconds it is rebuilt
+    from scratch, dropping expired revocations and growing with the table.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        refresh_interval: float,
+        rebuild_interval: float,
+        overlap: timedelta = timedelta(minutes=1),
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.overlap = overlap
+        self._filter = BloomFilter(capacity, error_rate)
+        self._count = 0
+        self._synced_until: datetime | None = None
+        self._refreshed_at = -math.inf
+        self._rebuilt_at = -math.inf
+        self._added_during_rebuild: list[str] | None = None
+        self._lock = asyncio.Lock()
+        filter_entries.set(0)
+
+    def add(self, key: str) -> None:
+        """Adds a revocation made by this process without waiting for a sync."""
+        self._filter.add(key)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.append(key)
+        self._count += 1
+        filter_entries.set(self._count)
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    async def sync(self, db: AsyncSession) -> None:
+        if not self._stale():
+            return
+        async with self._lock:
+            if not self._stale():
+                return
+            started_at = time.monotonic()
+            repo = RevokedTokenRepository(db)
+            if started_at - self._rebuilt_at >= self.rebuild_interval:
+                # The new filter is built from a read that may predate revocations
+                # this process adds meanwhile, so those are carried over.
+                self._added_during_rebuild = []
+                try:
+                    rows = await repo.get_keys()
+                finally:
+                    added, self._added_during_rebuild = self._added_during_rebuild, None
+                self._filter = BloomFilter(
+                    max(self.capacity, 2 * len(rows)), self.error_rate
+                )
+                self._count = 0
+                self._rebuilt_at = started_at
+                for key in added:
+                    self.add(key)
+            else:
+                since = self._synced_until and self._synced_until - self.overlap
+                rows = await repo.get_keys(revoked_since=since)
+            for key, revoked_at in rows:
+                self.add(key)
+                self._synced_until = revoked_at
+            self._refreshed_at = started_at
+
+    async def is_revoked(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        jti: str | None,
+        issued_at: float | None,
+    ) -> bool:
+        """Whether the token was revoked on its own or with all of its user's."""
+        await self.sync(db)
+        keys = [user_key(user_id)]
+        if jti is not None:
+            keys.append(jti_key(jti))
+        candidates = [key for key in keys if key in self._filter]
+        if not candidates:
+            return False
+
+        revoked = False
+        for entry in await RevokedTokenRepository(db).get_many(candidates):
+            if entry.key != user_key(user_id):
+                revoked = True
+                continue
+            revoked_at = entry.revoked_at
+            if revoked_at.tzinfo is None:
+                revoked_at = revoked_at.replace(tzinfo=timezone.utc)
+            if issued_at is None or issued_at < revoked_at.timestamp():
+                revoked = True
+        lookups.labels(result="revoked" if revoked else "not_revoked").inc()
+        return revoked
+
+
+@lru_cache
+def get_revocation_list() -> RevocationList:
+    return RevocationList(
+        capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+        error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+        refresh_interval=settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+        rebuild_interval=settings.TOKEN_REVOCATION_REBUILD_SECONDS,
+    )
@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+from admission.controller import AdmissionController
+from configs.settings import settings
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController | None:
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        return None
+    return AdmissionController(
+        prefix=settings.API_ENDPOINT_PREFIX,
+        initial=settings.ADMISSION_INITIAL_LIMIT,
+        min_limit=settings.ADMISSION_MIN_LIMIT,
+        max_limit=settings.ADMISSION_MAX_LIMIT,
+    )
@@ -1,11 +1,192 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import itertools
+import threading
+import time
+import uuid
+
+from sqlalchemy import Select, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from configs.settings import settings
+from metrics.registry import registry
+
+pool_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+pool_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DATABASE_POOL_TIMEOUT_SECONDS",
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def engine_options(database_url: str) -> dict:
+    """Keyword arguments for create_async_engine, taken from Settings.
+
+    SQLite keeps SQLAlchemy's defaults; it has no server to run out of
+    connections on.
+    """
+    backend = make_url(database_url).get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+    if backend != "postgresql":
+        return options
+
+    connect_args = {}
+    if settings.DATABASE_PGBOUNCER_MODE:
+        # In transaction pooling consecutive transactions may run on different
+        # server connections, so prepared statements cannot be cached or
+        # reuse names. PgBouncer also rejects unknown startup parameters:
+        # set statement_timeout on the database role instead.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid.uuid4()}__"
+        )
+    elif settings.DATABASE_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT_MS)
+        }
+    options["connect_args"] = connect_args
+    return options
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that recently failed.
+
+    A replica whose connection fails is skipped for retry_after seconds;
+    with none available, reads fall back to the primary.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._down_until: dict[AsyncEngine, float] = {}
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+        for replica in engines:
+            event.listen(replica.sync_engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica: AsyncEngine):
+        def handle_error(context):
+            # Connection failures only; a failing query says nothing about
+            # the replica's health.
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(replica)
+
+        return handle_error
 
-engine = create_async_engine(str(settings.DATABASE_URL), echo=False)
+    def mark_down(self, replica: AsyncEngine) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.retry_after
+
+    def healthy(self) -> list[AsyncEngine]:
+        now = time.monotonic()
+        return [e for e in self.engines if self._down_until.get(e, 0) <= now]
+
+    def choose(self) -> AsyncEngine | None:
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                replica = next(self._cycle)
+                if self._down_until.get(replica, 0) <= now:
+                    return replica
+        return None
+
+
+class RoutingSession(Session):
+    """Sends SELECTs marked read_replica to a replica from info["replicas"].
+
+    Marked reads go to the primary once the session has written anything,
+    so a request always reads its own writes. Unmarked statements always
+    use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replicas: ReplicaSet | None = self.info.get("replicas")
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info["wrote"] = True
+        elif (
+            replicas
+            and not self.info.get("wrote")
+            and clause is not None
+            and clause.get_execution_options().get("read_replica")
+        ):
+            replica = replicas.choose()
+            if replica is not None:
+                return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+engine = create_async_engine(
+    str(settings.DATABASE_URL), echo=False, **engine_options(str(settings.DATABASE_URL))
+)
+replicas = ReplicaSet(
+    [
+        create_async_engine(url, echo=False, **engine_options(url))
+        for url in settings.DATABASE_REPLICA_URLS
+    ],
+    retry_after=settings.DATABASE_REPLICA_RETRY_SECONDS,
+)
 AsyncSessionLocal = sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    info={"replicas": replicas},
+)
+
+
+def _pool_stat(name: str) -> float:
+    stat = getattr(engine.pool, name, None)
+    return max(stat(), 0) if stat else 0
+
+
+registry.gauge(
+    "db_pool_size",
+    "Connections the pool keeps open",
+    callback=lambda: _pool_stat("size"),
+)
+registry.gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    callback=lambda: _pool_stat("checkedout"),
+)
+registry.gauge(
+    "db_replicas_healthy",
+    "Read replicas currently accepting queries",
+    callback=lambda: len(replicas.healthy()),
+)
+registry.gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond DATABASE_POOL_SIZE",
+    callback=lambda: _pool_stat("overflow"),
 )
 
 
@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+from configs.settings import RateLimitBackendType, settings
+from ratelimit.base import RateLimit, RateLimitStore
+from ratelimit.limiter import RateLimiter
+
+
+def _rate(value: str | None) -> RateLimit | None:
+    return RateLimit.parse(value) if value else None
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    backend = RateLimitBackendType(settings.RATE_LIMIT_BACKEND)
+
+    if backend == RateLimitBackendType.DATABASE:
+        from configs.database import AsyncSessionLocal
+        from ratelimit.database import DatabaseRateLimitStore
+
+        return DatabaseRateLimitStore(AsyncSessionLocal)
+
+    from ratelimit.memory import InMemoryRateLimitStore
+
+    return InMemoryRateLimitStore(max_size=settings.RATE_LIMIT_MEMORY_MAX_KEYS)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter | None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+
+    # Routes are configured relative to API_ENDPOINT_PREFIX.
+    route_rates = {}
+    for route, rate in settings.RATE_LIMIT_ROUTES.items():
+        method, _, path = route.strip().partition(" ")
+        route_rates[f"{method} {settings.API_ENDPOINT_PREFIX}{path.strip()}"] = (
+            RateLimit.parse(rate)
+        )
+    return RateLimiter(
+        get_rate_limit_store(),
+        ip_rate=_rate(settings.RATE_LIMIT_PER_IP),
+        user_rate=_rate(settings.RATE_LIMIT_PER_USER),
+        route_rates=route_rates,
+        exempt_paths=settings.RATE_LIMIT_EXEMPT_PATHS,
+    )
@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+from configs.settings import settings
+from security.hasher import PasswordHasher
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    return PasswordHasher(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_concurrency=settings.PASSWORD_HASH_CONCURRENCY,
+        queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+    )
@@ -8,20 +8,93 @@ class Environment(str, Enum):
     DEV = "development"
 
 
+class StorageBackendType(str, Enum):
+    GCS = "gcs"
+    LOCAL = "local"
+    MEMORY = "memory"
+
+
+class RateLimitBackendType(str, Enum):
+    MEMORY = "memory"
+    DATABASE = "database"
+
+
 class Settings(BaseSettings):
     APP_VERSION: str = "v1"
     API_ENDPOINT_PREFIX: str = "/api/v1"
     APP_ENV: str = Environment.DEV
     APP_NAME: str = "FileDrive API"
     JWT_ALGORITHM: str = "HS256"
-    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 2
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    TOKEN_DIGEST_KEY: str | None = None
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = 100_000
+    TOKEN_REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5
+    TOKEN_REVOCATION_REBUILD_SECONDS: float = 600
     JWT_SECRET_KEY: str
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_CONCURRENCY: int = 8
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 2
     DATABASE_URL: str
     DATABASE_URL_TEST: str = "sqlite+aiosqlite:///./test.db"
-    GCS_BUCKET_NAME: str
+    # Per process: keep (pool size + overflow) x workers x replicas below the
+    # server's max_connections.
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 5
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 10
+    DATABASE_POOL_RECYCLE_SECONDS: int = 30 * 60
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_TIMEOUT_MS: int | None = 30_000
+    # For PostgreSQL behind PgBouncer in transaction pooling mode.
+    DATABASE_PGBOUNCER_MODE: bool = False
+    # Read replicas for queries marked read_replica; empty uses the primary.
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_RETRY_SECONDS: int = 30
+    GCS_BUCKET_NAME: str | None = None
     GOOGLE_CLOUD_PROJECT: str
     GEMINI_MODEL_NAME: str = "gemini-pro-vision"
     GOOGLE_CLOUD_REGION: str
+    STORAGE_BACKEND: str = StorageBackendType.GCS
+    LOCAL_STORAGE_PATH: str = "./uploads"
+    STORAGE_SIGNING_KEY: str | None = None
+    PUBLIC_BASE_URL: str = "http://localhost:8000"
+    SIGNED_URL_EXPIRATION_SECONDS: int = 60 * 60 * 2
+    SIGNED_URL_CACHE_SIZE: int = 10_000
+    SIGNED_URL_REUSE_FRACTION: float = 0.5
+    GCS_SIGNING_CREDENTIALS_FILE: str | None = None
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    STORAGE_EXECUTOR_WORKERS: int = 32
+    BULK_UPLOAD_MAX_FILES: int = 500
+    BULK_UPLOAD_CONCURRENCY: int = 16
+    BULK_DELETE_MAX_FILES: int = 1000
+    DIRECT_UPLOAD_URL_EXPIRATION_SECONDS: int = 60 * 60
+    DIRECT_UPLOAD_TTL_HOURS: int = 24
+    FILE_TRASH_RETENTION_DAYS: int = 30
+    PURGE_ENABLED: bool = True
+    PURGE_INTERVAL_SECONDS: int = 60
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_MAX_ATTEMPTS: int = 3
+    APPROXIMATE_COUNT_THRESHOLD: int | None = 1_000_000
+    RATE_LIMIT_ENABLED: bool = True
+    # memory limits each worker on its own; database shares limits between replicas.
+    RATE_LIMIT_BACKEND: str = RateLimitBackendType.MEMORY
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100_000
+    RATE_LIMIT_PER_IP: str | None = "1200/minute"
+    RATE_LIMIT_PER_USER: str | None = "600/minute"
+    RATE_LIMIT_ROUTES: dict[str, str] = {
+        "POST /auth/login": "10/minute",
+        "POST /auth/register": "5/minute",
+        "POST /insights": "10/minute",
+    }
+    RATE_LIMIT_EXEMPT_PATHS: list[str] = ["/health", "/readiness", "/metrics"]
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 20
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_LIMIT: int = 500
 
     @property
     def debug(self) -> bool:
@@ -0,0 +1,52 @@
+from functools import lru_cache
+
+from configs.settings import StorageBackendType, settings
+from storage.base import StorageBackend
+from storage.executor import StorageExecutor
+from storage.url_cache import SignedURLCache
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    backend = StorageBackendType(settings.STORAGE_BACKEND)
+    signing_key = settings.STORAGE_SIGNING_KEY or settings.JWT_SECRET_KEY
+    base_url = f"{settings.PUBLIC_BASE_URL}{settings.API_ENDPOINT_PREFIX}/storage"
+
+    if backend == StorageBackendType.LOCAL:
+        from storage.local import LocalStorageBackend
+
+        return LocalStorageBackend(
+            root=settings.LOCAL_STORAGE_PATH,
+            signing_key=signing_key,
+            base_url=base_url,
+        )
+
+    if backend == StorageBackendType.MEMORY:
+        from storage.memory import InMemoryStorageBackend
+
+        return InMemoryStorageBackend(signing_key=signing_key, base_url=base_url)
+
+    if not settings.GCS_BUCKET_NAME:
+        raise ValueError("GCS_BUCKET_NAME must be set when STORAGE_BACKEND is gcs")
+
+    from storage.gcs import GCSStorageBackend
+
+    return GCSStorageBackend(
+        bucket_name=settings.GCS_BUCKET_NAME,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        pool_size=settings.STORAGE_EXECUTOR_WORKERS,
+        signing_credentials_file=settings.GCS_SIGNING_CREDENTIALS_FILE,
+    )
+
+
+@lru_cache
+def get_storage_executor() -> StorageExecutor:
+    return StorageExecutor(max_workers=settings.STORAGE_EXECUTOR_WORKERS)
+
+
+@lru_cache
+def get_signed_url_cache() -> SignedURLCache:
+    return SignedURLCache(
+        max_size=settings.SIGNED_URL_CACHE_SIZE,
+        reuse_fraction=settings.SIGNED_URL_REUSE_FRACTION,
+    )
@@ -1,15 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from admission.middleware import AdmissionMiddleware
+from configs.security import get_password_hasher
 from configs.settings import settings
-from routers import auth, files, health_checks, insights, users
+from configs.storage import get_storage_executor
+from ratelimit.middleware import RateLimitMiddleware
+from routers import (api_keys, auth, files, health_checks, insights, metrics,
+                     storage, uploads, users)
+from services.purge import run_purger
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop = asyncio.Event()
+    purger = asyncio.create_task(run_purger(stop)) if settings.PURGE_ENABLED else None
+    yield
+    stop.set()
+    if purger:
+        await purger
+    get_storage_executor().shutdown()
+    get_password_hasher().shutdown()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.debug,
     docs_url="/",
+    lifespan=lifespan,
 )
+# Added last, rate limiting runs first and its 429s never count as latency.
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.include_router(auth.router)
+app.include_router(api_keys.router)
 app.include_router(users.router)
 app.include_router(files.router)
+app.include_router(uploads.router)
 app.include_router(insights.router)
+app.include_router(storage.router)
 app.include_router(health_checks.router)
+app.include_router(metrics.router)
@@ -8,8 +8,14 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from configs.database import Base
 from configs.settings import settings
+from models.api_key import *
+from models.auth_session import *
+from models.blob import *
 from models.file import *
 from models.insight import *
+from models.rate_limit import *
+from models.revoked_token import *
+from models.upload_session import *
 from models.user import *
 
 # this is the Alembic Config object, which provides
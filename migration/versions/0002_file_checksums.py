@@ -0,0 +1,28 @@
+"""file checksums
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 22:14:02.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.add_column('files', sa.Column('crc32c', sa.String(length=8), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('files', 'crc32c')
+    op.drop_column('files', 'sha256')
@@ -0,0 +1,142 @@
+"""content blobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 22:14:17.903351
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+files = sa.table(
+    'files',
+    sa.column('id', sa.UUID()),
+    sa.column('user_id', sa.UUID()),
+    sa.column('name', sa.String()),
+    sa.column('size', sa.BigInteger()),
+    sa.column('sha256', sa.String()),
+    sa.column('crc32c', sa.String()),
+    sa.column('blob_id', sa.UUID()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+)
+blobs = sa.table(
+    'blobs',
+    sa.column('id', sa.UUID()),
+    sa.column('sha256', sa.String()),
+    sa.column('crc32c', sa.String()),
+    sa.column('size', sa.BigInteger()),
+    sa.column('storage_key', sa.String()),
+    sa.column('ref_count', sa.Integer()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+)
+
+
+def _storage_key(user_id: uuid.UUID, name: str) -> str:
+    # Before upload sessions, files.name was the object name itself; since
+    # then it is the uploaded file name and the object is "{user_id}-{name}".
+    prefix = f"{user_id}-"
+    return name if name.startswith(prefix) else prefix + name
+
+
+def _backfill_blobs() -> None:
+    """Creates one blob per existing object and points its files at it.
+
+    Uploading the same name twice overwrote the object, so files sharing a
+    storage key share a blob, which takes the size and checksums of the
+    newest upload. sha256 is unique across blobs; a digest already claimed
+    by another blob is left NULL, which only opts that blob out of dedup.
+    """
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(
+            files.c.id,
+            files.c.user_id,
+            files.c.name,
+            files.c.size,
+            files.c.sha256,
+            files.c.crc32c,
+            files.c.created_at,
+        ).order_by(files.c.created_at)
+    )
+    new_blobs: dict[str, dict] = {}
+    links = []
+    for row in rows:
+        key = _storage_key(row.user_id, row.name)
+        blob = new_blobs.setdefault(
+            key,
+            {
+                'id': uuid.uuid4(),
+                'storage_key': key,
+                'ref_count': 0,
+                'created_at': row.created_at,
+            },
+        )
+        blob.update(
+            size=row.size,
+            sha256=row.sha256,
+            crc32c=row.crc32c,
+            updated_at=row.created_at,
+        )
+        blob['ref_count'] += 1
+        links.append({'file_id': row.id, 'new_blob_id': blob['id']})
+    if not links:
+        return
+
+    digests = set()
+    for blob in new_blobs.values():
+        if blob['sha256'] in digests:
+            blob['sha256'] = None
+        elif blob['sha256'] is not None:
+            digests.add(blob['sha256'])
+    connection.execute(blobs.insert(), list(new_blobs.values()))
+    connection.execute(
+        files.update()
+        .where(files.c.id == sa.bindparam('file_id'))
+        .values(blob_id=sa.bindparam('new_blob_id')),
+        links,
+    )
+
+
+def upgrade() -> None:
+    op.create_table('blobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('crc32c', sa.String(length=8), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256'),
+    sa.UniqueConstraint('storage_key')
+    )
+    op.add_column('files', sa.Column('blob_id', sa.UUID(), nullable=True))
+    _backfill_blobs()
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.alter_column('blob_id', existing_type=sa.UUID(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_files_blob_id'), ['blob_id'], unique=False)
+        batch_op.create_foreign_key('files_blob_id_fkey', 'blobs', ['blob_id'], ['id'])
+        batch_op.drop_column('crc32c')
+        batch_op.drop_column('sha256')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('crc32c', sa.String(length=8), nullable=True))
+        batch_op.drop_constraint('files_blob_id_fkey', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_files_blob_id'))
+        batch_op.drop_column('blob_id')
+    op.drop_table('blobs')
@@ -0,0 +1,28 @@
+"""file trash
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 22:14:25.266790
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_files_deleted_at'), 'files', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_files_deleted_at'), table_name='files')
+    op.drop_column('files', 'deleted_at')
@@ -0,0 +1,29 @@
+"""file status
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 22:14:31.712958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every existing file was uploaded through the API and is available.
+    op.add_column('files', sa.Column('status', sa.String(length=16), nullable=False, server_default='available'))
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.alter_column('status', existing_type=sa.String(length=16), server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column('files', 'status')
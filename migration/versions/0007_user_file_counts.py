@@ -0,0 +1,33 @@
+"""user file counts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 22:14:38.150624
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('file_count', sa.Integer(), server_default='0', nullable=False))
+    # From here on FileRepository keeps the counter in step with the files
+    # table; seed it with the files each user already has.
+    op.execute(
+        "UPDATE users SET file_count = ("
+        "SELECT count(*) FROM files WHERE files.user_id = users.id "
+        "AND files.deleted_at IS NULL AND files.status = 'available')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'file_count')
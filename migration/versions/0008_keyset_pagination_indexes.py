@@ -0,0 +1,31 @@
+"""keyset pagination indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 20:37:08.650565
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_files_created_at_id', 'files', ['created_at', 'id'], unique=False)
+    op.create_index('ix_files_user_id_created_at_id', 'files', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_insights_file_id_created_at_id', 'insights', ['file_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_insights_file_id_created_at_id', table_name='insights')
+    op.drop_index('ix_files_user_id_created_at_id', table_name='files')
+    op.drop_index('ix_files_created_at_id', table_name='files')
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from configs.database import Base
+from models.mixins import TimeStampMixin, uuid7
+
+
+class ApiKey(Base, TimeStampMixin):
+    """A long-lived credential for a machine client acting as its user."""
+
+    __tablename__ = "api_keys"
+    # The unique index is the only constraint on prefix; unique=True on the
+    # column as well would add a second one on some dialects.
+    __table_args__ = (Index("ix_api_keys_prefix", "prefix", unique=True),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    name = Column(String, nullable=False)
+    # Shown in clear inside the key, so a lookup never scans digests.
+    prefix = Column(String(12), nullable=False)
+    key_digest = Column(String(64), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from configs.database import Base
+from models.mixins import TimeStampMixin, uuid7
+
+
+class AuthSession(Base, TimeStampMixin):
+    """A login, kept alive by rotating refresh tokens until it expires."""
+
+    __tablename__ = "auth_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    # HMAC digests of the current refresh token and the one it replaced;
+    # presenting the replaced one again means the token was stolen.
+    token_digest = Column(String(64), nullable=False)
+    previous_digest = Column(String(64), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,28 @@
+import uuid
+
+from sqlalchemy import BigInteger, Column, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from configs.database import Base
+from models.mixins import TimeStampMixin, uuid7
+
+
+class Blob(Base, TimeStampMixin):
+    """Stored content shared by every file with the same SHA-256.
+
+    ref_count is the number of files referencing the blob; the object is
+    removed from storage once it drops to zero.
+    """
+
+    __tablename__ = "blobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    sha256 = Column(String(64), unique=True, nullable=True)
+    crc32c = Column(String(8), nullable=True)
+    size = Column(BigInteger, nullable=False)
+    storage_key = Column(String, unique=True, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def new_storage_key() -> str:
+        return f"blobs/{uuid.uuid4()}"
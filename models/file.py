@@ -1,16 +1,29 @@
-import uuid
+from enum import Enum
 
-from sqlalchemy import BigInteger, Column, ForeignKey, String
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from configs.database import Base
-from models.mixins import TimeStampMixin
+from models.blob import Blob
+from models.mixins import TimeStampMixin, uuid7
+
+
+class FileStatus(str, Enum):
+    # Created for a direct upload whose content has not been verified yet.
+    PENDING = "pending"
+    AVAILABLE = "available"
 
 
 class File(Base, TimeStampMixin):
     __tablename__ = "files"
+    # Keyset pagination orders listings on (created_at, id).
+    __table_args__ = (
+        Index("ix_files_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_files_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String, index=True, nullable=False)
     extension = Column(String, nullable=False)
     mime_type = Column(String, nullable=False)
@@ -20,3 +33,11 @@ class File(Base, TimeStampMixin):
         ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
     )
+    blob_id = Column(
+        UUID(as_uuid=True), ForeignKey("blobs.id"), nullable=False, index=True
+    )
+    status = Column(String(16), nullable=False, default=FileStatus.AVAILABLE.value)
+    # Set when the file is moved to the trash; purged after the retention window.
+    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    blob = relationship(Blob, lazy="joined")
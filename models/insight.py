@@ -1,16 +1,18 @@
-import uuid
-
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import deferred
 
 from configs.database import Base
-from models.mixins import TimeStampMixin
+from models.mixins import TimeStampMixin, uuid7
 
 
 class Insight(Base, TimeStampMixin):
     __tablename__ = "insights"
+    __table_args__ = (
+        Index("ix_insights_file_id_created_at_id", "file_id", "created_at", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     prompt = Column(String, nullable=False)
     user_id = Column(
         UUID(as_uuid=True),
@@ -22,4 +24,5 @@ class Insight(Base, TimeStampMixin):
         ForeignKey("files.id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
     )
-    data = Column(String, nullable=False)
+    # Generated text can be large; loaded only when a query asks for it.
+    data = deferred(Column(String, nullable=False))
@@ -1,8 +1,49 @@
-from sqlalchemy import Column, DateTime, func
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime
+
+_uuid7_lock = threading.Lock()
+_uuid7_last = 0
+
+
+def utcnow() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def uuid7() -> uuid.UUID:
+    """Returns a time-ordered UUID version 7 (RFC 9562).
+
+    The millisecond timestamp leads, so new primary keys land at the right
+    edge of their B-tree index instead of a random page. The 12-bit rand_a
+    field counts within a millisecond, keeping ids from this process
+    strictly increasing; rand_b stays random.
+    """
+    global _uuid7_last
+    with _uuid7_lock:
+        stamp = max((time.time_ns() // 1_000_000) << 12, _uuid7_last + 1)
+        _uuid7_last = stamp
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(
+        int=(stamp >> 12) << 80
+        | 0x7 << 76
+        | (stamp & 0xFFF) << 64
+        | 0b10 << 62
+        | rand_b
+    )
 
 
 class TimeStampMixin:
-    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+    # Server-generated values come back from the INSERT/UPDATE itself
+    # (RETURNING) instead of a refresh after commit.
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Set by the application rather than the database so timestamps keep
+    # microseconds on every backend; listings page on (created_at, id).
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
     updated_at = Column(
-        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow
     )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Double, String
+
+from configs.database import Base
+
+
+class RateLimitBucket(Base):
+    """GCRA state of one rate limit key, for limits shared between replicas.
+
+    tat is the POSIX time at which the bucket is full again; rows whose tat
+    has passed carry no state and can be deleted.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tat = Column(Double, nullable=False, index=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, String
+
+from configs.database import Base
+from models.mixins import utcnow
+
+
+class RevokedToken(Base):
+    """An access token, or all of a user's tokens, revoked before expiry.
+
+    key is "jti:<jti>" for one token or "user:<id>" for every token the user
+    was issued before revoked_at. Rows are useless once expires_at passes,
+    since the tokens they cover have expired too.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    key = Column(String, primary_key=True)
+    revoked_at = Column(
+        DateTime(timezone=True), nullable=False, index=True, default=utcnow
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,59 @@
+from enum import Enum
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from configs.database import Base
+from models.mixins import TimeStampMixin, uuid7
+
+
+class UploadSessionStatus(str, Enum):
+    ACTIVE = "active"
+    COMPLETED = "completed"
+
+
+class UploadSession(Base, TimeStampMixin):
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    file_name = Column(String, nullable=False)
+    mime_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    chunk_size = Column(BigInteger, nullable=False)
+    status = Column(String, nullable=False, default=UploadSessionStatus.ACTIVE.value)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    file_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("files.id", ondelete="SET NULL", onupdate="CASCADE"),
+        nullable=True,
+    )
+
+    @property
+    def total_chunks(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def chunk_object_name(self, index: int) -> str:
+        return f"upload-sessions/{self.id}/{index:06d}"
+
+
+class UploadChunk(Base, TimeStampMixin):
+    __tablename__ = "upload_chunks"
+
+    session_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("upload_sessions.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    index = Column(Integer, primary_key=True)
+    offset = Column(BigInteger, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    crc32c = Column(String(8), nullable=False)
@@ -1,23 +1,24 @@
-import uuid
-
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from configs.database import Base
-from models.mixins import TimeStampMixin
+from models.mixins import TimeStampMixin, uuid7
 
 
 class User(Base, TimeStampMixin):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
         index=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
     username = Column(String, index=True)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String, nullable=False)
     last_login_at = Column(DateTime(timezone=True), nullable=True)
     is_admin = Column(Boolean, default=False)
+    # Available files owned by the user, maintained by FileRepository.
+    file_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 24 * 60 * 60}
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """limit requests per period seconds, in bursts of up to limit."""
+
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parses "<limit>/<unit>", e.g. "10/minute"; unit is second to day."""
+        limit, _, unit = value.partition("/")
+        try:
+            rate = cls(int(limit), PERIODS[unit.strip().removesuffix("s")])
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit: {value!r}") from None
+        if rate.limit < 1:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        return rate
+
+    @property
+    def interval(self) -> float:
+        """Seconds it takes to earn back one request."""
+        return self.period / self.limit
+
+    @property
+    def window(self) -> float:
+        # A hair over period, so float rounding never costs a full burst a request.
+        return self.period + 1e-6
+
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    allowed: bool
+    retry_after: float = 0.0
+
+
+def gcra(tat: float | None, now: float, rate: RateLimit) -> tuple[float, Decision]:
+    """Generic cell rate algorithm: a token bucket kept as one timestamp.
+
+    tat, the theoretical arrival time, is when the bucket would be full
+    again; None means it already is. A request is allowed while spending
+    one more interval keeps tat within rate.window of now. Returns the tat
+    to store, which is unchanged when the request is denied.
+    """
+    start = now if tat is None else max(tat, now)
+    new_tat = start + rate.interval
+    if new_tat - now > rate.window:
+        return start, Decision(allowed=False, retry_after=new_tat - now - rate.period)
+    return new_tat, Decision(allowed=True)
+
+
+class RateLimitStore(ABC):
+    """Where the limiter keeps one GCRA timestamp per key."""
+
+    @abstractmethod
+    async def hit_all(self, limits: list[tuple[str, RateLimit]]) -> list[Decision]:
+        """Counts a request against every key, unless it would exceed any rate.
+
+        Returns one decision per limit up to and including the first denial.
+        A denied request charges none of the keys, so a tight limit turning
+        it away does not also spend the broader ones.
+        """
+
+    async def hit(self, key: str, rate: RateLimit) -> Decision:
+        """Counts a request against key, unless it would exceed rate."""
+        [decision] = await self.hit_all([(key, rate)])
+        return decision
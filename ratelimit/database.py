@@ -0,0 +1,46 @@
+import time
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ratelimit.base import Decision, RateLimit, RateLimitStore, gcra
+from repositories.rate_limit import RateLimitRepository
+from repositories.unit_of_work import UnitOfWork
+
+
+class DatabaseRateLimitStore(RateLimitStore):
+    """Shares buckets between replicas through the rate_limit_buckets table.
+
+    A hit is one upsert per bucket that only advances it when the request
+    fits, so concurrent replicas cannot overdraw it; the upserts share a
+    transaction that is rolled back if any limit is exceeded. It costs a
+    round trip to the primary per limit checked, and relies on the replicas'
+    clocks agreeing to within a small fraction of the shortest interval.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self.session_factory = session_factory
+
+    async def hit_all(self, limits: list[tuple[str, RateLimit]]) -> list[Decision]:
+        now = time.time()
+        decisions = []
+        async with self.session_factory() as db:
+            repo = RateLimitRepository(db)
+            async with UnitOfWork(db):
+                savepoint = await db.begin_nested()
+                for key, rate in limits:
+                    tat = await repo.advance(key, now, rate.interval, rate.window)
+                    if tat is not None:
+                        decisions.append(Decision(allowed=True))
+                        continue
+                    tat = await repo.get_tat(key)
+                    # Hand back whatever the earlier limits already took.
+                    await savepoint.rollback()
+                    _, decision = gcra(tat, now, rate)
+                    decisions.append(
+                        Decision(
+                            allowed=False, retry_after=max(decision.retry_after, 0.0)
+                        )
+                    )
+                    break
+        return decisions
@@ -0,0 +1,121 @@
+import logging
+import re
+from dataclasses import dataclass
+
+from jose import JWTError
+from starlette.routing import compile_path
+from starlette.types import Scope
+
+from auth.auth import decode_access_token
+from metrics.registry import registry
+from ratelimit.base import Decision, RateLimit, RateLimitStore
+from security.tokens import api_key_prefix, token_digest
+
+logger = logging.getLogger(__name__)
+
+rejections = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests turned away with 429, by the limit they exceeded",
+    ("scope",),
+)
+store_errors = registry.counter(
+    "rate_limit_store_errors_total",
+    "Rate limit checks that failed and let the request through",
+)
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    method: str
+    template: str
+    pattern: re.Pattern
+    rate: RateLimit
+
+
+class RateLimiter:
+    """Checks a request against its route, user and IP limits, all or nothing.
+
+    Clients are the user id of a valid access token, the digest of an API
+    key, or else the IP address the ASGI server reports (run uvicorn with
+    --proxy-headers behind a load balancer). Route limits are counted per
+    client and route template, so /files/{id} shares one bucket per client.
+    A request is only charged if every limit allows it, so one turned away
+    by a route limit does not spend the client's user or IP allowance.
+    A failing store lets requests through rather than taking the API down.
+    """
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        ip_rate: RateLimit | None = None,
+        user_rate: RateLimit | None = None,
+        route_rates: dict[str, RateLimit] | None = None,
+        exempt_paths: list[str] | None = None,
+    ):
+        self.store = store
+        self.ip_rate = ip_rate
+        self.user_rate = user_rate
+        self.routes = [
+            self._route_limit(route, rate)
+            for route, rate in (route_rates or {}).items()
+        ]
+        self.exempt_paths = set(exempt_paths or ())
+
+    @staticmethod
+    def _route_limit(route: str, rate: RateLimit) -> RouteLimit:
+        """Parses "<METHOD> <path template>", e.g. "GET /files/{id}"."""
+        method, _, template = route.strip().partition(" ")
+        pattern, _, _ = compile_path(template.strip())
+        return RouteLimit(method.upper(), template.strip(), pattern, rate)
+
+    @staticmethod
+    def _user(scope: Scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name != b"authorization":
+                continue
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            if api_key_prefix(token):
+                return f"key:{token_digest(token)}"
+            try:
+                return f"user:{decode_access_token(token)['sub']}"
+            except (JWTError, KeyError):
+                return None
+        return None
+
+    async def _hit(self, limits: list[tuple[str, str, RateLimit]]) -> Decision:
+        try:
+            decisions = await self.store.hit_all(
+                [(key, rate) for _, key, rate in limits]
+            )
+        except Exception:
+            logger.exception("Rate limit store failed; allowing the request")
+            store_errors.inc()
+            return Decision(allowed=True)
+        for (scope_name, _, _), decision in zip(limits, decisions):
+            if not decision.allowed:
+                rejections.labels(scope=scope_name).inc()
+                return decision
+        return Decision(allowed=True)
+
+    async def check(self, scope: Scope) -> Decision:
+        path = scope["path"]
+        if path in self.exempt_paths:
+            return Decision(allowed=True)
+        ip = f"ip:{scope['client'][0] if scope.get('client') else 'unknown'}"
+        user = self._user(scope)
+
+        limits = [
+            ("route", f"route:{route.method} {route.template}:{user or ip}", route.rate)
+            for route in self.routes
+            if route.method == scope["method"] and route.pattern.match(path)
+        ]
+        if user and self.user_rate:
+            limits.append(("user", user, self.user_rate))
+        if self.ip_rate:
+            limits.append(("ip", ip, self.ip_rate))
+
+        if not limits:
+            return Decision(allowed=True)
+        return await self._hit(limits)
@@ -0,0 +1,41 @@
+import time
+from collections import OrderedDict
+
+from metrics.registry import registry
+from ratelimit.base import Decision, RateLimit, RateLimitStore, gcra
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Keeps buckets in this process, so each worker enforces limits alone.
+
+    hit_all() never awaits, so on the event loop every check-and-update runs
+    to completion without a lock. Beyond max_size keys the least recently used
+    bucket is forgotten, which at worst lets that client burst again.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        registry.gauge(
+            "rate_limit_keys",
+            "Rate limit buckets held in memory",
+            callback=lambda: len(self._tats),
+        )
+
+    async def hit_all(self, limits: list[tuple[str, RateLimit]]) -> list[Decision]:
+        now = time.monotonic()
+        tats, decisions = {}, []
+        for key, rate in limits:
+            tats[key], decision = gcra(self._tats.get(key), now, rate)
+            decisions.append(decision)
+            if not decision.allowed:
+                return decisions
+        for key, tat in tats.items():
+            self._tats[key] = tat
+            self._tats.move_to_end(key)
+            if len(self._tats) > self.max_size:
+                self._tats.popitem(last=False)
+        return decisions
+
+    def __len__(self) -> int:
+        return len(self._tats)
@@ -0,0 +1,36 @@
+import math
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from configs.rate_limit import get_rate_limiter
+
+
+class RateLimitMiddleware:
+    """Answers 429 with Retry-After once a request exceeds a rate limit.
+
+    The limiter comes from get_rate_limiter, which tests override through
+    app.dependency_overrides like any dependency; None disables limiting.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        overrides = scope["app"].dependency_overrides
+        limiter = overrides.get(get_rate_limiter, get_rate_limiter)()
+        if limiter is not None:
+            decision = await limiter.check(scope)
+            if not decision.allowed:
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={
+                        "Retry-After": str(max(1, math.ceil(decision.retry_after)))
+                    },
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
@@ -0,0 +1,41 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.api_key import ApiKey
+from models.user import User
+
+
+class ApiKeyRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, api_key: ApiKey) -> ApiKey:
+        self.db.add(api_key)
+        await self.db.flush()
+        return api_key
+
+    async def get_by_user_id(self, user_id) -> list[ApiKey]:
+        result = await self.db.execute(
+            select(ApiKey)
+            .filter_by(user_id=user_id, revoked_at=None)
+            .order_by(ApiKey.created_at.desc())
+        )
+        return result.scalars().all()
+
+    async def get_by_id(self, id, user_id) -> ApiKey | None:
+        result = await self.db.execute(
+            select(ApiKey).filter_by(id=id, user_id=user_id, revoked_at=None)
+        )
+        return result.scalars().first()
+
+    async def get_active_with_user(self, prefix: str) -> tuple[ApiKey, User] | None:
+        result = await self.db.execute(
+            select(ApiKey, User)
+            .join(User, User.id == ApiKey.user_id)
+            .where(ApiKey.prefix == prefix, ApiKey.revoked_at.is_(None))
+        )
+        return result.first()
+
+    async def update(self, api_key: ApiKey) -> ApiKey:
+        await self.db.flush()
+        return api_key
@@ -0,0 +1,74 @@
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.auth_session import AuthSession
+from models.mixins import utcnow
+
+
+class AuthSessionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, auth_session: AuthSession) -> AuthSession:
+        self.db.add(auth_session)
+        await self.db.flush()
+        return auth_session
+
+    async def get_active(self, id) -> AuthSession | None:
+        result = await self.db.execute(
+            select(AuthSession).where(
+                AuthSession.id == id,
+                AuthSession.revoked_at.is_(None),
+                AuthSession.expires_at > utcnow(),
+            )
+        )
+        return result.scalars().first()
+
+    async def rotate(self, id, old_digest: str, new_digest: str) -> bool:
+        """Swaps in a new token digest unless another refresh got there first."""
+        result = await self.db.execute(
+            update(AuthSession)
+            .where(
+                AuthSession.id == id,
+                AuthSession.token_digest == old_digest,
+                AuthSession.revoked_at.is_(None),
+            )
+            .values(
+                token_digest=new_digest,
+                previous_digest=old_digest,
+                updated_at=utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def revoke(self, id) -> None:
+        await self.db.execute(
+            update(AuthSession)
+            .where(AuthSession.id == id, AuthSession.revoked_at.is_(None))
+            .values(revoked_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def revoke_all_for_user(self, user_id) -> None:
+        await self.db.execute(
+            update(AuthSession)
+            .where(AuthSession.user_id == user_id, AuthSession.revoked_at.is_(None))
+            .values(revoked_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_expired(self) -> int:
+        """Deletes sessions that can no longer refresh: expired or revoked."""
+        result = await self.db.execute(
+            delete(AuthSession)
+            .where(
+                or_(
+                    AuthSession.expires_at <= utcnow(),
+                    AuthSession.revoked_at.is_not(None),
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,95 @@
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.blob import Blob
+from models.file import File
+
+
+class BlobRepository:
+    """Reference counting for blobs.
+
+    add_reference, remove_reference and release_user_references only stage
+    their updates; they are committed together with the file change that
+    caused them. Unreferenced blobs are removed by the purger.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_sha256(self, sha256: str) -> Blob | None:
+        result = await self.db.execute(select(Blob).filter_by(sha256=sha256))
+        return result.scalars().first()
+
+    async def get_by_sha256s(self, sha256s: list[str]) -> list[Blob]:
+        if not sha256s:
+            return []
+        result = await self.db.execute(select(Blob).where(Blob.sha256.in_(sha256s)))
+        return result.scalars().all()
+
+    async def add_reference(self, blob_id, count: int = 1) -> bool:
+        """Returns False if the blob was deleted or claimed for deletion."""
+        result = await self.db.execute(
+            update(Blob)
+            .where(Blob.id == blob_id, Blob.ref_count >= 0)
+            .values(ref_count=Blob.ref_count + count)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def remove_reference(self, blob_id, count: int = 1):
+        await self.db.execute(
+            update(Blob)
+            .where(Blob.id == blob_id)
+            .values(ref_count=Blob.ref_count - count)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def release_user_references(self, user_id):
+        """Drops the references held by every file of a user."""
+        user_files = select(File.blob_id).where(File.user_id == user_id)
+        references = (
+            select(func.count())
+            .where(File.blob_id == Blob.id, File.user_id == user_id)
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            update(Blob)
+            .where(Blob.id.in_(user_files))
+            .values(ref_count=Blob.ref_count - references)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim_unreferenced(self, limit: int) -> list[Blob]:
+        """Claims up to limit unreferenced blobs for deletion.
+
+        Claimed blobs get a ref_count of -1, which add_reference never
+        revives, so their objects can be removed safely. Their sha256 is
+        cleared so identical content uploaded meanwhile gets a new blob. A
+        blob whose object could not be removed stays claimed and is picked
+        up again.
+        """
+        result = await self.db.execute(
+            select(Blob.id).where(Blob.ref_count <= 0).limit(limit)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            return []
+        await self.db.execute(
+            update(Blob)
+            .where(Blob.id.in_(ids), Blob.ref_count <= 0)
+            .values(ref_count=-1, sha256=None)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(
+            select(Blob)
+            .where(Blob.id.in_(ids), Blob.ref_count == -1)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
+
+    async def delete_claimed(self, blob_ids: list):
+        await self.db.execute(
+            delete(Blob)
+            .where(Blob.id.in_(blob_ids), Blob.ref_count == -1)
+            .execution_options(synchronize_session=False)
+        )
@@ -1,50 +1,264 @@
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Bundle
+
+from models.blob import Blob
+from models.file import File, FileStatus
+from models.user import User
+from repositories.pagination import Cursor, Page, fetch_page
+from repositories.statistics import total_columns
 
-from models.file import File
+AVAILABLE = FileStatus.AVAILABLE.value
+
+# The columns a file listing renders, read as flat rows instead of File
+# entities with their joined blob.
+FILE_SUMMARY = Bundle(
+    "file_summary",
+    File.id,
+    File.name,
+    File.extension,
+    File.mime_type,
+    File.size,
+    File.created_at,
+    File.updated_at,
+    Blob.sha256,
+    Blob.crc32c,
+    Blob.storage_key,
+)
 
 
 class FileRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def adjust_file_counts(self, deltas: Mapping) -> None:
+        """Stages changes to users' file counters, keyed by user id.
+
+        Callers apply them in the transaction that makes files available or
+        unavailable, so the counters never drift from the files table.
+        """
+        for user_id, delta in deltas.items():
+            if delta:
+                await self.db.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(file_count=User.file_count + delta)
+                    .execution_options(synchronize_session=False)
+                )
+
+    @staticmethod
+    def _counted(files: list[File]) -> Counter:
+        return Counter(
+            file.user_id for file in files if file.status != FileStatus.PENDING.value
+        )
+
     async def add(self, file: File) -> File:
         self.db.add(file)
-        await self.db.commit()
-        await self.db.refresh(file)
+        await self.adjust_file_counts(self._counted([file]))
+        await self.db.flush()
         return file
 
+    async def add_all(self, files: list[File]) -> list[File]:
+        """Inserts files, and any new blobs they reference, in one flush."""
+        self.db.add_all(files)
+        await self.adjust_file_counts(self._counted(files))
+        await self.db.flush()
+        return files
+
     async def get_by_user_id(
-        self, user_id: str, limit: int = 20, offset: int = 0
-    ) -> list[File]:
-        result = await self.db.execute(
-            select(File)
-            .filter_by(user_id=user_id)
-            .limit(limit)
-            .offset(offset)
-            .order_by(File.created_at.desc())
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        include_total: bool = True,
+    ) -> Page:
+        """Returns a page of the user's file summaries, totalled by their counter."""
+        query = (
+            select(FILE_SUMMARY)
+            .join(File.blob)
+            .where(
+                File.user_id == user_id,
+                File.deleted_at.is_(None),
+                File.status == AVAILABLE,
+            )
+            .execution_options(read_replica=True)
         )
-        return result.scalars().all()
+        totals = None
+        if include_total:
+            totals = total_columns(
+                self.db, select(User.file_count).where(User.id == user_id)
+            )
+        return await fetch_page(self.db, query, File, limit, offset, cursor, totals)
 
     async def get_by_name(self, name: str) -> File:
-        result = await self.db.execute(select(File).filter_by(name=name))
+        result = await self.db.execute(
+            select(File).filter_by(name=name, deleted_at=None, status=AVAILABLE)
+        )
         return result.scalars().first()
 
-    async def get_by_id(self, id: str) -> File:
-        result = await self.db.execute(select(File).filter_by(id=id))
+    async def get_by_id(
+        self, id: str, include_deleted: bool = False, status: str = AVAILABLE
+    ) -> File:
+        query = select(File).filter_by(id=id, status=status)
+        if not include_deleted:
+            query = query.filter_by(deleted_at=None)
+        result = await self.db.execute(query)
         return result.scalars().first()
 
-    async def get_all(self, limit: int, offset: int) -> list[File]:
-        result = await self.db.execute(select(File).offset(offset).limit(limit))
-        return result.scalars().all()
+    async def get_pending_upload_size(self, storage_key: str) -> int | None:
+        """Declared size of the pending direct upload stored at storage_key."""
+        result = await self.db.execute(
+            select(Blob.size)
+            .join(File, File.blob_id == Blob.id)
+            .where(
+                Blob.storage_key == storage_key,
+                File.status == FileStatus.PENDING.value,
+                File.deleted_at.is_(None),
+            )
+        )
+        return result.scalars().first()
+
+    async def get_all(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        include_total: bool = True,
+    ) -> Page:
+        query = (
+            select(FILE_SUMMARY)
+            .join(File.blob)
+            .where(File.deleted_at.is_(None), File.status == AVAILABLE)
+            .execution_options(read_replica=True)
+        )
+        totals = None
+        if include_total:
+            totals = total_columns(
+                self.db,
+                select(func.count())
+                .select_from(File)
+                .filter_by(deleted_at=None, status=AVAILABLE),
+                File.__tablename__,
+            )
+        return await fetch_page(self.db, query, File, limit, offset, cursor, totals)
 
     async def get_file_count(self, user_id: int | None = None) -> int:
-        query = select(File)
         if user_id:
-            query = query.filter_by(user_id=user_id)
-        result = await self.db.execute(query)
-        return len(result.scalars().all())
+            result = await self.db.execute(
+                select(User.file_count).filter_by(id=user_id)
+            )
+            return result.scalar() or 0
+        result = await self.db.execute(
+            select(func.count())
+            .select_from(File)
+            .filter_by(deleted_at=None, status=AVAILABLE)
+        )
+        return result.scalar_one()
 
     async def delete(self, file: File):
-        self.db.delete(file)
-        await self.db.commit()
+        await self.db.delete(file)
+        await self.db.flush()
+
+    async def soft_delete(
+        self, ids: list, deleted_at: datetime, user_id: str | None = None
+    ) -> int:
+        """Moves files to the trash in one statement; returns how many moved."""
+        query = update(File).where(
+            File.id.in_(ids), File.deleted_at.is_(None), File.status == AVAILABLE
+        )
+        if user_id:
+            query = query.where(File.user_id == user_id)
+        result = await self.db.execute(
+            query.values(deleted_at=deleted_at)
+            .returning(File.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        owners = Counter(result.scalars().all())
+        await self.adjust_file_counts({owner: -n for owner, n in owners.items()})
+        return sum(owners.values())
+
+    async def restore(self, id, deleted_after: datetime) -> bool:
+        """Takes a file trashed after deleted_after out of the trash.
+
+        Check and update are one statement, so of two concurrent restores
+        only one counts the file back in; returns whether this one did.
+        """
+        result = await self.db.execute(
+            update(File)
+            .where(
+                File.id == id,
+                File.deleted_at.is_not(None),
+                File.deleted_at >= deleted_after,
+                File.status == AVAILABLE,
+            )
+            .values(deleted_at=None)
+            .returning(File.user_id)
+            .execution_options(synchronize_session="fetch")
+        )
+        owner = result.scalar_one_or_none()
+        if owner is None:
+            return False
+        await self.adjust_file_counts({owner: 1})
+        return True
+
+    async def make_available(self, id) -> bool:
+        """Moves a pending file to available, counting it for its owner once."""
+        result = await self.db.execute(
+            update(File)
+            .where(File.id == id, File.status == FileStatus.PENDING.value)
+            .values(status=AVAILABLE)
+            .returning(File.user_id)
+            .execution_options(synchronize_session="fetch")
+        )
+        owner = result.scalar_one_or_none()
+        if owner is None:
+            return False
+        await self.adjust_file_counts({owner: 1})
+        return True
+
+    async def update(self, file: File) -> File:
+        await self.db.flush()
+        return file
+
+    @staticmethod
+    def _expired(deleted_before: datetime, pending_before: datetime):
+        return or_(
+            File.deleted_at < deleted_before,
+            and_(
+                File.status == FileStatus.PENDING.value,
+                File.created_at < pending_before,
+            ),
+        )
+
+    async def get_expired(
+        self, deleted_before: datetime, pending_before: datetime, limit: int
+    ) -> list[File]:
+        """Files trashed before deleted_before, or abandoned while pending."""
+        result = await self.db.execute(
+            select(File)
+            .where(self._expired(deleted_before, pending_before))
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def delete_expired(
+        self, ids: list, deleted_before: datetime, pending_before: datetime
+    ) -> list:
+        """Deletes the files among ids that are still expired.
+
+        Returns the blob id of each file this statement actually deleted; a
+        concurrent purger or restore that got there first is left out.
+        """
+        result = await self.db.execute(
+            delete(File)
+            .where(File.id.in_(ids), self._expired(deleted_before, pending_before))
+            .returning(File.blob_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalars().all()
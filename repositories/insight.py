@@ -1,7 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Bundle, undefer
 
 from models.insight import Insight
+from repositories.pagination import Cursor, paginate
+
+INSIGHT_SUMMARY_COLUMNS = (
+    Insight.id,
+    Insight.prompt,
+    Insight.file_id,
+    Insight.user_id,
+    Insight.created_at,
+    Insight.updated_at,
+)
 
 
 class InsightRepository:
@@ -9,8 +20,25 @@ class InsightRepository:
         self.db = db
         self.model = Insight
 
-    async def get_insights_by_file_id(self, file_id: str):
-        result = await self.db.execute(select(self.model).filter_by(file_id=file_id))
+    async def get_insights_by_file_id(
+        self,
+        file_id: str,
+        limit: int,
+        cursor: Cursor | None = None,
+        include_data: bool = False,
+    ):
+        """Returns a page of insight summaries, with their text only if asked."""
+        columns = INSIGHT_SUMMARY_COLUMNS
+        if include_data:
+            columns += (self.model.data,)
+        query = (
+            select(Bundle("insight_summary", *columns))
+            .where(self.model.file_id == file_id)
+            .execution_options(read_replica=True)
+        )
+        result = await self.db.execute(
+            paginate(query, self.model, limit, cursor=cursor)
+        )
         return result.scalars().all()
 
     async def add(
@@ -20,14 +48,17 @@ class InsightRepository:
             data=insight_data, prompt=prompt, file_id=file_id, user_id=user_id
         )
         self.db.add(new_insight)
-        await self.db.commit()
-        await self.db.refresh(new_insight)
+        await self.db.flush()
         return new_insight
 
     async def get_by_id(self, insight_id: str) -> Insight:
-        result = await self.db.execute(select(self.model).filter_by(id=insight_id))
+        result = await self.db.execute(
+            select(self.model)
+            .filter_by(id=insight_id)
+            .options(undefer(self.model.data))
+        )
         return result.scalars().first()
 
     async def delete(self, insight: Insight):
         await self.db.delete(insight)
-        await self.db.commit()
+        await self.db.flush()
@@ -0,0 +1,95 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import ColumnElement, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page, ordered on (created_at, id)."""
+
+    created_at: datetime
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        payload = json.dumps([self.created_at.isoformat(), str(self.id)])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(datetime.fromisoformat(created_at), uuid.UUID(id))
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Invalid cursor") from exc
+
+    @classmethod
+    def after(cls, rows: list, limit: int) -> str | None:
+        """Returns the cursor of the next page, or None on the last page."""
+        if len(rows) < limit:
+            return None
+        last = rows[-1]
+        if isinstance(last, dict):
+            return cls(last["created_at"], last["id"]).encode()
+        return cls(last.created_at, last.id).encode()
+
+
+def paginate(
+    query: Select, model, limit: int, offset: int = 0, cursor: Cursor | None = None
+) -> Select:
+    """Orders a listing newest first on (created_at, id) and selects one page.
+
+    With a cursor the page starts right after it, so the composite indexes
+    on (..., created_at, id) locate it directly regardless of depth; the
+    offset is only honoured without one.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+    if cursor is not None:
+        return query.where(
+            tuple_(model.created_at, model.id) < tuple_(cursor.created_at, cursor.id)
+        )
+    return query.offset(offset)
+
+
+class Page(NamedTuple):
+    items: list
+    # None when the caller skipped the total.
+    total: int | None = None
+    total_is_estimate: bool = False
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    model,
+    limit: int,
+    offset: int = 0,
+    cursor: Cursor | None = None,
+    totals: tuple[ColumnElement, ColumnElement] | None = None,
+) -> Page:
+    """Runs a page query, with the total columns from total_columns if given.
+
+    The total rides along on every row, so a listing costs one round trip;
+    only an empty page past the start needs a second query for it.
+    """
+    query = paginate(query, model, limit, offset, cursor)
+    if totals is None:
+        result = await db.execute(query)
+        return Page(result.unique().scalars().all())
+
+    result = await db.execute(query.add_columns(*totals))
+    rows = result.unique().all()
+    if rows:
+        return Page([row[0] for row in rows], rows[0][1], rows[0][2])
+    if not offset and cursor is None:
+        return Page([], 0)
+    total, estimated = (
+        await db.execute(
+            select(*totals).execution_options(**query.get_execution_options())
+        )
+    ).one()
+    return Page([], total, estimated)
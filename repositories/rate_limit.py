@@ -0,0 +1,53 @@
+from sqlalchemy import case, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.rate_limit import RateLimitBucket
+
+buckets = RateLimitBucket.__table__
+
+
+class RateLimitRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _insert(self):
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(buckets)
+        return sqlite.insert(buckets)
+
+    async def advance(
+        self, key: str, now: float, interval: float, window: float
+    ) -> float | None:
+        """Moves the key's tat on by interval if it stays within window of now.
+
+        Check and update are a single statement. Returns the new tat, or
+        None when the request does not fit.
+        """
+        start = case((buckets.c.tat > now, buckets.c.tat), else_=now)
+        query = (
+            self._insert()
+            .values(key=key, tat=now + interval)
+            .on_conflict_do_update(
+                index_elements=[buckets.c.key],
+                set_={"tat": start + interval},
+                where=start + interval - now <= window,
+            )
+            .returning(buckets.c.tat)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_tat(self, key: str) -> float | None:
+        result = await self.db.execute(
+            select(RateLimitBucket.tat).where(RateLimitBucket.key == key)
+        )
+        return result.scalar_one_or_none()
+
+    async def delete_idle(self, now: float) -> int:
+        result = await self.db.execute(
+            delete(RateLimitBucket)
+            .where(RateLimitBucket.tat <= now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.mixins import utcnow
+from models.revoked_token import RevokedToken
+
+
+class RevokedTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def revoke(self, key: str, expires_at: datetime) -> RevokedToken:
+        """Records the revocation, or moves an existing one to now."""
+        revoked = await self.db.get(RevokedToken, key)
+        if revoked is None:
+            revoked = RevokedToken(key=key, expires_at=expires_at)
+            self.db.add(revoked)
+        else:
+            revoked.revoked_at = utcnow()
+            revoked.expires_at = expires_at
+        await self.db.flush()
+        return revoked
+
+    async def get_many(self, keys: list[str]) -> list[RevokedToken]:
+        result = await self.db.execute(
+            select(RevokedToken).where(RevokedToken.key.in_(keys))
+        )
+        return result.scalars().all()
+
+    async def get_keys(self, revoked_since: datetime | None = None) -> list[tuple]:
+        """Returns (key, revoked_at) of unexpired revocations, oldest first."""
+        query = select(RevokedToken.key, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > utcnow()
+        )
+        if revoked_since is not None:
+            query = query.where(RevokedToken.revoked_at > revoked_since)
+        result = await self.db.execute(query.order_by(RevokedToken.revoked_at))
+        return result.all()
+
+    async def delete_expired(self) -> int:
+        result = await self.db.execute(
+            delete(RevokedToken)
+            .where(RevokedToken.expires_at <= utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
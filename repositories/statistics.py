@@ -0,0 +1,41 @@
+from sqlalchemy import (BigInteger, ColumnElement, Select, case, cast, column,
+                        false, func, select, table)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+
+pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+
+def total_columns(
+    db: AsyncSession, count_query: Select, table_name: str | None = None
+) -> tuple[ColumnElement, ColumnElement]:
+    """Returns columns carrying a listing's total and whether it is an estimate.
+
+    Selected next to the page rows, they fetch the total in the same
+    statement. With table_name on PostgreSQL, tables whose planner estimate
+    (pg_class.reltuples) passes APPROXIMATE_COUNT_THRESHOLD report that
+    estimate and never run count_query; it counts every row, trashed or not,
+    and is only as fresh as the last ANALYZE.
+    """
+    # Never correlated: the count usually reads the table the page reads.
+    exact = count_query.correlate(None).scalar_subquery()
+    threshold = settings.APPROXIMATE_COUNT_THRESHOLD
+    if (
+        table_name is None
+        or threshold is None
+        or db.get_bind().dialect.name != "postgresql"
+    ):
+        return exact.label("total"), false().label("total_is_estimate")
+
+    estimate = (
+        select(cast(pg_class.c.reltuples, BigInteger))
+        .where(pg_class.c.oid == func.to_regclass(table_name))
+        .scalar_subquery()
+    )
+    # reltuples is -1 until the table has been analyzed.
+    is_estimate = func.coalesce(estimate >= threshold, false())
+    return (
+        case((is_estimate, estimate), else_=exact).label("total"),
+        is_estimate.label("total_is_estimate"),
+    )
@@ -0,0 +1,57 @@
+import functools
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class UnitOfWork:
+    """Commits the writes staged by repositories as one transaction.
+
+    Repositories only flush; the outermost unit of work on a session commits
+    when its block succeeds and rolls back when it raises. Inner units join
+    the enclosing one, so a request that goes through several services still
+    commits once. Code that expects a conflict should isolate it in a
+    savepoint (session.begin_nested()) rather than roll the unit back.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.db.info["unit_of_work_depth"] = (
+            self.db.info.get("unit_of_work_depth", 0) + 1
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        depth = self.db.info["unit_of_work_depth"] - 1
+        self.db.info["unit_of_work_depth"] = depth
+        if depth:
+            return
+        callbacks = self.db.info.pop("after_commit", [])
+        if exc_type is None:
+            await self.db.commit()
+            for callback in callbacks:
+                callback()
+        else:
+            await self.db.rollback()
+
+
+def on_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """Runs callback once the enclosing unit of work commits, never on rollback.
+
+    For in-process caches of database state: evicting after the commit means
+    a concurrent reader cannot cache the old row again in between.
+    """
+    db.info.setdefault("after_commit", []).append(callback)
+
+
+def transactional(method):
+    """Runs a service method, which must have self.db, in a unit of work."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with UnitOfWork(self.db):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.upload_session import UploadChunk, UploadSession, UploadSessionStatus
+
+
+class UploadSessionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = UploadSession
+
+    async def add(self, upload_session: UploadSession) -> UploadSession:
+        self.db.add(upload_session)
+        await self.db.flush()
+        return upload_session
+
+    async def get_by_id(self, id: str) -> UploadSession:
+        result = await self.db.execute(select(self.model).filter_by(id=id))
+        return result.scalars().first()
+
+    async def mark_completed(self, id) -> bool:
+        """Moves an active session to completed; False if it was not active."""
+        result = await self.db.execute(
+            update(self.model)
+            .where(
+                self.model.id == id,
+                self.model.status == UploadSessionStatus.ACTIVE.value,
+            )
+            .values(status=UploadSessionStatus.COMPLETED.value)
+            .returning(self.model.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def update(self, upload_session: UploadSession) -> UploadSession:
+        await self.db.flush()
+        return upload_session
+
+    async def get_chunks(self, session_id: str) -> list[UploadChunk]:
+        result = await self.db.execute(
+            select(UploadChunk)
+            .filter_by(session_id=session_id)
+            .order_by(UploadChunk.index)
+        )
+        return result.scalars().all()
+
+    async def save_chunk(self, chunk: UploadChunk) -> UploadChunk:
+        chunk = await self.db.merge(chunk)
+        await self.db.flush()
+        return chunk
+
+    async def delete_chunks(self, session_id: str):
+        await self.db.execute(delete(UploadChunk).filter_by(session_id=session_id))
+
+    async def delete(self, upload_session: UploadSession):
+        await self.db.delete(upload_session)
+        await self.db.flush()
+
+    async def get_expired(self, expired_before: datetime, limit: int):
+        """Sessions, completed or not, whose expires_at is before expired_before."""
+        result = await self.db.execute(
+            select(self.model)
+            .where(self.model.expires_at < expired_before)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def delete_many(self, ids: list):
+        await self.db.execute(
+            delete(UploadChunk)
+            .where(UploadChunk.session_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            delete(self.model)
+            .where(self.model.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
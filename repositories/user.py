@@ -1,7 +1,22 @@
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Bundle
 
 from models.user import User
+from repositories.pagination import Cursor, Page, fetch_page, paginate
+from repositories.statistics import total_columns
+
+# The columns a user listing renders; password hashes never leave the database.
+USER_SUMMARY = Bundle(
+    "user_summary",
+    User.id,
+    User.email,
+    User.username,
+    User.created_at,
+    User.updated_at,
+    User.last_login_at,
+)
 
 
 class UserRepository:
@@ -13,30 +28,55 @@ class UserRepository:
         result = await self.db.execute(select(self.model).filter_by(email=email))
         return result.scalars().first()
 
-    async def get_by_id(self, id: str | int) -> User:
-        result = await self.db.execute(select(self.model).filter_by(id=id))
+    async def get_by_id(self, id: str | int, read_replica: bool = False) -> User:
+        result = await self.db.execute(
+            select(self.model)
+            .filter_by(id=id)
+            .execution_options(read_replica=read_replica)
+        )
         return result.scalars().first()
 
-    async def get_all(self, limit: int, offset: int) -> list[User]:
-        result = await self.db.execute(select(self.model).limit(limit).offset(offset))
+    async def get_all(
+        self, limit: int, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[User]:
+        result = await self.db.execute(
+            paginate(select(self.model), self.model, limit, offset, cursor)
+        )
         return result.scalars().all()
 
     async def add(self, user: User) -> User:
         self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self.db.flush()
         return user
 
     async def update(self, user: User) -> User:
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self.db.flush()
         return user
 
     async def get_count(self) -> int:
-        result = await self.db.execute(select(self.model))
-        return len(result.scalars().all())
+        result = await self.db.execute(select(func.count()).select_from(self.model))
+        return result.scalar_one()
+
+    async def get_page(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        include_total: bool = True,
+    ) -> Page:
+        totals = None
+        if include_total:
+            totals = total_columns(
+                self.db,
+                select(func.count()).select_from(self.model),
+                self.model.__tablename__,
+            )
+        query = select(USER_SUMMARY).execution_options(read_replica=True)
+        return await fetch_page(
+            self.db, query, self.model, limit, offset, cursor, totals
+        )
 
     async def delete(self, user: User):
-        self.db.delete(user)
-        await self.db.commit()
+        await self.db.delete(user)
+        await self.db.flush()
         return user
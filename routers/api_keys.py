@@ -0,0 +1,47 @@
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.auth import get_current_user
+from auth.principals import Principal
+from configs.database import get_session
+from configs.settings import settings
+from schemas.api_key import ApiKeyCreatedModel, ApiKeyCreateModel, ApiKeyModel
+from services.api_key import ApiKeyService
+
+router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/api-keys", tags=["API Keys"])
+
+
+@router.post("", status_code=status.HTTP_201_CREATED, response_model=ApiKeyCreatedModel)
+async def create_api_key(
+    payload: ApiKeyCreateModel,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+):
+    api_key, key = await ApiKeyService(db).create_key(user.id, payload.name)
+    return {
+        "id": api_key.id,
+        "name": api_key.name,
+        "prefix": api_key.prefix,
+        "created_at": api_key.created_at,
+        "key": key,
+    }
+
+
+@router.get("", response_model=list[ApiKeyModel])
+async def get_api_keys(
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+):
+    return await ApiKeyService(db).get_keys(user.id)
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_api_key(
+    id: uuid.UUID,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+):
+    await ApiKeyService(db).revoke_key(id, user.id)
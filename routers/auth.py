@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
@@ -5,15 +6,31 @@ from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.auth import create_access_token
+from auth.auth import create_access_token, get_optional_token_claims
+from auth.principals import TokenClaims
 from configs.database import get_session
 from configs.settings import settings
-from schemas.auth import AuthTokenResponseModel, RegisterPayloadModel
-from services.user import UserService
+from schemas.auth import (AuthTokenResponseModel, RefreshTokenModel,
+                          RegisterPayloadModel)
+from services.auth_session import AuthSessionService
 
 router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/auth", tags=["Auth"])
 
 
+def _token_response(user_id: uuid.UUID, is_admin: bool, refresh_token: str) -> dict:
+    lifetime = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    return {
+        "access_token": create_access_token(
+            id=user_id,
+            is_admin=is_admin,
+            expires_datetime=datetime.now(tz=timezone.utc) + lifetime,
+        ),
+        "token_type": "bearer",
+        "expires_in": int(lifetime.total_seconds()),
+        "refresh_token": refresh_token,
+    }
+
+
 @router.post(
     "/register",
     response_model=AuthTokenResponseModel,
@@ -22,19 +39,10 @@ router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/auth", tags=["Auth"])
 async def register_user(
     payload: RegisterPayloadModel, db: Annotated[AsyncSession, Depends(get_session)]
 ):
-    user_service = UserService(db)
-    user = await user_service.register(
+    user, refresh_token = await AuthSessionService(db).register(
         username=payload.username, email=payload.email, password=payload.password
     )
-
-    return {
-        "access_token": create_access_token(
-            id=user.id,
-            is_admin=user.is_admin,
-            expires_datetime=datetime.now(tz=timezone.utc) + timedelta(hours=2),
-        ),
-        "token_type": "bearer",
-    }
+    return _token_response(user.id, user.is_admin, refresh_token)
 
 
 @router.post("/login", response_model=AuthTokenResponseModel)
@@ -42,14 +50,25 @@ async def login(
     db: Annotated[AsyncSession, Depends(get_session)],
     form: OAuth2PasswordRequestForm = Depends(),
 ):
-    user_service = UserService(db)
-    user = await user_service.login(email=form.username, password=form.password)
+    user, refresh_token = await AuthSessionService(db).login(
+        email=form.username, password=form.password
+    )
+    return _token_response(user.id, user.is_admin, refresh_token)
 
-    return {
-        "access_token": create_access_token(
-            id=user.id,
-            is_admin=user.is_admin,
-            expires_datetime=datetime.now(tz=timezone.utc) + timedelta(hours=2),
-        ),
-        "token_type": "bearer",
-    }
+
+@router.post("/refresh", response_model=AuthTokenResponseModel)
+async def refresh(
+    payload: RefreshTokenModel, db: Annotated[AsyncSession, Depends(get_session)]
+):
+    session_service = AuthSessionService(db)
+    user, refresh_token = await session_service.refresh(payload.refresh_token)
+    return _token_response(user.id, user.is_admin, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: RefreshTokenModel,
+    db: Annotated[AsyncSession, Depends(get_session)],
+    access_claims: Annotated[TokenClaims | None, Depends(get_optional_token_claims)],
+):
+    await AuthSessionService(db).revoke(payload.refresh_token, access_claims)
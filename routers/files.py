@@ -1,16 +1,26 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, UploadFile, status
+from fastapi import APIRouter, Depends, Header, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.auth import get_current_user, only_admin_user
+from auth.auth import get_current_user, get_token_claims, only_admin_user
+from auth.principals import Principal, TokenClaims
 from configs.database import get_session
 from configs.settings import settings
-from models.user import User
-from schemas.file import FileResponseModel, PaginatedFileResponseModel
+from configs.storage import get_storage
+from repositories.pagination import Cursor
+from schemas.file import (BulkDeleteRequestModel, BulkDeleteResponseModel,
+                          BulkUploadResponseModel, DirectUploadCreateModel,
+                          DirectUploadResponseModel, FileResponseModel,
+                          PaginatedFileResponseModel)
+from schemas.insight import PaginatedInsightResponseModel
+from schemas.pagination import get_cursor
+from services.download import DownloadService
 from services.file import FileService
 from services.insight import InsightService
+from storage.base import StorageBackend
 
 router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/files", tags=["Files"])
 
@@ -18,13 +28,61 @@ router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/files", tags=["Files"
 @router.post("", status_code=status.HTTP_200_OK, response_model=FileResponseModel)
 async def upload_file(
     file: UploadFile,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
 ):
-    file_service = FileService(db)
+    file_service = FileService(db, storage)
     return await file_service.upload_file(user_id=user.id, file=file)
 
 
+@router.post(
+    "/bulk", status_code=status.HTTP_200_OK, response_model=BulkUploadResponseModel
+)
+async def upload_files(
+    files: list[UploadFile],
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    file_service = FileService(db, storage)
+    return await file_service.upload_files(user_id=user.id, files=files)
+
+
+@router.post(
+    "/direct-uploads",
+    status_code=status.HTTP_201_CREATED,
+    response_model=DirectUploadResponseModel,
+)
+async def create_direct_upload(
+    payload: DirectUploadCreateModel,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    file_service = FileService(db, storage)
+    return await file_service.create_direct_upload(
+        user_id=user.id,
+        file_name=payload.file_name,
+        mime_type=payload.mime_type,
+        size=payload.size,
+        crc32c=payload.crc32c,
+        resumable=payload.resumable,
+    )
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteResponseModel)
+async def delete_files(
+    payload: BulkDeleteRequestModel,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    file_service = FileService(db, storage)
+    deleted = await file_service.delete_files(file_ids=payload.ids, user=user)
+    return {"deleted": deleted}
+
+
 @router.get(
     "",
     dependencies=[Depends(only_admin_user)],
@@ -32,18 +90,26 @@ async def upload_file(
 )
 async def get_all_files(
     db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    cursor: Annotated[Cursor | None, Depends(get_cursor)],
     limit: int = Query(default=10, ge=1, le=20),
     offset: int = Query(default=0, ge=0),
+    include_total: bool = Query(
+        default=True, description="Set to false to skip counting the total"
+    ),
 ):
-    file_service = FileService(db)
-    files = await file_service.get_all_files(limit=limit, offset=offset)
-    count = await file_service.get_files_count()
+    file_service = FileService(db, storage)
+    page = await file_service.get_all_files(
+        limit=limit, offset=offset, cursor=cursor, include_total=include_total
+    )
 
     return {
-        "data": files,
-        "total": count,
+        "data": page.items,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
         "limit": limit,
         "offset": offset,
+        "next_cursor": Cursor.after(page.items, limit),
     }
 
 
@@ -51,27 +117,80 @@ async def get_all_files(
 async def get_file_by_id(
     id: uuid.UUID,
     db: Annotated[AsyncSession, Depends(get_session)],
-    _: Annotated[User, Depends(get_current_user)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    _: Annotated[TokenClaims, Depends(get_token_claims)],
 ):
-    file_service = FileService(db)
+    file_service = FileService(db, storage)
     return await file_service.get_file_by_id(id)
 
 
-@router.get("/{id}/insights")
+@router.get("/{id}/content", response_class=StreamingResponse)
+async def download_file_content(
+    id: uuid.UUID,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    range_header: Annotated[str | None, Header(alias="Range")] = None,
+    if_range: Annotated[str | None, Header()] = None,
+):
+    file_service = FileService(db, storage)
+    file = await file_service.get_file_for_user(file_id=id, user=user)
+    download_service = DownloadService(storage)
+    return await download_service.file_response(
+        file, range_header=range_header, if_range=if_range
+    )
+
+
+@router.post("/{id}/finalize", response_model=FileResponseModel)
+async def finalize_direct_upload(
+    id: uuid.UUID,
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    file_service = FileService(db, storage)
+    return await file_service.finalize_direct_upload(file_id=id, user=user)
+
+
+@router.post("/{id}/restore", response_model=FileResponseModel)
+async def restore_file(
+    id: uuid.UUID,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    file_service = FileService(db, storage)
+    return await file_service.restore_file(file_id=id, user=user)
+
+
+@router.get("/{id}/insights", response_model=PaginatedInsightResponseModel)
 async def get_file_insights(
     id: uuid.UUID,
-    _: Annotated[User, Depends(get_current_user)],
+    _: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
+    cursor: Annotated[Cursor | None, Depends(get_cursor)],
+    limit: int = Query(default=10, ge=1, le=50),
+    include_data: bool = Query(
+        default=False, description="Set to true to include each insight's text"
+    ),
 ):
     insight_service = InsightService(db)
-    return await insight_service.get_insights_by_file_id(file_id=id)
+    insights = await insight_service.get_insights_by_file_id(
+        file_id=id, limit=limit, cursor=cursor, include_data=include_data
+    )
+    return {
+        "data": insights,
+        "limit": limit,
+        "next_cursor": Cursor.after(insights, limit),
+    }
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_file(
     id: uuid.UUID,
-    _: Annotated[User, Depends(get_current_user)],
+    _: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
 ):
-    file_service = FileService(db)
+    file_service = FileService(db, storage)
     await file_service.delete_file_by_id(file_id=id)
@@ -4,10 +4,10 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.auth import get_current_user
+from auth.auth import get_token_claims
+from auth.principals import TokenClaims
 from configs.database import get_session
 from configs.settings import settings
-from models.user import User
 from schemas.insight import InsightGeneratePayloadModel
 from services.insight import InsightService
 
@@ -17,7 +17,7 @@ router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/insights", tags=["Ins
 @router.post("")
 async def generate_insights(
     payload: InsightGeneratePayloadModel,
-    _: Annotated[User, Depends(get_current_user)],
+    _: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
 ):
     insight_service = InsightService(db)
@@ -29,7 +29,7 @@ async def generate_insights(
 @router.get("/{id}")
 async def get_insight(
     id: uuid.UUID,
-    _: Annotated[User, Depends(get_current_user)],
+    _: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
 ):
     insight_service = InsightService(db)
@@ -39,7 +39,7 @@ async def get_insight(
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_insights(
     file_id: uuid.UUID,
-    _: Annotated[User, Depends(get_current_user)],
+    _: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
 ):
     insight_service = InsightService(db)
@@ -0,0 +1,87 @@
+from typing import Annotated
+
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, status)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.database import get_session
+from configs.settings import settings
+from configs.storage import get_storage, get_storage_executor
+from services.file import FileService
+from storage.base import StorageBackend
+
+router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/storage", tags=["Storage"])
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@router.get("/{name:path}", include_in_schema=False)
+async def download_object(
+    name: str,
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    expires: int = Query(...),
+    signature: str = Query(...),
+    disposition: str = Query(default="inline"),
+    content_type: str | None = Query(default=None),
+):
+    if not storage.verify_signature(
+        name=name,
+        expires=expires,
+        disposition=disposition,
+        content_type=content_type,
+        signature=signature,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired URL"
+        )
+
+    executor = get_storage_executor()
+    try:
+        stream = await executor.run(storage.open_read, name)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+
+    async def iter_chunks():
+        try:
+            async for chunk in executor.iter_read(stream, chunk_size=CHUNK_SIZE):
+                yield chunk
+        finally:
+            await executor.run(stream.close)
+
+    return StreamingResponse(
+        iter_chunks(),
+        media_type=content_type or "application/octet-stream",
+        headers={"Content-Disposition": disposition},
+    )
+
+
+@router.put("/{name:path}", include_in_schema=False)
+async def upload_object(
+    name: str,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    expires: int = Query(...),
+    signature: str = Query(...),
+    content_type: str | None = Query(default=None),
+):
+    """Target of upload URLs issued by backends whose objects the app serves."""
+    if not storage.verify_signature(
+        name=name,
+        expires=expires,
+        disposition="",
+        content_type=content_type,
+        signature=signature,
+        method="PUT",
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired URL"
+        )
+
+    await FileService(db, storage).receive_direct_upload(
+        name, request.stream(), content_type=content_type
+    )
+    return Response(status_code=status.HTTP_200_OK)
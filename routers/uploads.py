@@ -0,0 +1,97 @@
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, Path, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.auth import get_current_user, get_token_claims
+from auth.principals import Principal, TokenClaims
+from configs.database import get_session
+from configs.settings import settings
+from configs.storage import get_storage
+from schemas.file import FileResponseModel
+from schemas.upload_session import (
+    UploadChunkResponseModel,
+    UploadSessionCreateModel,
+    UploadSessionResponseModel,
+)
+from services.upload_session import UploadSessionService
+from storage.base import StorageBackend
+
+router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/uploads", tags=["Uploads"])
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UploadSessionResponseModel,
+)
+async def create_upload_session(
+    payload: UploadSessionCreateModel,
+    user: Annotated[Principal, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    upload_service = UploadSessionService(db, storage)
+    return await upload_service.create_session(
+        user_id=user.id,
+        file_name=payload.file_name,
+        mime_type=payload.mime_type,
+        size=payload.size,
+        chunk_size=payload.chunk_size,
+    )
+
+
+@router.get("/{id}", response_model=UploadSessionResponseModel)
+async def get_upload_session(
+    id: uuid.UUID,
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    upload_service = UploadSessionService(db, storage)
+    return await upload_service.get_session(session_id=id, user_id=user.id)
+
+
+@router.put("/{id}/chunks/{index}", response_model=UploadChunkResponseModel)
+async def upload_chunk(
+    id: uuid.UUID,
+    request: Request,
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    index: int = Path(..., ge=0),
+    offset: int = Query(..., ge=0),
+    x_checksum_crc32c: str | None = Header(default=None),
+):
+    upload_service = UploadSessionService(db, storage)
+    return await upload_service.upload_chunk(
+        session_id=id,
+        user_id=user.id,
+        index=index,
+        offset=offset,
+        stream=request.stream(),
+        crc32c=x_checksum_crc32c,
+    )
+
+
+@router.post("/{id}/complete", response_model=FileResponseModel)
+async def complete_upload_session(
+    id: uuid.UUID,
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    upload_service = UploadSessionService(db, storage)
+    return await upload_service.complete_session(session_id=id, user_id=user.id)
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    id: uuid.UUID,
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
+    db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+):
+    upload_service = UploadSessionService(db, storage)
+    await upload_service.abort_session(session_id=id, user_id=user.id)
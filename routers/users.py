@@ -4,16 +4,20 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.auth import get_current_user, only_admin_user
+from auth.auth import get_current_user, get_token_claims, only_admin_user
+from auth.principals import Principal, TokenClaims
 from configs.database import get_session
 from configs.settings import settings
+from configs.storage import get_storage
 from models import file
-from models.user import User
+from repositories.pagination import Cursor
 from schemas.file import PaginatedFileResponseModel
+from schemas.pagination import get_cursor
 from schemas.user import (ChangeUserPasswordModel, PaginatedUserResponseModel,
                           UserResponseModel)
 from services.file import FileService
 from services.user import UserService
+from storage.base import StorageBackend
 
 router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/users", tags=["Users"])
 
@@ -26,18 +30,25 @@ router = APIRouter(prefix=f"{settings.API_ENDPOINT_PREFIX}/users", tags=["Users"
 )
 async def get_all_users(
     db: Annotated[AsyncSession, Depends(get_session)],
+    cursor: Annotated[Cursor | None, Depends(get_cursor)],
     limit: int = Query(default=10, ge=1, le=50),
     offset: int = Query(default=0, ge=0),
+    include_total: bool = Query(
+        default=True, description="Set to false to skip counting the total"
+    ),
 ):
     user_service = UserService(db)
-    count = await user_service.get_count()
-    users = await user_service.get_all(limit=limit, offset=offset)
+    page = await user_service.get_page(
+        limit=limit, offset=offset, cursor=cursor, include_total=include_total
+    )
 
     return {
-        "data": users,
-        "total": count,
+        "data": page.items,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
         "limit": limit,
         "offset": offset,
+        "next_cursor": Cursor.after(page.items, limit),
     }
 
 
@@ -46,7 +57,7 @@ async def get_all_users(
     status_code=status.HTTP_200_OK,
     response_model=UserResponseModel,
 )
-async def get_current_in_user(user: Annotated[User, Depends(get_current_user)]):
+async def get_current_in_user(user: Annotated[Principal, Depends(get_current_user)]):
     return user
 
 
@@ -70,23 +81,34 @@ async def get_user_by_id(
 )
 async def get_user_files(
     id: uuid.UUID,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
+    storage: Annotated[StorageBackend, Depends(get_storage)],
+    cursor: Annotated[Cursor | None, Depends(get_cursor)],
     limit: int = Query(default=10, ge=1, le=20),
     offset: int = Query(default=0, ge=0),
+    include_total: bool = Query(
+        default=True, description="Set to false to skip counting the total"
+    ),
 ):
     if user.id != id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
-    file_service = FileService(db)
-    files = await file_service.get_files_by_user_id(user.id, limit=limit, offset=offset)
-    count = await file_service.get_files_count_by_user_id(user.id)
+    file_service = FileService(db, storage)
+    page = await file_service.get_files_by_user_id(
+        user.id,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        include_total=include_total,
+    )
 
     return {
-        "data": files,
-        "total": count,
+        "data": page.items,
+        "total": page.total,
         "limit": limit,
         "offset": offset,
+        "next_cursor": Cursor.after(page.items, limit),
     }
 
 
@@ -98,7 +120,7 @@ async def get_user_files(
 async def change_user_password(
     id: uuid.UUID,
     payload: ChangeUserPasswordModel,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
 ):
     if user.id != id:
@@ -114,7 +136,7 @@ async def change_user_password(
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_account(
     id: uuid.UUID,
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[TokenClaims, Depends(get_token_claims)],
     db: Annotated[AsyncSession, Depends(get_session)],
 ):
     if user.id != id:
@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ApiKeyCreateModel(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class ApiKeyModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: str
+    prefix: str
+    created_at: datetime
+
+
+class ApiKeyCreatedModel(ApiKeyModel):
+    # The full key; it cannot be retrieved again.
+    key: str
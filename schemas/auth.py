@@ -12,6 +12,13 @@ class LoginModel(BaseModel):
     password: str = Field(..., min_length=8, max_length=256)
 
 
+class RefreshTokenModel(BaseModel):
+    refresh_token: str = Field(..., max_length=256)
+
+
 class AuthTokenResponseModel(BaseModel):
     access_token: str
     token_type: str
+    # Seconds until the access token expires.
+    expires_in: int
+    refresh_token: str
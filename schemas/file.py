@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 
 from schemas.pagination import PaginationBaseModel
 
@@ -14,9 +14,49 @@ class FileResponseModel(BaseModel):
     mime_type: str
     url: HttpUrl
     size: Decimal
+    sha256: str | None = None
+    crc32c: str | None = None
     created_at: datetime
     updated_at: datetime
 
 
 class PaginatedFileResponseModel(PaginationBaseModel):
     data: list[FileResponseModel]
+
+
+class BulkUploadResultModel(BaseModel):
+    file_name: str
+    file: FileResponseModel | None = None
+    error: str | None = None
+
+
+class BulkUploadResponseModel(BaseModel):
+    data: list[BulkUploadResultModel]
+    uploaded: int
+    failed: int
+
+
+class BulkDeleteRequestModel(BaseModel):
+    ids: list[uuid.UUID] = Field(..., min_length=1)
+
+
+class BulkDeleteResponseModel(BaseModel):
+    deleted: int
+
+
+class DirectUploadCreateModel(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255)
+    mime_type: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., ge=1)
+    crc32c: str | None = Field(
+        None, description="Base64 big-endian CRC32C of the content, as GCS reports it"
+    )
+    resumable: bool = False
+
+
+class DirectUploadResponseModel(BaseModel):
+    file_id: uuid.UUID
+    upload_url: str
+    method: str
+    headers: dict[str, str]
+    expires_at: datetime
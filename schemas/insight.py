@@ -1,6 +1,9 @@
+import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from schemas.pagination import CursorPaginationBaseModel
 
 
 class InsightGeneratePayloadModel(BaseModel):
@@ -13,3 +16,20 @@ class InsightResponseModel(BaseModel):
     response: str
     created_at: datetime
     updated_at: datetime
+
+
+class InsightModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    prompt: str
+    # Left out of listings unless requested.
+    data: str | None = None
+    file_id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+class PaginatedInsightResponseModel(CursorPaginationBaseModel):
+    data: list[InsightModel]
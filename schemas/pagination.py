@@ -1,7 +1,31 @@
+from fastapi import HTTPException, Query, status
 from pydantic import BaseModel, Field
 
+from repositories.pagination import Cursor
 
-class PaginationBaseModel(BaseModel):
+
+class CursorPaginationBaseModel(BaseModel):
     limit: int = Field(10, ge=1)
+    next_cursor: str | None = None
+
+
+class PaginationBaseModel(CursorPaginationBaseModel):
     offset: int = Field(0, ge=0)
-    total: int = Field(..., ge=0)
+    # None when the request passed include_total=false.
+    total: int | None = Field(None, ge=0)
+    total_is_estimate: bool = False
+
+
+def get_cursor(
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page"
+    ),
+) -> Cursor | None:
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
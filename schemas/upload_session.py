@@ -0,0 +1,47 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 128 * 1024 * 1024
+# The largest object GCS stores.
+MAX_UPLOAD_SIZE = 5 * 1024**4
+
+
+class UploadSessionCreateModel(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255)
+    mime_type: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., ge=1, le=MAX_UPLOAD_SIZE)
+    chunk_size: int | None = Field(None, ge=MIN_CHUNK_SIZE, le=MAX_CHUNK_SIZE)
+
+
+class ByteRangeModel(BaseModel):
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0, description="Exclusive end offset")
+
+
+class UploadSessionResponseModel(BaseModel):
+    id: uuid.UUID
+    file_name: str
+    mime_type: str
+    size: int
+    chunk_size: int
+    total_chunks: int
+    status: str
+    received_bytes: int
+    received_ranges: list[ByteRangeModel]
+    missing_chunks: list[int] = Field(
+        ..., description="The lowest missing chunk indexes, at most 1000"
+    )
+    file_id: uuid.UUID | None = None
+    expires_at: datetime
+    created_at: datetime
+    updated_at: datetime
+
+
+class UploadChunkResponseModel(BaseModel):
+    index: int
+    offset: int
+    size: int
+    crc32c: str
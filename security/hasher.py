@@ -0,0 +1,84 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, TypeVar
+
+from metrics.registry import registry
+from security.password import get_password_hash, verify_password
+
+T = TypeVar("T")
+
+queue_depth = registry.gauge(
+    "password_hash_queue_depth",
+    "Password hashes waiting for a free slot in the hashing pool",
+)
+wait_seconds = registry.histogram(
+    "password_hash_wait_seconds",
+    "Time password hashes spend queued before they are submitted",
+)
+hash_seconds = registry.histogram(
+    "password_hash_seconds",
+    "Duration of bcrypt hashing and verification",
+    ("operation",),
+)
+rejections = registry.counter(
+    "password_hash_rejections_total",
+    "Password hashes rejected because the queue wait timed out",
+)
+
+
+class HasherSaturatedError(Exception):
+    """Raised when a password hash could not start within the queue timeout."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded process pool.
+
+    Each hash burns a few hundred milliseconds of CPU, so it runs in worker
+    processes rather than on the event loop. At most max_concurrency hashes
+    are in flight; callers that cannot get a slot within queue_timeout
+    seconds are turned away instead of piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_concurrency: int, queue_timeout: float):
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Spawned workers do not inherit the parent's threads and locks.
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def hash(self, password: str | bytes) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(
+        self, plain_password: str | bytes, hashed_password: str | bytes
+    ) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        submitted_at = time.perf_counter()
+        queue_depth.inc()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            rejections.inc()
+            raise HasherSaturatedError("Password hashing is saturated") from None
+        finally:
+            queue_depth.dec()
+
+        started_at = time.perf_counter()
+        wait_seconds.observe(started_at - submitted_at)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._semaphore.release()
+            hash_seconds.labels(operation=fn.__name__).observe(
+                time.perf_counter() - started_at
+            )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,42 @@
+import hashlib
+import hmac
+import secrets
+
+from configs.settings import settings
+
+
+def generate_secret() -> str:
+    """Returns 256 random bits, URL-safe encoded."""
+    return secrets.token_urlsafe(32)
+
+
+def token_digest(secret: str) -> str:
+    """HMAC-SHA256 of a high-entropy token secret, as stored in the database.
+
+    The secrets are random rather than user-chosen, so a keyed hash is as
+    safe to store as bcrypt output and takes microseconds to check.
+    """
+    key = (settings.TOKEN_DIGEST_KEY or settings.JWT_SECRET_KEY).encode()
+    return hmac.new(key, secret.encode(), hashlib.sha256).hexdigest()
+
+
+def digests_match(expected: str | None, actual: str) -> bool:
+    return expected is not None and hmac.compare_digest(expected, actual)
+
+
+API_KEY_SCHEME = "fd"
+
+
+def generate_api_key() -> tuple[str, str]:
+    """Returns (prefix, key); the prefix is stored in clear for lookup."""
+    prefix = secrets.token_hex(6)
+    return prefix, f"{API_KEY_SCHEME}_{prefix}_{generate_secret()}"
+
+
+def api_key_prefix(key: str) -> str | None:
+    """Returns the lookup prefix if key is shaped like an API key."""
+    scheme, _, rest = key.partition("_")
+    prefix, _, secret = rest.partition("_")
+    if scheme != API_KEY_SCHEME or len(prefix) != 12 or not secret:
+        return None
+    return prefix
@@ -0,0 +1,66 @@
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.principals import get_principal_cache
+from models.api_key import ApiKey
+from models.mixins import utcnow
+from models.user import User
+from repositories.api_key import ApiKeyRepository
+from repositories.unit_of_work import on_commit, transactional
+from security.tokens import (api_key_prefix, digests_match, generate_api_key,
+                             token_digest)
+
+
+class ApiKeyService:
+    """API keys of the form "fd_<prefix>_<secret>".
+
+    Only an HMAC digest of the key is stored, found through its indexed
+    prefix, so authenticating a key costs one lookup and a keyed hash.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.api_key_repo = ApiKeyRepository(db)
+        self.principals = get_principal_cache()
+
+    @staticmethod
+    def principal_cache_key(key_digest: str) -> tuple[str, str]:
+        return ("api_key", key_digest)
+
+    @transactional
+    async def create_key(self, user_id: uuid.UUID, name: str) -> tuple[ApiKey, str]:
+        """Returns the new key's record and the key itself, shown only once."""
+        prefix, key = generate_api_key()
+        api_key = await self.api_key_repo.add(
+            ApiKey(
+                user_id=user_id, name=name, prefix=prefix, key_digest=token_digest(key)
+            )
+        )
+        return api_key, key
+
+    async def get_keys(self, user_id: uuid.UUID) -> list[ApiKey]:
+        return await self.api_key_repo.get_by_user_id(user_id)
+
+    @transactional
+    async def revoke_key(self, key_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        api_key = await self.api_key_repo.get_by_id(key_id, user_id)
+        if not api_key:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="API key not found"
+            )
+        api_key.revoked_at = utcnow()
+        await self.api_key_repo.update(api_key)
+        cache_key = self.principal_cache_key(api_key.key_digest)
+        on_commit(self.db, lambda: self.principals.discard(cache_key))
+
+    async def authenticate(self, key: str) -> User | None:
+        """Returns the user the key belongs to, or None if it is not valid."""
+        prefix = api_key_prefix(key)
+        if prefix is None:
+            return None
+        row = await self.api_key_repo.get_active_with_user(prefix)
+        if row is None or not digests_match(row.ApiKey.key_digest, token_digest(key)):
+            return None
+        return row.User
@@ -0,0 +1,117 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.principals import TokenClaims
+from auth.revocation import get_revocation_list, jti_key
+from configs.settings import settings
+from models.auth_session import AuthSession
+from models.mixins import utcnow
+from models.user import User
+from repositories.auth_session import AuthSessionRepository
+from repositories.revoked_token import RevokedTokenRepository
+from repositories.unit_of_work import UnitOfWork, on_commit, transactional
+from repositories.user import UserRepository
+from security.tokens import digests_match, generate_secret, token_digest
+from services.user import UserService
+
+
+class AuthSessionService:
+    """Issues and rotates refresh tokens of the form "<session id>.<secret>".
+
+    Only an HMAC digest of the secret is stored, so refreshing costs a
+    primary key lookup and a keyed hash instead of a bcrypt verification.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.session_repo = AuthSessionRepository(db)
+        self.user_repo = UserRepository(db)
+        self.revoked_token_repo = RevokedTokenRepository(db)
+
+    @staticmethod
+    def _invalid_token() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    def _parse(self, refresh_token: str) -> tuple[uuid.UUID, str]:
+        session_id, _, secret = refresh_token.partition(".")
+        try:
+            if not secret:
+                raise ValueError("Missing secret")
+            return uuid.UUID(session_id), token_digest(secret)
+        except ValueError:
+            raise self._invalid_token()
+
+    @transactional
+    async def create_session(self, user_id: uuid.UUID) -> str:
+        secret = generate_secret()
+        auth_session = await self.session_repo.add(
+            AuthSession(
+                user_id=user_id,
+                token_digest=token_digest(secret),
+                expires_at=utcnow()
+                + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            )
+        )
+        return f"{auth_session.id}.{secret}"
+
+    @transactional
+    async def register(
+        self, username: str, email: str, password: str
+    ) -> tuple[User, str]:
+        """Registers a user and opens their first session in one transaction."""
+        user = await UserService(self.db).register(
+            username=username, email=email, password=password
+        )
+        return user, await self.create_session(user.id)
+
+    @transactional
+    async def login(self, email: str, password: str) -> tuple[User, str]:
+        user = await UserService(self.db).login(email=email, password=password)
+        return user, await self.create_session(user.id)
+
+    async def refresh(self, refresh_token: str) -> tuple[User, str]:
+        """Exchanges a refresh token for the user and its successor token.
+
+        Each token works once. Presenting one that was already exchanged
+        means it leaked, so the whole session is revoked.
+        """
+        session_id, digest = self._parse(refresh_token)
+        secret = generate_secret()
+        user = None
+        # Not @transactional: a replay must commit the revocation and still fail.
+        async with UnitOfWork(self.db):
+            auth_session = await self.session_repo.get_active(session_id)
+            if auth_session and digests_match(auth_session.previous_digest, digest):
+                await self.session_repo.revoke(session_id)
+            elif auth_session and digests_match(auth_session.token_digest, digest):
+                new_digest = token_digest(secret)
+                if await self.session_repo.rotate(session_id, digest, new_digest):
+                    user = await self.user_repo.get_by_id(auth_session.user_id)
+        if user is None:
+            raise self._invalid_token()
+        return user, f"{session_id}.{secret}"
+
+    @transactional
+    async def revoke(
+        self, refresh_token: str, access_claims: TokenClaims | None = None
+    ) -> None:
+        """Ends the session and, when given, the access token presented with it."""
+        session_id, digest = self._parse(refresh_token)
+        auth_session = await self.session_repo.get_active(session_id)
+        if auth_session and digests_match(auth_session.token_digest, digest):
+            await self.session_repo.revoke(session_id)
+
+        if access_claims is None or access_claims.jti is None:
+            return
+        key = jti_key(access_claims.jti)
+        await self.revoked_token_repo.revoke(
+            key,
+            expires_at=datetime.fromtimestamp(access_claims.expires_at, timezone.utc),
+        )
+        revocations = get_revocation_list()
+        on_commit(self.db, lambda: revocations.add(key))
@@ -0,0 +1,126 @@
+import secrets
+from typing import AsyncIterator, BinaryIO
+from urllib.parse import quote
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+
+from configs.storage import get_storage_executor
+from models.blob import Blob
+from models.file import File
+from storage.base import StorageBackend
+from storage.ranges import (
+    RangeNotSatisfiableError,
+    http_date,
+    if_range_matches,
+    parse_range_header,
+)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadService:
+    """Serves file content with Range, If-Range and multipart/byteranges."""
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+        self.executor = get_storage_executor()
+
+    @staticmethod
+    def _etag(blob: Blob) -> str:
+        # Blobs are immutable, so their content hash is a strong validator.
+        return f'"{blob.sha256 or blob.id}"'
+
+    async def _open(self, blob: Blob) -> BinaryIO:
+        try:
+            return await self.executor.run(self.storage.open_read, blob.storage_key)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+
+    async def _stream(
+        self,
+        reader: BinaryIO,
+        parts: list[tuple[bytes, int, int]],
+        trailer: bytes = b"",
+    ) -> AsyncIterator[bytes]:
+        try:
+            for header, start, length in parts:
+                if header:
+                    yield header
+                async for chunk in self.executor.iter_read(
+                    reader, start=start, length=length, chunk_size=CHUNK_SIZE
+                ):
+                    yield chunk
+            if trailer:
+                yield trailer
+        finally:
+            await self.executor.run(reader.close)
+
+    async def file_response(
+        self, file: File, range_header: str | None, if_range: str | None
+    ) -> Response:
+        blob = file.blob
+        size = blob.size
+        media_type = file.mime_type or "application/octet-stream"
+        etag = self._etag(blob)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": etag,
+            "Last-Modified": http_date(blob.created_at),
+            "Content-Disposition": f"inline; filename*=UTF-8''{quote(file.name)}",
+        }
+
+        ranges = None
+        if if_range_matches(if_range, etag, blob.created_at):
+            try:
+                ranges = parse_range_header(range_header, size)
+            except RangeNotSatisfiableError:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={**headers, "Content-Range": f"bytes */{size}"},
+                )
+
+        reader = await self._open(blob)
+
+        if ranges is None:
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(
+                self._stream(reader, [(b"", 0, size)]),
+                media_type=media_type,
+                headers=headers,
+            )
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                self._stream(reader, [(b"", start, end - start + 1)]),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers,
+            )
+
+        boundary = secrets.token_hex(16)
+        parts = []
+        for index, (start, end) in enumerate(ranges):
+            # Every delimiter after the first ends the previous part's body.
+            delimiter = f"\r\n--{boundary}" if index else f"--{boundary}"
+            header = (
+                f"{delimiter}\r\n"
+                f"Content-Type: {media_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+            ).encode()
+            parts.append((header, start, end - start + 1))
+        trailer = f"\r\n--{boundary}--\r\n".encode()
+        headers["Content-Length"] = str(
+            sum(len(header) + length for header, _, length in parts) + len(trailer)
+        )
+        return StreamingResponse(
+            self._stream(reader, parts, trailer),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=f"multipart/byteranges; boundary={boundary}",
+            headers=headers,
+        )
@@ -1,146 +1,620 @@
-from datetime import timedelta
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException, UploadFile, status
-from google.cloud import storage
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.principals import Principal, TokenClaims
 from configs.settings import settings
-from models.file import File
+from configs.storage import get_signed_url_cache, get_storage_executor
+from models.blob import Blob
+from models.file import File, FileStatus
+from repositories.blob import BlobRepository
 from repositories.file import FileRepository
+from repositories.pagination import Cursor, Page
+from repositories.unit_of_work import transactional
+from storage.base import SignedURLRequest, StorageBackend
+from storage.checksums import Checksums, checksum_stream
 
 
 class FileService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, storage: StorageBackend):
+        self.db = db
         self.file_repo = FileRepository(db)
+        self.blob_repo = BlobRepository(db)
+        self.storage = storage
+        self.executor = get_storage_executor()
+        self.url_cache = get_signed_url_cache()
 
-    def _upload_to_gcs(self, file_name: str, file: UploadFile):
-        client = storage.Client()
-        bucket = client.bucket(bucket_name=settings.GCS_BUCKET_NAME)
-        blob = bucket.blob(file_name)
-        blob.upload_from_file(file.file, content_type=file.content_type)
-
-    def _generate_signed_url(
-        self, file_name: str, expiration: int = 2 * 60 * 60
-    ) -> str:
-        client = storage.Client()
-        bucket = client.bucket(bucket_name=settings.GCS_BUCKET_NAME)
-        blob = bucket.blob(file_name)
-        expiration = timedelta(seconds=expiration)
-        return blob.generate_signed_url(
-            expiration=expiration, response_disposition="inline"
-        )
-
-    async def upload_file(self, user_id: str, file: UploadFile) -> File:
-        file_name = f"{user_id}-{file.filename}"
-        self._upload_to_gcs(file_name=file_name, file=file)
-
-        file.file.seek(0)
-        content = await file.read()
-        file_size = len(content)
-        extension = file.filename.split(".")[-1]
-        mime_type = file.content_type
+    async def _upload_to_storage(self, storage_key: str, file: UploadFile) -> Checksums:
+        return await self.executor.run(
+            self.storage.upload,
+            storage_key,
+            file.file,
+            content_type=file.content_type,
+            chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        )
+
+    @staticmethod
+    def _url_request(storage_key: str, mime_type: str) -> SignedURLRequest:
+        return SignedURLRequest(
+            storage_key, disposition="inline", content_type=mime_type
+        )
+
+    async def _generate_signed_urls(
+        self, requests: list[SignedURLRequest]
+    ) -> list[str]:
+        """Serves cached URLs and signs the misses in a single storage call."""
+        urls = [self.url_cache.get(request) for request in requests]
+        misses = [index for index, url in enumerate(urls) if url is None]
+        if not misses:
+            return urls
+
+        expiration = settings.SIGNED_URL_EXPIRATION_SECONDS
+        signed = await self.executor.run(
+            self.storage.generate_signed_urls,
+            [requests[index] for index in misses],
+            expiration=expiration,
+        )
+        for index, url in zip(misses, signed):
+            self.url_cache.set(requests[index], url, expiration)
+            urls[index] = url
+        return urls
+
+    async def _generate_signed_url(self, file: File) -> str:
+        request = self._url_request(file.blob.storage_key, file.mime_type)
+        return (await self._generate_signed_urls([request]))[0]
+
+    async def _to_responses(self, files: list[File]) -> list[dict]:
+        urls = await self._generate_signed_urls(
+            [self._url_request(file.blob.storage_key, file.mime_type) for file in files]
+        )
+        return [self._to_response(file, url) for file, url in zip(files, urls)]
+
+    def _to_response(self, file: File, url: str) -> dict:
+        return {
+            "id": file.id,
+            "name": file.name,
+            "extension": file.extension,
+            "mime_type": file.mime_type,
+            "size": file.size,
+            "sha256": file.blob.sha256,
+            "crc32c": file.blob.crc32c,
+            "url": url,
+            "created_at": file.created_at,
+            "updated_at": file.updated_at,
+        }
+
+    async def _summaries_to_responses(self, summaries: list) -> list[dict]:
+        """Renders FILE_SUMMARY rows, which carry the blob columns inline."""
+        urls = await self._generate_signed_urls(
+            [
+                self._url_request(summary.storage_key, summary.mime_type)
+                for summary in summaries
+            ]
+        )
+        return [
+            {
+                "id": summary.id,
+                "name": summary.name,
+                "extension": summary.extension,
+                "mime_type": summary.mime_type,
+                "size": summary.size,
+                "sha256": summary.sha256,
+                "crc32c": summary.crc32c,
+                "url": url,
+                "created_at": summary.created_at,
+                "updated_at": summary.updated_at,
+            }
+            for summary, url in zip(summaries, urls)
+        ]
+
+    async def _find_blob(self, sha256: str | None) -> Blob | None:
+        """Returns the blob already holding this content, with a new reference taken."""
+        if sha256 is None:
+            return None
+        blob = await self.blob_repo.get_by_sha256(sha256)
+        if blob and await self.blob_repo.add_reference(blob.id):
+            return blob
+        return None
 
+    async def _add_file(
+        self, user_id: str, file_name: str, mime_type: str, blob: Blob
+    ) -> dict:
         new_file = File(
             name=file_name,
             user_id=user_id,
-            extension=extension,
+            extension=file_name.split(".")[-1],
             mime_type=mime_type,
-            size=file_size,
+            size=blob.size,
+            blob=blob,
         )
-
-        url = self._generate_signed_url(file_name)
         result = await self.file_repo.add(new_file)
+        return self._to_response(result, await self._generate_signed_url(result))
+
+    @transactional
+    async def create_file(
+        self,
+        user_id: str,
+        file_name: str,
+        mime_type: str,
+        storage_key: str,
+        checksums: Checksums,
+    ) -> dict:
+        """Adds a file whose content has just been written to storage_key.
+
+        If identical content is already stored, including by a concurrent
+        upload that committed first, the new object is discarded and the
+        file references the existing blob instead.
+        """
+        blob = await self._find_blob(checksums.sha256)
+        if blob is None:
+            new_blob = Blob(
+                sha256=checksums.sha256,
+                crc32c=checksums.crc32c,
+                size=checksums.size,
+                storage_key=storage_key,
+                ref_count=1,
+            )
+            try:
+                async with self.db.begin_nested():
+                    return await self._add_file(
+                        user_id, file_name, mime_type, new_blob
+                    )
+            except IntegrityError:
+                blob = await self._find_blob(checksums.sha256)
+                if blob is None:
+                    await self._delete_from_storage(storage_key)
+                    raise
+
+        await self._delete_from_storage(storage_key)
+        return await self._add_file(user_id, file_name, mime_type, blob)
+
+    @transactional
+    async def upload_file(self, user_id: str, file: UploadFile) -> dict:
+        # Hashing the spooled upload first turns duplicates into
+        # metadata-only inserts with no storage traffic at all.
+        checksums = await self.executor.run(
+            checksum_stream, file.file, chunk_size=settings.UPLOAD_CHUNK_SIZE
+        )
+        blob = await self._find_blob(checksums.sha256)
+        if blob is not None:
+            return await self._add_file(user_id, file.filename, file.content_type, blob)
 
+        storage_key = Blob.new_storage_key()
+        checksums = await self._upload_to_storage(storage_key=storage_key, file=file)
+        return await self.create_file(
+            user_id=user_id,
+            file_name=file.filename,
+            mime_type=file.content_type,
+            storage_key=storage_key,
+            checksums=checksums,
+        )
+
+    async def _add_files_individually(
+        self,
+        user_id: str,
+        files: list[UploadFile],
+        groups: dict[str, list[int]],
+        keys: dict[str, str],
+        checksums: dict[str, Checksums],
+    ) -> dict[int, dict]:
+        """Fallback for a batch that lost a race with a concurrent upload."""
+        added = {}
+        for sha256, indexes in groups.items():
+            for position, index in enumerate(indexes):
+                file = files[index]
+                if position == 0 and sha256 in keys:
+                    added[index] = await self.create_file(
+                        user_id=user_id,
+                        file_name=file.filename,
+                        mime_type=file.content_type,
+                        storage_key=keys[sha256],
+                        checksums=checksums[sha256],
+                    )
+                    continue
+                blob = await self._find_blob(sha256)
+                if blob is not None:
+                    added[index] = await self._add_file(
+                        user_id, file.filename, file.content_type, blob
+                    )
+        return added
+
+    @transactional
+    async def upload_files(self, user_id: str, files: list[UploadFile]) -> dict:
+        """Uploads many files in one request.
+
+        Content is hashed and written to storage concurrently, at most
+        BULK_UPLOAD_CONCURRENCY at a time, and only once per distinct
+        content. All file rows are then inserted in a single transaction.
+        Results are returned per file, in request order.
+        """
+        if len(files) > settings.BULK_UPLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.BULK_UPLOAD_MAX_FILES} files can be uploaded at once",
+            )
+        semaphore = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+
+        async def bounded(fn, *args, **kwargs):
+            async with semaphore:
+                return await self.executor.run(fn, *args, **kwargs)
+
+        errors: dict[int, str] = {
+            index: "File name is required"
+            for index, file in enumerate(files)
+            if not file.filename
+        }
+        pending = [index for index in range(len(files)) if index not in errors]
+        hashed = await asyncio.gather(
+            *(
+                bounded(
+                    checksum_stream,
+                    files[index].file,
+                    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+                )
+                for index in pending
+            )
+        )
+
+        # Identical files in the batch, or already stored, are written once.
+        groups: dict[str, list[int]] = {}
+        checksums: dict[str, Checksums] = {}
+        for index, result in zip(pending, hashed):
+            groups.setdefault(result.sha256, []).append(index)
+            checksums[result.sha256] = result
+        blobs = {
+            blob.sha256: blob
+            for blob in await self.blob_repo.get_by_sha256s(list(groups))
+        }
+
+        keys = {
+            sha256: Blob.new_storage_key() for sha256 in groups if sha256 not in blobs
+        }
+        uploads = await asyncio.gather(
+            *(
+                bounded(
+                    self.storage.upload,
+                    key,
+                    files[groups[sha256][0]].file,
+                    content_type=files[groups[sha256][0]].content_type,
+                    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+                )
+                for sha256, key in keys.items()
+            ),
+            return_exceptions=True,
+        )
+        for sha256, result in zip(list(keys), uploads):
+            if isinstance(result, Exception):
+                errors.update(
+                    {index: "Failed to store file" for index in groups.pop(sha256)}
+                )
+                del keys[sha256]
+                continue
+            blobs[sha256] = Blob(
+                sha256=sha256,
+                crc32c=result.crc32c,
+                size=result.size,
+                storage_key=keys[sha256],
+                ref_count=0,
+            )
+
+        new_files = {}
+        try:
+            async with self.db.begin_nested():
+                for sha256, indexes in groups.items():
+                    blob = blobs[sha256]
+                    if sha256 in keys:
+                        blob.ref_count = len(indexes)
+                    elif not await self.blob_repo.add_reference(
+                        blob.id, count=len(indexes)
+                    ):
+                        continue
+                    for index in indexes:
+                        new_files[index] = File(
+                            name=files[index].filename,
+                            user_id=user_id,
+                            extension=files[index].filename.split(".")[-1],
+                            mime_type=files[index].content_type,
+                            size=blob.size,
+                            blob=blob,
+                        )
+                if new_files:
+                    await self.file_repo.add_all(list(new_files.values()))
+            added = dict(
+                zip(new_files, await self._to_responses(list(new_files.values())))
+            )
+        except IntegrityError:
+            added = await self._add_files_individually(
+                user_id, files, groups, keys, checksums
+            )
+
+        results = [
+            {
+                "file_name": file.filename or "",
+                "file": added.get(index),
+                "error": (
+                    None
+                    if index in added
+                    # Content deleted by a concurrent request; safe to retry.
+                    else errors.get(index, "File could not be saved, retry")
+                ),
+            }
+            for index, file in enumerate(files)
+        ]
         return {
-            "id": result.id,
-            "name": result.name,
-            "extension": result.extension,
-            "mime_type": result.mime_type,
-            "size": result.size,
-            "url": url,
-            "created_at": result.created_at,
-            "updated_at": result.updated_at,
+            "data": results,
+            "uploaded": len(added),
+            "failed": len(files) - len(added),
+        }
+
+    @transactional
+    async def create_direct_upload(
+        self,
+        user_id: str,
+        file_name: str,
+        mime_type: str,
+        size: int,
+        crc32c: str | None = None,
+        resumable: bool = False,
+    ) -> dict:
+        """Creates a pending file and a URL to upload its content straight to storage.
+
+        The file stays pending, and out of every listing, until
+        finalize_direct_upload has verified the uploaded object.
+        """
+        storage_key = Blob.new_storage_key()
+        now = datetime.now(tz=timezone.utc)
+        try:
+            if resumable:
+                url = await self.executor.run(
+                    self.storage.create_resumable_upload_url,
+                    storage_key,
+                    size=size,
+                    content_type=mime_type,
+                )
+                headers = {}
+                expires_at = now + timedelta(hours=settings.DIRECT_UPLOAD_TTL_HOURS)
+            else:
+                expiration = settings.DIRECT_UPLOAD_URL_EXPIRATION_SECONDS
+                url, headers = await self.executor.run(
+                    self.storage.generate_upload_url,
+                    storage_key,
+                    expiration=expiration,
+                    size=size,
+                    content_type=mime_type,
+                )
+                expires_at = now + timedelta(seconds=expiration)
+        except NotImplementedError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This upload type is not supported by the storage backend",
+            )
+
+        # The blob records the declared size and checksum until finalize.
+        blob = Blob(
+            sha256=None,
+            crc32c=crc32c,
+            size=size,
+            storage_key=storage_key,
+            ref_count=1,
+        )
+        file = await self.file_repo.add(
+            File(
+                name=file_name,
+                user_id=user_id,
+                extension=file_name.split(".")[-1],
+                mime_type=mime_type,
+                size=size,
+                blob=blob,
+                status=FileStatus.PENDING.value,
+            )
+        )
+        return {
+            "file_id": file.id,
+            "upload_url": url,
+            "method": "PUT",
+            "headers": headers,
+            "expires_at": expires_at,
         }
 
+    async def receive_direct_upload(
+        self,
+        storage_key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str | None = None,
+    ) -> None:
+        """Writes the body of a signed upload URL served by the app itself.
+
+        The URL only ever creates the object of a file that is still pending:
+        the write is create-only, so of two concurrent PUTs one is refused,
+        and neither can overwrite content finalize has verified. The body is
+        cut off just past the size the client declared.
+        """
+        used = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The upload URL has already been used",
+        )
+        size = await self.file_repo.get_pending_upload_size(storage_key)
+        # Refuses most reuse before reading the body; the write decides races.
+        if size is None or await self.executor.run(self.storage.exists, storage_key):
+            raise used
+
+        received = 0
+        try:
+            async with self.executor.open_write(
+                self.storage, storage_key, content_type=content_type, create_only=True
+            ) as writer:
+                async for chunk in chunks:
+                    received += len(chunk)
+                    if received > size:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"The upload exceeds its declared size of {size} bytes",
+                        )
+                    await writer.write(chunk)
+        except FileExistsError:
+            raise used
+
+    @transactional
+    async def finalize_direct_upload(self, file_id: str, user: TokenClaims) -> dict:
+        """Verifies the uploaded object against the declared size and CRC32C.
+
+        On success the file becomes available; content already stored under
+        the same SHA-256 (when the backend can tell) is deduplicated and the
+        uploaded copy left for the purger.
+        """
+        file = await self.file_repo.get_by_id(file_id, status=FileStatus.PENDING.value)
+        if not file or file.user_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+
+        blob = file.blob
+        try:
+            checksums = await self.executor.run(self.storage.checksum, blob.storage_key)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="File content has not been uploaded",
+            )
+        if checksums.size != blob.size or (
+            blob.crc32c and checksums.crc32c != blob.crc32c
+        ):
+            await self._delete_from_storage(blob.storage_key)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded content does not match the declared size or checksum",
+            )
+
+        # Of two concurrent finalizes only the first counts the file.
+        if not await self.file_repo.make_available(file.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+        blob.crc32c = checksums.crc32c
+        existing = await self._find_blob(checksums.sha256)
+        if existing is not None:
+            file.blob = existing
+            blob.ref_count = 0
+        else:
+            blob.sha256 = checksums.sha256
+
+        try:
+            async with self.db.begin_nested():
+                file = await self.file_repo.update(file)
+        except IntegrityError:
+            # Identical content was finalized concurrently; keep a separate blob.
+            file = await self.file_repo.get_by_id(file_id)
+            file.blob.crc32c = checksums.crc32c
+            file = await self.file_repo.update(file)
+        return self._to_response(file, await self._generate_signed_url(file))
+
     async def get_files_by_user_id(
-        self, user_id: str, limit: int, offset: int
-    ) -> list[File]:
-        files = await self.file_repo.get_by_user_id(user_id, limit=limit, offset=offset)
-        result = []
-
-        for file in files:
-            url = self._generate_signed_url(file.name)
-            result.append(
-                {
-                    "id": file.id,
-                    "name": file.name,
-                    "extension": file.extension,
-                    "mime_type": file.mime_type,
-                    "size": file.size,
-                    "url": url,
-                    "created_at": file.created_at,
-                    "updated_at": file.updated_at,
-                }
-            )
-        return result
-
-    async def get_files_count_by_user_id(self, user_id: str) -> int:
-        return await self.file_repo.get_file_count(user_id=user_id)
-
-    async def get_all_files(self, limit: int, offset: int) -> list[File]:
-        files = await self.file_repo.get_all(limit=limit, offset=offset)
-        result = []
-
-        for file in files:
-            url = self._generate_signed_url(file.name)
-            result.append(
-                {
-                    "id": file.id,
-                    "name": file.name,
-                    "extension": file.extension,
-                    "mime_type": file.mime_type,
-                    "size": file.size,
-                    "url": url,
-                    "created_at": file.created_at,
-                    "updated_at": file.updated_at,
-                }
-            )
-        return result
-
-    async def get_files_count(self) -> int:
-        return await self.file_repo.get_file_count()
-
-    def _delete_from_gcs(self, file_name: str):
-        client = storage.Client()
-        bucket = client.bucket(bucket_name=settings.GCS_BUCKET_NAME)
-        blob = bucket.blob(file_name)
-        blob.delete()
+        self,
+        user_id: str,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        include_total: bool = True,
+    ) -> Page:
+        page = await self.file_repo.get_by_user_id(
+            user_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total,
+        )
+        return page._replace(items=await self._summaries_to_responses(page.items))
+
+    async def get_all_files(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        include_total: bool = True,
+    ) -> Page:
+        page = await self.file_repo.get_all(
+            limit=limit, offset=offset, cursor=cursor, include_total=include_total
+        )
+        return page._replace(items=await self._summaries_to_responses(page.items))
+
+    async def _delete_from_storage(self, storage_key: str):
+        await self.executor.run(self.storage.delete, storage_key)
 
+    @transactional
     async def delete_file_by_id(self, file_id: str):
-        file = await self.file_repo.get_by_id(file_id)
+        """Moves the file to the trash; the purger removes it later."""
+        if not await self.file_repo.soft_delete(
+            [file_id], deleted_at=datetime.now(tz=timezone.utc)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
 
-        if not file:
+    @transactional
+    async def delete_files(self, file_ids: list, user: Principal) -> int:
+        """Moves many files to the trash in one statement.
+
+        Files the user does not own are skipped unless the user is an admin.
+        """
+        if len(file_ids) > settings.BULK_DELETE_MAX_FILES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.BULK_DELETE_MAX_FILES} files can be deleted at once",
+            )
+        return await self.file_repo.soft_delete(
+            file_ids,
+            deleted_at=datetime.now(tz=timezone.utc),
+            user_id=None if user.is_admin else user.id,
+        )
+
+    @transactional
+    async def restore_file(self, file_id: str, user: Principal) -> dict:
+        file = await self.file_repo.get_by_id(file_id, include_deleted=True)
+        if (
+            not file
+            or file.deleted_at is None
+            or (file.user_id != user.id and not user.is_admin)
+        ):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
             )
-        self._delete_from_gcs(file.name)
 
-        await self.file_repo.delete(file=file)
+        deleted_after = datetime.now(tz=timezone.utc) - timedelta(
+            days=settings.FILE_TRASH_RETENTION_DAYS
+        )
+        deleted_at = file.deleted_at
+        if deleted_at.tzinfo is None:
+            deleted_at = deleted_at.replace(tzinfo=timezone.utc)
+        if deleted_at < deleted_after:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="File is past the restore window",
+            )
 
-    async def get_file_by_id(self, file_id: str) -> File:
+        if not await self.file_repo.restore(file.id, deleted_after=deleted_after):
+            # Restored or purged concurrently.
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+        return self._to_response(file, await self._generate_signed_url(file))
+
+    async def get_file_for_user(self, file_id: str, user: Principal) -> File:
+        """Returns the file if user owns it or is an admin."""
+        file = await self.file_repo.get_by_id(file_id)
+        if not file or (file.user_id != user.id and not user.is_admin):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+        return file
+
+    async def get_file_by_id(self, file_id: str) -> dict:
         file = await self.file_repo.get_by_id(file_id)
         if not file:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
             )
-        url = self._generate_signed_url(file.name)
-        return {
-            "id": file.id,
-            "name": file.name,
-            "extension": file.extension,
-            "mime_type": file.mime_type,
-            "size": file.size,
-            "url": url,
-            "created_at": file.created_at,
-            "updated_at": file.updated_at,
-        }
+        return self._to_response(file, await self._generate_signed_url(file))
@@ -24,7 +24,7 @@ class GeminiService:
 
     def get_gemini_response(self, prompt: str, file: File) -> list[str]:
         file_uri = (
-            f"gs://file-drive-uploads-{settings.GOOGLE_CLOUD_PROJECT}/{file.name}"
+            f"gs://file-drive-uploads-{settings.GOOGLE_CLOUD_PROJECT}/{file.blob.storage_key}"
         )
         file = Part.from_uri(uri=file_uri, mime_type=file.mime_type)
         contents = [prompt, file]
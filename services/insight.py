@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from configs.settings import settings
 from repositories.file import FileRepository
 from repositories.insight import InsightRepository
+from repositories.pagination import Cursor
+from repositories.unit_of_work import transactional
 from services.gemini import GeminiService
 
 
@@ -17,6 +19,7 @@ class InsightService:
         self.file_repo = FileRepository(db)
         self.gemini_service = GeminiService()
 
+    @transactional
     async def generate_insight(self, prompt, file_id: str):
         file = await self.file_repo.get_by_id(file_id)
         if not file:
@@ -34,6 +37,7 @@ class InsightService:
 
         return result
 
+    @transactional
     async def save_insight(
         self, insight_data: str, prompt: str, user_id: str, file_id: str
     ):
@@ -48,9 +52,17 @@ class InsightService:
         )
         return new_insight
 
-    async def get_insights_by_file_id(self, file_id: str):
-        insights = await self.insight_repo.get_insights_by_file_id(file_id)
-        if not insights:
+    async def get_insights_by_file_id(
+        self,
+        file_id: str,
+        limit: int,
+        cursor: Cursor | None = None,
+        include_data: bool = False,
+    ):
+        insights = await self.insight_repo.get_insights_by_file_id(
+            file_id, limit=limit, cursor=cursor, include_data=include_data
+        )
+        if not insights and cursor is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Insights not found"
             )
@@ -64,6 +76,7 @@ class InsightService:
             )
         return insight
 
+    @transactional
     async def delete_insight_by_id(self, insight_id: uuid.UUID):
         insight = await self.insight_repo.get_by_id(insight_id)
         if not insight:
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.database import AsyncSessionLocal
+from configs.settings import settings
+from configs.storage import get_storage, get_storage_executor
+from metrics.registry import registry
+from models.upload_session import UploadSessionStatus
+from repositories.auth_session import AuthSessionRepository
+from repositories.blob import BlobRepository
+from repositories.file import FileRepository
+from repositories.rate_limit import RateLimitRepository
+from repositories.revoked_token import RevokedTokenRepository
+from repositories.unit_of_work import UnitOfWork, transactional
+from repositories.upload_session import UploadSessionRepository
+from storage.base import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_SECONDS = 0.5
+
+files_purged = registry.counter(
+    "files_purged_total", "Trashed files deleted permanently"
+)
+blobs_purged = registry.counter(
+    "blobs_purged_total", "Unreferenced blobs removed from storage"
+)
+purge_failures = registry.counter(
+    "storage_purge_failures_total",
+    "Objects that could not be deleted after every retry",
+)
+
+
+class PurgeService:
+    """Permanently removes trashed files and the blobs nothing references."""
+
+    def __init__(self, db: AsyncSession, storage: StorageBackend):
+        self.db = db
+        self.file_repo = FileRepository(db)
+        self.blob_repo = BlobRepository(db)
+        self.revoked_token_repo = RevokedTokenRepository(db)
+        self.auth_session_repo = AuthSessionRepository(db)
+        self.rate_limit_repo = RateLimitRepository(db)
+        self.upload_session_repo = UploadSessionRepository(db)
+        self.storage = storage
+        self.executor = get_storage_executor()
+
+    @transactional
+    async def purge_expired_files(self) -> int:
+        """Deletes one batch of expired files.
+
+        Covers trashed files past their restore window and direct uploads
+        that were never finalized.
+        """
+        now = datetime.now(tz=timezone.utc)
+        deleted_before = now - timedelta(days=settings.FILE_TRASH_RETENTION_DAYS)
+        pending_before = now - timedelta(hours=settings.DIRECT_UPLOAD_TTL_HOURS)
+        files = await self.file_repo.get_expired(
+            deleted_before=deleted_before,
+            pending_before=pending_before,
+            limit=settings.PURGE_BATCH_SIZE,
+        )
+        if not files:
+            return 0
+
+        # Release references only for the rows this purger deleted itself;
+        # another worker may have purged some of the same files meanwhile.
+        blob_ids = await self.file_repo.delete_expired(
+            [file.id for file in files],
+            deleted_before=deleted_before,
+            pending_before=pending_before,
+        )
+        for blob_id, count in Counter(blob_ids).items():
+            await self.blob_repo.remove_reference(blob_id, count=count)
+        files_purged.inc(len(blob_ids))
+        return len(files)
+
+    async def purge_expired_upload_sessions(self) -> int:
+        """Deletes one batch of expired upload sessions and their chunk objects.
+
+        Sessions whose chunks still fail to delete after every retry are kept
+        and retried on the next run. Returns how many sessions were deleted.
+        """
+        sessions = await self.upload_session_repo.get_expired(
+            expired_before=datetime.now(tz=timezone.utc),
+            limit=settings.PURGE_BATCH_SIZE,
+        )
+        chunk_names = {
+            upload_session.id: [
+                upload_session.chunk_object_name(index)
+                for index in range(upload_session.total_chunks)
+            ]
+            # Completing a session already deleted its chunks.
+            if upload_session.status == UploadSessionStatus.ACTIVE.value
+            else []
+            for upload_session in sessions
+        }
+        names = [name for group in chunk_names.values() for name in group]
+        failed = set(await self._delete_objects(names)) if names else set()
+        purge_failures.inc(len(failed))
+
+        deleted = [
+            session_id
+            for session_id, group in chunk_names.items()
+            if failed.isdisjoint(group)
+        ]
+        if deleted:
+            async with UnitOfWork(self.db):
+                await self.upload_session_repo.delete_many(deleted)
+        return len(deleted)
+
+    @transactional
+    async def purge_expired_revocations(self) -> int:
+        """Deletes revocations of tokens that have expired anyway."""
+        return await self.revoked_token_repo.delete_expired()
+
+    @transactional
+    async def purge_expired_auth_sessions(self) -> int:
+        """Deletes login sessions that expired or were revoked."""
+        return await self.auth_session_repo.delete_expired()
+
+    @transactional
+    async def purge_idle_rate_limits(self) -> int:
+        """Deletes shared rate limit buckets that have filled up again."""
+        return await self.rate_limit_repo.delete_idle(time.time())
+
+    async def _delete_objects(self, names: list[str]) -> list[str]:
+        failed = names
+        for attempt in range(settings.PURGE_MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            failed = await self.executor.run(self.storage.delete_many, failed)
+            if not failed:
+                break
+        return failed
+
+    async def purge_unreferenced_blobs(self) -> int:
+        """Removes one batch of unreferenced blobs from storage and the database.
+
+        Blobs whose objects still fail after every retry stay claimed and are
+        retried on the next run.
+        """
+        # The claim is committed before any object is deleted.
+        async with UnitOfWork(self.db):
+            blobs = await self.blob_repo.claim_unreferenced(
+                limit=settings.PURGE_BATCH_SIZE
+            )
+        if not blobs:
+            return 0
+
+        failed = set(await self._delete_objects([blob.storage_key for blob in blobs]))
+        purge_failures.inc(len(failed))
+        deleted = [blob.id for blob in blobs if blob.storage_key not in failed]
+        if deleted:
+            async with UnitOfWork(self.db):
+                await self.blob_repo.delete_claimed(deleted)
+        blobs_purged.inc(len(deleted))
+        return len(deleted)
+
+    async def run_once(self):
+        while await self.purge_expired_files() == settings.PURGE_BATCH_SIZE:
+            pass
+        while await self.purge_unreferenced_blobs() == settings.PURGE_BATCH_SIZE:
+            pass
+        batch_size = settings.PURGE_BATCH_SIZE
+        while await self.purge_expired_upload_sessions() == batch_size:
+            pass
+        await self.purge_expired_revocations()
+        await self.purge_expired_auth_sessions()
+        await self.purge_idle_rate_limits()
+
+
+async def run_purger(stop: asyncio.Event):
+    """Runs the purge every PURGE_INTERVAL_SECONDS until stop is set."""
+    while not stop.is_set():
+        try:
+            async with AsyncSessionLocal() as db:
+                await PurgeService(db, get_storage()).run_once()
+        except Exception:
+            logger.exception("Purge run failed; retrying next interval")
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.PURGE_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,252 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from configs.storage import get_storage_executor
+from models.blob import Blob
+from models.upload_session import UploadChunk, UploadSession, UploadSessionStatus
+from repositories.unit_of_work import transactional
+from repositories.upload_session import UploadSessionRepository
+from services.file import FileService
+from storage.base import StorageBackend
+from storage.checksums import ChecksumAccumulator
+
+# Bounds the response however many chunks a session is split into; clients
+# upload these and ask again.
+MAX_MISSING_CHUNKS = 1000
+
+
+def missing_chunks(total_chunks: int, received: list[int]) -> list[int]:
+    """The lowest chunk indexes not in received, which must be sorted."""
+    missing = []
+    expected = 0
+    for index in [*received, total_chunks]:
+        missing.extend(range(expected, index)[: MAX_MISSING_CHUNKS - len(missing)])
+        if len(missing) == MAX_MISSING_CHUNKS:
+            break
+        expected = index + 1
+    return missing
+
+
+class UploadSessionService:
+    def __init__(self, db: AsyncSession, storage: StorageBackend):
+        self.db = db
+        self.session_repo = UploadSessionRepository(db)
+        self.file_service = FileService(db, storage)
+        self.storage = storage
+        self.executor = get_storage_executor()
+
+    async def _get_session(self, session_id: str, user_id: str) -> UploadSession:
+        upload_session = await self.session_repo.get_by_id(session_id)
+        if not upload_session or upload_session.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found",
+            )
+        return upload_session
+
+    async def _get_active_session(self, session_id: str, user_id: str) -> UploadSession:
+        upload_session = await self._get_session(session_id, user_id)
+
+        if upload_session.status != UploadSessionStatus.ACTIVE:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload session is already completed",
+            )
+
+        expires_at = upload_session.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at < datetime.now(tz=timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE, detail="Upload session has expired"
+            )
+        return upload_session
+
+    def _delete_object(self, name: str):
+        try:
+            self.storage.delete(name)
+        except FileNotFoundError:
+            pass
+
+    async def _delete_chunk_objects(self, upload_session: UploadSession):
+        await asyncio.gather(
+            *(
+                self.executor.run(
+                    self._delete_object, upload_session.chunk_object_name(index)
+                )
+                for index in range(upload_session.total_chunks)
+            )
+        )
+
+    def _to_response(
+        self, upload_session: UploadSession, chunks: list[UploadChunk]
+    ) -> dict:
+        ranges = []
+        for chunk in chunks:
+            if ranges and ranges[-1]["end"] == chunk.offset:
+                ranges[-1]["end"] += chunk.size
+            else:
+                ranges.append({"start": chunk.offset, "end": chunk.offset + chunk.size})
+
+        return {
+            "id": upload_session.id,
+            "file_name": upload_session.file_name,
+            "mime_type": upload_session.mime_type,
+            "size": upload_session.size,
+            "chunk_size": upload_session.chunk_size,
+            "total_chunks": upload_session.total_chunks,
+            "status": upload_session.status,
+            "received_bytes": sum(chunk.size for chunk in chunks),
+            "received_ranges": ranges,
+            "missing_chunks": missing_chunks(
+                upload_session.total_chunks, [chunk.index for chunk in chunks]
+            ),
+            "file_id": upload_session.file_id,
+            "expires_at": upload_session.expires_at,
+            "created_at": upload_session.created_at,
+            "updated_at": upload_session.updated_at,
+        }
+
+    @transactional
+    async def create_session(
+        self,
+        user_id: str,
+        file_name: str,
+        mime_type: str,
+        size: int,
+        chunk_size: int | None = None,
+    ) -> dict:
+        new_session = UploadSession(
+            user_id=user_id,
+            file_name=file_name,
+            mime_type=mime_type,
+            size=size,
+            chunk_size=chunk_size or settings.UPLOAD_CHUNK_SIZE,
+            status=UploadSessionStatus.ACTIVE.value,
+            expires_at=datetime.now(tz=timezone.utc)
+            + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+        )
+        result = await self.session_repo.add(new_session)
+        return self._to_response(result, [])
+
+    async def get_session(self, session_id: str, user_id: str) -> dict:
+        upload_session = await self._get_session(session_id, user_id)
+        chunks = await self.session_repo.get_chunks(upload_session.id)
+        return self._to_response(upload_session, chunks)
+
+    @transactional
+    async def upload_chunk(
+        self,
+        session_id: str,
+        user_id: str,
+        index: int,
+        offset: int,
+        stream: AsyncIterator[bytes],
+        crc32c: str | None = None,
+    ) -> UploadChunk:
+        upload_session = await self._get_active_session(session_id, user_id)
+
+        if index >= upload_session.total_chunks:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Chunk index is out of range",
+            )
+        if offset != index * upload_session.chunk_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Chunk offset does not match its index",
+            )
+
+        expected_size = upload_session.chunk_length(index)
+        accumulator = ChecksumAccumulator()
+
+        # Raising inside the writer discards the partially written chunk.
+        async with self.executor.open_write(
+            self.storage,
+            upload_session.chunk_object_name(index),
+            content_type="application/octet-stream",
+        ) as writer:
+            async for data in stream:
+                accumulator.update(data)
+                if accumulator.size > expected_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Chunk must be exactly {expected_size} bytes",
+                    )
+                await writer.write(data)
+
+            checksums = accumulator.result()
+            if checksums.size != expected_size:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Chunk must be exactly {expected_size} bytes",
+                )
+            if crc32c and crc32c != checksums.crc32c:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Chunk checksum mismatch",
+                )
+
+        return await self.session_repo.save_chunk(
+            UploadChunk(
+                session_id=upload_session.id,
+                index=index,
+                offset=offset,
+                size=checksums.size,
+                crc32c=checksums.crc32c,
+            )
+        )
+
+    @transactional
+    async def complete_session(self, session_id: str, user_id: str) -> dict:
+        upload_session = await self._get_active_session(session_id, user_id)
+        chunks = await self.session_repo.get_chunks(upload_session.id)
+
+        if len(chunks) != upload_session.total_chunks:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Upload is missing chunks",
+            )
+
+        # Of two concurrent completes only one assembles the file; a failure
+        # rolls the claim back with everything else.
+        if not await self.session_repo.mark_completed(upload_session.id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload session is already completed",
+            )
+
+        storage_key = Blob.new_storage_key()
+        checksums = await self.executor.run(
+            self.storage.compose,
+            storage_key,
+            [upload_session.chunk_object_name(chunk.index) for chunk in chunks],
+            content_type=upload_session.mime_type,
+            chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        )
+        file = await self.file_service.create_file(
+            user_id=user_id,
+            file_name=upload_session.file_name,
+            mime_type=upload_session.mime_type,
+            storage_key=storage_key,
+            checksums=checksums,
+        )
+
+        await self._delete_chunk_objects(upload_session)
+        await self.session_repo.delete_chunks(upload_session.id)
+        upload_session.file_id = file["id"]
+        await self.session_repo.update(upload_session)
+
+        return file
+
+    @transactional
+    async def abort_session(self, session_id: str, user_id: str):
+        upload_session = await self._get_session(session_id, user_id)
+        await self._delete_chunk_objects(upload_session)
+        await self.session_repo.delete_chunks(upload_session.id)
+        await self.session_repo.delete(upload_session)
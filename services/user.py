@@ -1,18 +1,69 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytz
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.principals import get_principal_cache
+from auth.revocation import get_revocation_list, user_key
+from configs.security import get_password_hasher
+from configs.settings import settings
+from models.mixins import utcnow
 from models.user import User
+from repositories.auth_session import AuthSessionRepository
+from repositories.blob import BlobRepository
+from repositories.pagination import Cursor, Page
+from repositories.revoked_token import RevokedTokenRepository
+from repositories.unit_of_work import on_commit, transactional
 from repositories.user import UserRepository
-from security.password import get_password_hash, verify_password
+from security.hasher import HasherSaturatedError
 
 
 class UserService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.user_repo = UserRepository(db)
+        self.blob_repo = BlobRepository(db)
+        self.session_repo = AuthSessionRepository(db)
+        self.revoked_token_repo = RevokedTokenRepository(db)
+        self.principals = get_principal_cache()
+        self.hasher = get_password_hasher()
+
+    def _invalidate_principal(self, user_id) -> None:
+        on_commit(self.db, lambda: self.principals.invalidate(user_id))
+
+    async def _revoke_access_tokens(self, user_id) -> None:
+        """Revokes every access token issued to the user until now."""
+        key = user_key(user_id)
+        await self.revoked_token_repo.revoke(
+            key,
+            expires_at=utcnow()
+            + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+        revocations = get_revocation_list()
+        on_commit(self.db, lambda: revocations.add(key))
+
+    async def _hash_password(self, password: str) -> str:
+        try:
+            return await self.hasher.hash(password)
+        except HasherSaturatedError:
+            raise self._hasher_busy()
+
+    async def _verify_password(self, password: str, password_hash: str) -> bool:
+        try:
+            return await self.hasher.verify(password, password_hash)
+        except HasherSaturatedError:
+            raise self._hasher_busy()
+
+    @staticmethod
+    def _hasher_busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again shortly",
+            headers={"Retry-After": "1"},
+        )
 
+    @transactional
     async def register(
         self, username: str, email: str, password: str, is_admin: bool = False
     ) -> User:
@@ -27,12 +78,13 @@ class UserService:
         new_user = User(
             email=email,
             username=username,
-            password_hash=get_password_hash(password),
+            password_hash=await self._hash_password(password),
             is_admin=is_admin,
         )
 
         return await self.user_repo.add(new_user)
 
+    @transactional
     async def login(self, email: str, password: str) -> User:
         user = await self.user_repo.get_by_email(email)
         if not user:
@@ -40,16 +92,17 @@ class UserService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Wrong email or password",
             )
-        if not verify_password(password, user.password_hash):
+        if not await self._verify_password(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Wrong email or password",
             )
         user.last_login_at = datetime.now(pytz.utc)
+        self._invalidate_principal(user.id)
         return await self.user_repo.update(user)
 
-    async def get_by_id(self, user_id: str) -> User:
-        user = await self.user_repo.get_by_id(user_id)
+    async def get_by_id(self, user_id: str, read_replica: bool = False) -> User:
+        user = await self.user_repo.get_by_id(user_id, read_replica=read_replica)
 
         if not user:
             raise HTTPException(
@@ -57,24 +110,49 @@ class UserService:
             )
         return user
 
-    async def get_all(self, limit: int, offset: int) -> list[User]:
-        return await self.user_repo.get_all(limit=limit, offset=offset)
-
-    async def get_count(self) -> int:
-        return await self.user_repo.get_count()
+    async def get_all(
+        self, limit: int, offset: int = 0, cursor: Cursor | None = None
+    ) -> list[User]:
+        return await self.user_repo.get_all(limit=limit, offset=offset, cursor=cursor)
+
+    async def get_page(
+        self,
+        limit: int,
+        offset: int = 0,
+        cursor: Cursor | None = None,
+        include_total: bool = True,
+    ) -> Page:
+        return await self.user_repo.get_page(
+            limit=limit, offset=offset, cursor=cursor, include_total=include_total
+        )
 
+    @transactional
     async def change_password(
         self, user: User, old_password: str, new_password: str
     ) -> User:
-        if not verify_password(old_password, user.password_hash):
+        # Callers may pass the cached principal; the hash lives on the row.
+        user = await self.get_by_id(user.id)
+        if not await self._verify_password(old_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Old password is incorrect",
             )
 
-        user.password_hash = get_password_hash(new_password)
+        user.password_hash = await self._hash_password(new_password)
+        # Sessions and access tokens issued with the old password stop working.
+        await self.session_repo.revoke_all_for_user(user.id)
+        await self._revoke_access_tokens(user.id)
+        self._invalidate_principal(user.id)
+        return await self.user_repo.update(user)
+
+    @transactional
+    async def set_admin(self, user_id: str, is_admin: bool) -> User:
+        user = await self.get_by_id(user_id)
+        user.is_admin = is_admin
+        self._invalidate_principal(user.id)
         return await self.user_repo.update(user)
 
+    @transactional
     async def delete_user_by_id(self, user_id: str) -> None:
         user = await self.user_repo.get_by_id(user_id)
         if not user:
@@ -82,5 +160,9 @@ class UserService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
+        # The user's files go with the user through the foreign key cascade;
+        # their blob references are released in the same transaction.
+        await self.blob_repo.release_user_references(user.id)
         await self.user_repo.delete(user)
+        self._invalidate_principal(user.id)
         return None
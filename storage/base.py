@@ -0,0 +1,226 @@
+import hashlib
+import hmac
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, ContextManager
+from urllib.parse import quote, urlencode
+
+from storage.checksums import (
+    DEFAULT_CHUNK_SIZE,
+    ChecksumAccumulator,
+    Checksums,
+    copy_stream,
+)
+
+
+@dataclass(frozen=True)
+class SignedURLRequest:
+    name: str
+    disposition: str = "inline"
+    content_type: str | None = None
+
+
+class StorageBackend(ABC):
+    """Interface every object storage engine implements.
+
+    Methods are blocking; callers running on the event loop are responsible
+    for dispatching them off the loop.
+    """
+
+    @abstractmethod
+    def open_write(
+        self, name: str, content_type: str | None = None, create_only: bool = False
+    ) -> ContextManager[BinaryIO]:
+        """Returns a writer that commits the object only when it exits cleanly.
+
+        With create_only the commit raises FileExistsError rather than replace
+        an object that exists by then, checked atomically with the write.
+        """
+
+    def upload(
+        self,
+        name: str,
+        file: BinaryIO,
+        content_type: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Checksums:
+        """Streams file into the object in chunk_size pieces.
+
+        Memory use is bounded by the chunk size whatever the size of the file.
+        """
+        with self.open_write(name, content_type=content_type) as writer:
+            return copy_stream(file, writer, chunk_size=chunk_size)
+
+    def compose(
+        self,
+        name: str,
+        sources: list[str],
+        content_type: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Checksums:
+        """Concatenates sources, in order, into a new object.
+
+        The default implementation streams every source through a single
+        writer, so only one chunk is held in memory at a time.
+        """
+        accumulator = ChecksumAccumulator()
+        with self.open_write(name, content_type=content_type) as writer:
+            for source in sources:
+                with self.open_read(source) as reader:
+                    while chunk := reader.read(chunk_size):
+                        accumulator.update(chunk)
+                        writer.write(chunk)
+        return accumulator.result()
+
+    @abstractmethod
+    def open_read(self, name: str) -> BinaryIO: ...
+
+    @abstractmethod
+    def exists(self, name: str) -> bool: ...
+
+    @abstractmethod
+    def delete(self, name: str) -> None: ...
+
+    def delete_many(self, names: list[str]) -> list[str]:
+        """Deletes objects, treating ones already gone as deleted.
+
+        Returns the names that could not be deleted so callers can retry
+        them; backends with a batch API override this.
+        """
+        failed = []
+        for name in names:
+            try:
+                self.delete(name)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                failed.append(name)
+        return failed
+
+    @abstractmethod
+    def generate_signed_url(
+        self,
+        name: str,
+        expiration: int,
+        disposition: str = "inline",
+        content_type: str | None = None,
+    ) -> str: ...
+
+    def generate_upload_url(
+        self,
+        name: str,
+        expiration: int,
+        size: int,
+        content_type: str | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        """Returns a URL the client PUTs the object to, and headers it must send."""
+        raise NotImplementedError
+
+    def create_resumable_upload_url(
+        self, name: str, size: int, content_type: str | None = None
+    ) -> str:
+        """Starts a resumable upload the client continues without credentials."""
+        raise NotImplementedError
+
+    def checksum(self, name: str) -> Checksums:
+        """Checksums a stored object; the default reads it back in chunks."""
+        accumulator = ChecksumAccumulator()
+        with self.open_read(name) as reader:
+            while chunk := reader.read(DEFAULT_CHUNK_SIZE):
+                accumulator.update(chunk)
+        return accumulator.result()
+
+    def generate_signed_urls(
+        self, requests: list[SignedURLRequest], expiration: int
+    ) -> list[str]:
+        """Signs a batch of URLs in one call, e.g. a whole page of a listing."""
+        return [
+            self.generate_signed_url(
+                request.name,
+                expiration=expiration,
+                disposition=request.disposition,
+                content_type=request.content_type,
+            )
+            for request in requests
+        ]
+
+    def verify_signature(
+        self,
+        name: str,
+        expires: int,
+        disposition: str,
+        content_type: str | None,
+        signature: str,
+        method: str = "GET",
+    ) -> bool:
+        """Backends whose URLs are not served by this app never accept one."""
+        return False
+
+
+class SignedURLStorageBackend(StorageBackend):
+    """Base for backends whose downloads are served by the app itself.
+
+    URLs point at the storage router and carry an HMAC-SHA256 signature over
+    the HTTP method, object name, expiry, disposition and content type.
+    """
+
+    def __init__(self, signing_key: str, base_url: str):
+        self._signing_key = signing_key.encode()
+        self._base_url = base_url.rstrip("/")
+
+    def _sign(
+        self,
+        name: str,
+        expires: int,
+        disposition: str,
+        content_type: str | None,
+        method: str = "GET",
+    ) -> str:
+        message = "\n".join(
+            [method, name, str(expires), disposition, content_type or ""]
+        )
+        return hmac.new(self._signing_key, message.encode(), hashlib.sha256).hexdigest()
+
+    def generate_signed_url(
+        self,
+        name: str,
+        expiration: int,
+        disposition: str = "inline",
+        content_type: str | None = None,
+    ) -> str:
+        expires = int(time.time()) + expiration
+        params = {"expires": expires, "disposition": disposition}
+        if content_type:
+            params["content_type"] = content_type
+        params["signature"] = self._sign(name, expires, disposition, content_type)
+        return f"{self._base_url}/{quote(name)}?{urlencode(params)}"
+
+    def generate_upload_url(
+        self,
+        name: str,
+        expiration: int,
+        size: int,
+        content_type: str | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        expires = int(time.time()) + expiration
+        params = {"expires": expires}
+        if content_type:
+            params["content_type"] = content_type
+        params["signature"] = self._sign(name, expires, "", content_type, "PUT")
+        headers = {"Content-Type": content_type} if content_type else {}
+        return f"{self._base_url}/{quote(name)}?{urlencode(params)}", headers
+
+    def verify_signature(
+        self,
+        name: str,
+        expires: int,
+        disposition: str,
+        content_type: str | None,
+        signature: str,
+        method: str = "GET",
+    ) -> bool:
+        if expires < time.time():
+            return False
+        expected = self._sign(name, expires, disposition, content_type, method)
+        return hmac.compare_digest(expected, signature)
@@ -0,0 +1,63 @@
+import base64
+import hashlib
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import google_crc32c
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Checksums:
+    size: int
+    sha256: str | None
+    crc32c: str
+
+
+class ChecksumAccumulator:
+    """Tracks byte count, SHA-256 and CRC32C over a stream of chunks.
+
+    CRC32C is reported base64-encoded in big-endian order, the same format
+    Google Cloud Storage uses for object metadata.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._crc32c = google_crc32c.Checksum()
+
+    def update(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._sha256.update(chunk)
+        self._crc32c.update(chunk)
+
+    def result(self) -> Checksums:
+        return Checksums(
+            size=self.size,
+            sha256=self._sha256.hexdigest(),
+            crc32c=base64.b64encode(self._crc32c.digest()).decode(),
+        )
+
+
+def copy_stream(
+    source: BinaryIO, destination: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Checksums:
+    """Copies source into destination one chunk at a time, checksumming as it goes."""
+    accumulator = ChecksumAccumulator()
+    while chunk := source.read(chunk_size):
+        accumulator.update(chunk)
+        destination.write(chunk)
+    return accumulator.result()
+
+
+def checksum_stream(
+    source: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Checksums:
+    """Checksums a seekable source and rewinds it to where it started."""
+    start = source.tell()
+    accumulator = ChecksumAccumulator()
+    while chunk := source.read(chunk_size):
+        accumulator.update(chunk)
+    source.seek(start)
+    return accumulator.result()
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Callable, TypeVar
+
+from metrics.registry import registry
+from storage.base import StorageBackend
+
+T = TypeVar("T")
+
+queue_depth = registry.gauge(
+    "storage_executor_queue_depth",
+    "Storage calls submitted to the executor and waiting for a worker",
+)
+active_calls = registry.gauge(
+    "storage_executor_active", "Storage calls currently running on a worker"
+)
+wait_seconds = registry.histogram(
+    "storage_executor_wait_seconds",
+    "Time storage calls spend queued before a worker picks them up",
+)
+call_seconds = registry.histogram(
+    "storage_call_seconds", "Duration of blocking storage calls", ("operation",)
+)
+
+
+class StorageExecutor:
+    """Runs blocking storage calls on a dedicated, bounded thread pool.
+
+    Keeping storage I/O off both the event loop and the default executor
+    means a slow bucket cannot starve request handling or other
+    run_in_executor users.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        operation = getattr(fn, "__name__", "call")
+        submitted_at = time.perf_counter()
+        queue_depth.inc()
+
+        def call() -> T:
+            started_at = time.perf_counter()
+            queue_depth.dec()
+            active_calls.inc()
+            wait_seconds.observe(started_at - submitted_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                active_calls.dec()
+                call_seconds.labels(operation=operation).observe(
+                    time.perf_counter() - started_at
+                )
+
+        future = self._executor.submit(call)
+        # A call cancelled while queued never runs to take itself off the queue.
+        future.add_done_callback(
+            lambda future: queue_depth.dec() if future.cancelled() else None
+        )
+        return await asyncio.wrap_future(future)
+
+    @asynccontextmanager
+    async def open_write(
+        self,
+        storage: StorageBackend,
+        name: str,
+        content_type: str | None = None,
+        buffer_size: int = 1024 * 1024,
+        create_only: bool = False,
+    ) -> AsyncIterator["AsyncStorageWriter"]:
+        """Async counterpart of StorageBackend.open_write.
+
+        Entering, writing and committing all happen on the storage executor;
+        an exception inside the block discards the object as the backend
+        would.
+        """
+        context = storage.open_write(
+            name, content_type=content_type, create_only=create_only
+        )
+        writer = AsyncStorageWriter(
+            self, await self.run(context.__enter__), buffer_size
+        )
+        try:
+            yield writer
+            await writer.flush()
+        except BaseException as exc:
+            await self.run(context.__exit__, type(exc), exc, exc.__traceback__)
+            raise
+        await self.run(context.__exit__, None, None, None)
+
+    async def iter_read(
+        self,
+        reader: BinaryIO,
+        start: int | None = None,
+        length: int | None = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """Yields length bytes of reader from start, one chunk per executor hop.
+
+        Reads from the current position when start is None and to the end of
+        the stream when length is None. Only a single chunk is held in memory
+        at a time.
+        """
+        if start is not None:
+            await self.run(reader.seek, start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = await self.run(reader.read, size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncStorageWriter:
+    """Buffers small writes so each executor hop carries up to buffer_size bytes."""
+
+    def __init__(self, executor: StorageExecutor, writer: BinaryIO, buffer_size: int):
+        self._executor = executor
+        self._writer = writer
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+
+    async def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._buffer:
+            data, self._buffer = bytes(self._buffer), bytearray()
+            await self._executor.run(self._writer.write, data)
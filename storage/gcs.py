@@ -0,0 +1,225 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import BinaryIO, Iterator
+
+import google.auth
+from google.api_core.exceptions import NotFound, PreconditionFailed
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage as gcs
+from google.cloud.storage.batch import Batch
+from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+
+from storage.base import StorageBackend
+from storage.checksums import DEFAULT_CHUNK_SIZE, Checksums
+
+# Resumable upload chunks must be a multiple of 256 KiB.
+GCS_CHUNK_ALIGNMENT = 256 * 1024
+# Maximum number of source objects accepted by a single compose request.
+GCS_MAX_COMPOSE_SOURCES = 32
+# Maximum number of calls in a single batch request.
+GCS_MAX_BATCH_SIZE = 100
+
+
+class _ResultBatch(Batch):
+    """A batch that keeps the per-call responses finish() returns.
+
+    Used as a context manager, a batch discards them, and with
+    raise_exception=False a failed call is otherwise indistinguishable.
+    """
+
+    def finish(self, raise_exception: bool = True) -> list:
+        self.responses = super().finish(raise_exception=raise_exception)
+        return self.responses
+
+
+_client: gcs.Client | None = None
+_client_lock = threading.Lock()
+
+
+def get_client(pool_size: int) -> gcs.Client:
+    """Returns the process-wide client, creating it on first use.
+
+    The client's HTTP session keeps up to pool_size keep-alive connections
+    so every storage executor thread can reuse one instead of reconnecting.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            credentials, _ = google.auth.default(scopes=gcs.Client.SCOPE)
+            session = AuthorizedSession(credentials)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            _client = gcs.Client(credentials=credentials, _http=session)
+    return _client
+
+
+class GCSStorageBackend(StorageBackend):
+    def __init__(
+        self,
+        bucket_name: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pool_size: int = 10,
+        signing_credentials_file: str | None = None,
+    ):
+        self.bucket_name = bucket_name
+        self.pool_size = pool_size
+        # With a service account key URLs are signed locally with RSA instead
+        # of a signBlob round trip to IAM for every URL.
+        self.signing_credentials = (
+            service_account.Credentials.from_service_account_file(
+                signing_credentials_file
+            )
+            if signing_credentials_file
+            else None
+        )
+        self.chunk_size = max(
+            GCS_CHUNK_ALIGNMENT, chunk_size - chunk_size % GCS_CHUNK_ALIGNMENT
+        )
+
+    @property
+    def bucket(self) -> gcs.Bucket:
+        return get_client(self.pool_size).bucket(bucket_name=self.bucket_name)
+
+    @contextmanager
+    def open_write(
+        self, name: str, content_type: str | None = None, create_only: bool = False
+    ) -> Iterator[BinaryIO]:
+        blob = self.bucket.blob(name)
+        writer = blob.open(
+            "wb",
+            chunk_size=self.chunk_size,
+            ignore_flush=True,
+            content_type=content_type,
+            if_generation_match=0 if create_only else None,
+        )
+        # An unfinished resumable session is discarded by GCS, so on error the
+        # writer is deliberately left unclosed rather than committing a partial
+        # object.
+        try:
+            yield writer
+            writer.close()
+        except PreconditionFailed:
+            raise FileExistsError(name) from None
+
+    def compose(
+        self,
+        name: str,
+        sources: list[str],
+        content_type: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Checksums:
+        """Composes server-side, folding sources into the destination 32 at a time.
+
+        GCS only reports a CRC32C for composite objects, so sha256 is None.
+        """
+        bucket = self.bucket
+        destination = bucket.blob(name)
+        destination.content_type = content_type
+        pending = [bucket.blob(source) for source in sources]
+
+        destination.compose(pending[:GCS_MAX_COMPOSE_SOURCES])
+        pending = pending[GCS_MAX_COMPOSE_SOURCES:]
+        while pending:
+            batch = pending[: GCS_MAX_COMPOSE_SOURCES - 1]
+            pending = pending[GCS_MAX_COMPOSE_SOURCES - 1 :]
+            destination.compose([destination, *batch])
+
+        destination.reload()
+        return Checksums(size=destination.size, sha256=None, crc32c=destination.crc32c)
+
+    def open_read(self, name: str) -> BinaryIO:
+        blob = self.bucket.blob(name)
+        try:
+            return blob.open("rb")
+        except NotFound:
+            raise FileNotFoundError(name)
+
+    def exists(self, name: str) -> bool:
+        return self.bucket.blob(name).exists()
+
+    def delete(self, name: str) -> None:
+        try:
+            self.bucket.blob(name).delete()
+        except NotFound:
+            raise FileNotFoundError(name)
+
+    def delete_many(self, names: list[str]) -> list[str]:
+        """Deletes objects with batch requests of up to 100 deletes each."""
+        client = get_client(self.pool_size)
+        bucket = self.bucket
+        failed = []
+        for start in range(0, len(names), GCS_MAX_BATCH_SIZE):
+            group = names[start : start + GCS_MAX_BATCH_SIZE]
+            batch = _ResultBatch(client, raise_exception=False)
+            try:
+                with batch:
+                    for name in group:
+                        bucket.delete_blob(name)
+            except Exception:
+                failed.extend(group)
+                continue
+            # finish() returns one response per deferred call, in order.
+            for name, response in zip(group, batch.responses):
+                if not (
+                    200 <= response.status_code < 300 or response.status_code == 404
+                ):
+                    failed.append(name)
+        return failed
+
+    def generate_upload_url(
+        self,
+        name: str,
+        expiration: int,
+        size: int,
+        content_type: str | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        # GCS rejects the PUT unless the body is exactly size bytes, and
+        # unless the object does not exist yet, so the URL cannot overwrite
+        # content that has been finalized.
+        headers = {
+            "x-goog-content-length-range": f"{size},{size}",
+            "x-goog-if-generation-match": "0",
+        }
+        url = self.bucket.blob(name).generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expiration),
+            method="PUT",
+            content_type=content_type,
+            headers=headers,
+            credentials=self.signing_credentials,
+        )
+        if content_type:
+            headers["Content-Type"] = content_type
+        return url, headers
+
+    def create_resumable_upload_url(
+        self, name: str, size: int, content_type: str | None = None
+    ) -> str:
+        blob = self.bucket.blob(name, chunk_size=self.chunk_size)
+        return blob.create_resumable_upload_session(
+            content_type=content_type, size=size
+        )
+
+    def checksum(self, name: str) -> Checksums:
+        """Reads size and CRC32C from object metadata without downloading it."""
+        blob = self.bucket.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(name)
+        return Checksums(size=blob.size, sha256=None, crc32c=blob.crc32c)
+
+    def generate_signed_url(
+        self,
+        name: str,
+        expiration: int,
+        disposition: str = "inline",
+        content_type: str | None = None,
+    ) -> str:
+        blob = self.bucket.blob(name)
+        return blob.generate_signed_url(
+            expiration=timedelta(seconds=expiration),
+            response_disposition=disposition,
+            response_type=content_type,
+            credentials=self.signing_credentials,
+        )
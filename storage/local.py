@@ -0,0 +1,51 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from storage.base import SignedURLStorageBackend
+
+
+class LocalStorageBackend(SignedURLStorageBackend):
+    """Stores objects as files below a root directory on local disk."""
+
+    def __init__(self, root: str, signing_key: str, base_url: str):
+        super().__init__(signing_key=signing_key, base_url=base_url)
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root) or path == self.root:
+            raise ValueError(f"Invalid object name: {name}")
+        return path
+
+    @contextmanager
+    def open_write(
+        self, name: str, content_type: str | None = None, create_only: bool = False
+    ) -> Iterator[BinaryIO]:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                yield tmp
+            if create_only:
+                # Unlike replace, link fails if the name already exists.
+                os.link(tmp_path, path)
+                os.unlink(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def open_read(self, name: str) -> BinaryIO:
+        return open(self._path(name), "rb")
+
+    def exists(self, name: str) -> bool:
+        return self._path(name).is_file()
+
+    def delete(self, name: str) -> None:
+        self._path(name).unlink()
@@ -0,0 +1,41 @@
+import io
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+from storage.base import SignedURLStorageBackend
+
+
+class InMemoryStorageBackend(SignedURLStorageBackend):
+    """Keeps objects in a process-local dict. Meant for tests and benchmarks."""
+
+    def __init__(self, signing_key: str, base_url: str):
+        super().__init__(signing_key=signing_key, base_url=base_url)
+        self._objects: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open_write(
+        self, name: str, content_type: str | None = None, create_only: bool = False
+    ) -> Iterator[BinaryIO]:
+        buffer = io.BytesIO()
+        yield buffer
+        with self._lock:
+            if create_only and name in self._objects:
+                raise FileExistsError(name)
+            self._objects[name] = buffer.getvalue()
+
+    def open_read(self, name: str) -> BinaryIO:
+        with self._lock:
+            if name not in self._objects:
+                raise FileNotFoundError(name)
+            return io.BytesIO(self._objects[name])
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self._objects
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            if self._objects.pop(name, None) is None:
+                raise FileNotFoundError(name)
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+# More ranges than this in one request is ignored and the whole object is
+# served instead, so a single request cannot fan out into thousands of reads.
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiableError(ValueError):
+    pass
+
+
+def parse_range_header(
+    header: str | None, size: int, max_ranges: int = MAX_RANGES
+) -> list[tuple[int, int]] | None:
+    """Parses a bytes Range header into sorted, coalesced (start, end) pairs.
+
+    Ends are inclusive, as in Content-Range. Returns None when the header is
+    absent, malformed or asks for too many ranges, in which case the whole
+    object is served; raises RangeNotSatisfiableError when no range overlaps
+    the object.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        first, separator, last = part.strip().partition("-")
+        first, last = first.strip(), last.strip()
+        if not separator or (first and not first.isdigit()):
+            return None
+        if last and not last.isdigit():
+            return None
+
+        if first:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = int(last) if last else size - 1
+        elif last:
+            # Suffix range: the final N bytes.
+            if int(last) == 0:
+                continue
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            return None
+
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiableError(header)
+    if len(ranges) > max_ranges:
+        return None
+
+    ranges.sort()
+    coalesced = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = coalesced[-1]
+        if start <= last_end + 1:
+            coalesced[-1] = (last_start, max(last_end, end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+def if_range_matches(if_range: str | None, etag: str, last_modified: datetime) -> bool:
+    """Evaluates If-Range; ranges are only honoured when the validator matches."""
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        # Weak validators never match for ranges.
+        return if_range == etag
+    try:
+        since = parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) == since
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+
+from metrics.registry import registry
+from storage.base import SignedURLRequest
+
+cache_hits = registry.counter(
+    "signed_url_cache_hits_total", "Signed URLs served from the cache"
+)
+cache_misses = registry.counter(
+    "signed_url_cache_misses_total", "Signed URLs that had to be signed"
+)
+
+
+class SignedURLCache:
+    """LRU cache of signed download URLs.
+
+    A URL is reused until reuse_fraction of its lifetime has elapsed, so
+    every URL handed out still has at least (1 - reuse_fraction) of its
+    lifetime left.
+    """
+
+    def __init__(self, max_size: int, reuse_fraction: float):
+        self.max_size = max_size
+        self.reuse_fraction = reuse_fraction
+        self._entries: OrderedDict[SignedURLRequest, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        registry.gauge(
+            "signed_url_cache_size",
+            "Signed URLs currently cached",
+            callback=lambda: len(self._entries),
+        )
+
+    def get(self, request: SignedURLRequest) -> str | None:
+        with self._lock:
+            entry = self._entries.get(request)
+            if entry is not None:
+                url, reuse_until = entry
+                if reuse_until > time.monotonic():
+                    self._entries.move_to_end(request)
+                    cache_hits.inc()
+                    return url
+                del self._entries[request]
+        cache_misses.inc()
+        return None
+
+    def set(self, request: SignedURLRequest, url: str, expiration: int) -> None:
+        reuse_until = time.monotonic() + expiration * self.reuse_fraction
+        with self._lock:
+            self._entries[request] = (url, reuse_until)
+            self._entries.move_to_end(request)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
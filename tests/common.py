@@ -1,8 +1,16 @@
+from datetime import datetime, timedelta, timezone
 from random import randint
 
 from faker import Faker
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.auth import create_access_token
+from configs.settings import settings
+from models.user import User
+from repositories.blob import BlobRepository
 from schemas.user import UserIn
+from services.user import UserService
 
 
 def get_random_user():
@@ -12,3 +20,45 @@ def get_random_user():
     password = faker.password(length=randint(8, 256))
 
     return UserIn(username=username, email=email, password=password)
+
+
+async def register_user(
+    user_service: UserService, is_admin: bool = False
+) -> tuple[User, dict]:
+    """Registers a random user and returns it with its bearer auth headers."""
+    new_user = get_random_user()
+    user = await user_service.register(
+        username=new_user.username,
+        password=new_user.password,
+        email=new_user.email,
+        is_admin=is_admin,
+    )
+    access_token = create_access_token(
+        id=user.id,
+        is_admin=user.is_admin,
+        expires_datetime=datetime.now(timezone.utc) + timedelta(days=1),
+    )
+    return user, {"Authorization": f"Bearer {access_token}"}
+
+
+async def get_auth_headers(user_service: UserService) -> dict:
+    return (await register_user(user_service))[1]
+
+
+async def register_through_api(client: AsyncClient) -> dict:
+    """Registers a random user through the API and returns its auth headers."""
+    new_user = get_random_user()
+    response = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/auth/register",
+        json={
+            "username": new_user.username,
+            "email": new_user.email,
+            "password": new_user.password,
+        },
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def get_storage_key(db: AsyncSession, sha256: str) -> str:
+    blob = await BlobRepository(db).get_by_sha256(sha256)
+    return blob.storage_key
@@ -6,9 +6,12 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from configs.database import Base, get_session
+from configs.rate_limit import get_rate_limiter
 from configs.settings import settings
+from configs.storage import get_storage
 from main import app
 from services.user import UserService
+from storage.memory import InMemoryStorageBackend
 
 engine = create_async_engine(settings.DATABASE_URL_TEST, echo=False)
 
@@ -23,6 +26,8 @@ async def get_db():
 
 
 app.dependency_overrides[get_session] = get_db
+# Tests register and log in far faster than any client should.
+app.dependency_overrides[get_rate_limiter] = lambda: None
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -52,3 +57,13 @@ async def db():
 @pytest.fixture(scope="function", autouse=True)
 def user_service(db: AsyncSession):
     return UserService(db)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def storage():
+    storage = InMemoryStorageBackend(
+        signing_key=settings.JWT_SECRET_KEY,
+        base_url=f"http://test{settings.API_ENDPOINT_PREFIX}/storage",
+    )
+    app.dependency_overrides[get_storage] = lambda: storage
+    return storage
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from admission.controller import AdmissionController
+from configs.admission import get_admission_controller
+from configs.settings import settings
+from main import app
+
+
+@pytest.fixture
+def controller():
+    controller = AdmissionController(
+        settings.API_ENDPOINT_PREFIX, initial=2, min_limit=1, max_limit=10
+    )
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+    yield controller
+    del app.dependency_overrides[get_admission_controller]
+
+
+@pytest.mark.integration
+async def test_full_route_class_is_shed_with_503(
+    client: AsyncClient, controller: AdmissionController
+):
+    metadata = controller.limiters["metadata"]
+    metadata.in_flight = 2
+
+    response = await client.get(f"{settings.API_ENDPOINT_PREFIX}/users/me")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+    # Other route classes and unprefixed paths are still served.
+    response = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/auth/refresh", json={"refresh_token": "x"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert controller.limiters["auth"].in_flight == 0
+    response = await client.get("/health")
+    assert response.status_code == status.HTTP_200_OK
+
+    metadata.in_flight = 0
+    response = await client.get(f"{settings.API_ENDPOINT_PREFIX}/users/me")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert metadata.in_flight == 0
+
+
+@pytest.mark.integration
+async def test_latency_excludes_receiving_the_request_body(
+    client: AsyncClient, controller: AdmissionController
+):
+    limit = controller.limiters["auth"].limit
+    latencies = []
+    limit.update = lambda latency, in_flight: latencies.append(latency)
+
+    async def slow_body():
+        yield b'{"refresh_token": '
+        await asyncio.sleep(0.5)
+        yield b'"x"}'
+
+    response = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/auth/refresh",
+        content=slow_body(),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert len(latencies) == 1
+    assert latencies[0] < 0.5
@@ -0,0 +1,71 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from configs.settings import settings
+from tests.common import register_through_api
+
+
+@pytest.mark.integration
+class TestApiKeys:
+    url = f"{settings.API_ENDPOINT_PREFIX}/api-keys"
+
+    async def test_api_key_authenticates_like_a_token(self, client: AsyncClient):
+        headers = await register_through_api(client)
+        me = (
+            await client.get(
+                f"{settings.API_ENDPOINT_PREFIX}/users/me", headers=headers
+            )
+        ).json()
+
+        response = await client.post(
+            self.url, json={"name": "nightly"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        created = response.json()
+        assert created["key"].startswith(f"fd_{created['prefix']}_")
+
+        key_headers = {"Authorization": f"Bearer {created['key']}"}
+        response = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/users/me", headers=key_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == me["id"]
+
+        # Claims-only endpoints accept keys too.
+        response = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/users/{me['id']}/files",
+            headers=key_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.get(self.url, headers=headers)
+        [listed] = response.json()
+        assert listed["id"] == created["id"]
+        assert "key" not in listed
+
+    async def test_revoked_and_forged_keys_are_rejected(self, client: AsyncClient):
+        headers = await register_through_api(client)
+        created = (
+            await client.post(self.url, json={"name": "ci"}, headers=headers)
+        ).json()
+        me_url = f"{settings.API_ENDPOINT_PREFIX}/users/me"
+
+        forged = created["key"][:-4] + "AAAA"
+        response = await client.get(
+            me_url, headers={"Authorization": f"Bearer {forged}"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        key_headers = {"Authorization": f"Bearer {created['key']}"}
+        response = await client.get(me_url, headers=key_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.delete(f"{self.url}/{created['id']}", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        # Served from the principal cache until the revocation evicted it.
+        response = await client.get(me_url, headers=key_headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = await client.delete(f"{self.url}/{created['id']}", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,8 +1,18 @@
+from unittest import mock
+
 import pytest
 from faker import Faker
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.auth import decode_access_token
+from models.auth_session import AuthSession
+from models.user import User
+from repositories.auth_session import AuthSessionRepository
+from services.purge import PurgeService
+from storage.memory import InMemoryStorageBackend
 from configs.settings import settings
 from tests.common import get_random_user
 
@@ -91,3 +101,209 @@ class TestAuth:
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json()["detail"] == "Wrong email or password"
+
+    async def test_register_rolls_back_without_a_session(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        new_user = get_random_user()
+        payload = {
+            "username": new_user.username,
+            "email": new_user.email,
+            "password": new_user.password,
+        }
+
+        with mock.patch.object(
+            AuthSessionRepository, "add", side_effect=RuntimeError("database down")
+        ):
+            with pytest.raises(RuntimeError):
+                await client.post(
+                    f"{settings.API_ENDPOINT_PREFIX}/auth/register", json=payload
+                )
+
+        result = await db.execute(
+            select(func.count()).select_from(User).where(User.email == new_user.email)
+        )
+        assert result.scalar_one() == 0
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/register", json=payload
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    async def _register(self, client: AsyncClient) -> tuple[dict, dict]:
+        new_user = get_random_user()
+        payload = {
+            "username": new_user.username,
+            "email": new_user.email,
+            "password": new_user.password,
+        }
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/register", json=payload
+        )
+        return payload, response.json()
+
+    async def test_refresh_rotates_without_a_password_check(self, client: AsyncClient):
+        _, tokens = await self._register(client)
+        assert tokens["expires_in"] == settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+        with mock.patch("security.hasher.PasswordHasher._run") as hasher:
+            response = await client.post(
+                f"{settings.API_ENDPOINT_PREFIX}/auth/refresh",
+                json={"refresh_token": tokens["refresh_token"]},
+            )
+        hasher.assert_not_called()
+
+        assert response.status_code == status.HTTP_200_OK
+        refreshed = response.json()
+        assert refreshed["refresh_token"] != tokens["refresh_token"]
+        assert (
+            decode_access_token(refreshed["access_token"])["sub"]
+            == decode_access_token(tokens["access_token"])["sub"]
+        )
+
+        response = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/users/me",
+            headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_replayed_refresh_token_revokes_the_session(
+        self, client: AsyncClient
+    ):
+        _, tokens = await self._register(client)
+        url = f"{settings.API_ENDPOINT_PREFIX}/auth/refresh"
+        response = await client.post(
+            url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        successor = response.json()["refresh_token"]
+
+        response = await client.post(
+            url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        # The legitimate holder is logged out too.
+        response = await client.post(url, json={"refresh_token": successor})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_invalid_refresh_tokens(self, client: AsyncClient):
+        _, tokens = await self._register(client)
+        session_id = tokens["refresh_token"].split(".")[0]
+        url = f"{settings.API_ENDPOINT_PREFIX}/auth/refresh"
+
+        for refresh_token in ["garbage", f"{session_id}.", f"{session_id}.forged"]:
+            response = await client.post(url, json={"refresh_token": refresh_token})
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        # Forged secrets do not revoke the real session.
+        response = await client.post(
+            url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_logout_and_password_change_end_sessions(self, client: AsyncClient):
+        payload, tokens = await self._register(client)
+        url = f"{settings.API_ENDPOINT_PREFIX}/auth/refresh"
+
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/logout",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = await client.post(
+            url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/login",
+            data={"username": payload["email"], "password": payload["password"]},
+        )
+        tokens = response.json()
+        user_id = decode_access_token(tokens["access_token"])["sub"]
+        response = await client.put(
+            f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}/change-password",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+            json={
+                "old_password": payload["password"],
+                "new_password": faker.password(),
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = await client.post(
+            url, json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_logout_revokes_the_access_token(self, client: AsyncClient):
+        _, tokens = await self._register(client)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        url = f"{settings.API_ENDPOINT_PREFIX}/users/me"
+        response = await client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/logout",
+            headers=headers,
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        # Even though the principal is still cached.
+        response = await client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["detail"] == "Token has been revoked"
+
+        # Other tokens are unaffected.
+        _, other = await self._register(client)
+        response = await client.get(
+            url, headers={"Authorization": f"Bearer {other['access_token']}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_password_change_revokes_issued_access_tokens(
+        self, client: AsyncClient
+    ):
+        payload, tokens = await self._register(client)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        user_id = decode_access_token(tokens["access_token"])["sub"]
+        new_password = faker.password()
+        response = await client.put(
+            f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}/change-password",
+            headers=headers,
+            json={"old_password": payload["password"], "new_password": new_password},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        url = f"{settings.API_ENDPOINT_PREFIX}/users/me"
+        response = await client.get(url, headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/login",
+            data={"username": payload["email"], "password": new_password},
+        )
+        response = await client.get(
+            url,
+            headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_purge_deletes_ended_sessions(
+        self, client: AsyncClient, db: AsyncSession, storage: InMemoryStorageBackend
+    ):
+        _, logged_out = await self._register(client)
+        _, tokens = await self._register(client)
+        await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/logout",
+            json={"refresh_token": logged_out["refresh_token"]},
+        )
+
+        await PurgeService(db, storage).run_once()
+
+        result = await db.execute(select(func.count()).select_from(AuthSession))
+        assert result.scalar_one() == 1
+        response = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/auth/refresh",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
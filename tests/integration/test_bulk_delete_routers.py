@@ -0,0 +1,213 @@
+import io
+from unittest import mock
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from repositories.blob import BlobRepository
+from repositories.file import FileRepository
+from services.purge import PurgeService
+from services.user import UserService
+from storage.memory import InMemoryStorageBackend
+from tests.common import get_auth_headers
+from tests.conftest import AsyncSessionLocal
+
+
+async def _upload_files(client: AsyncClient, headers: dict, count: int) -> list[dict]:
+    faker = Faker()
+    files = [
+        ("files", (f"{index}.txt", io.BytesIO(faker.binary(length=512)), "text/plain"))
+        for index in range(count)
+    ]
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files/bulk", files=files, headers=headers
+    )
+    assert res.status_code == status.HTTP_200_OK
+    return [result["file"] for result in res.json()["data"]]
+
+
+@pytest.mark.integration
+async def test_bulk_delete_and_purge(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    other_headers = await get_auth_headers(user_service)
+    files = await _upload_files(client, headers, 5)
+    other_file = (await _upload_files(client, other_headers, 1))[0]
+
+    with mock.patch.object(storage, "delete", wraps=storage.delete) as delete:
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files/bulk-delete",
+            json={"ids": [file["id"] for file in files[:3]] + [other_file["id"]]},
+            headers=headers,
+        )
+        assert res.status_code == status.HTTP_200_OK
+        # Files of other users are skipped.
+        assert res.json()["deleted"] == 3
+        assert not delete.called
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{other_file['id']}",
+        headers=other_headers,
+    )
+    assert res.status_code == status.HTTP_200_OK
+
+    storage_keys = []
+    for file in files[:3]:
+        blob = await BlobRepository(db).get_by_sha256(file["sha256"])
+        storage_keys.append(blob.storage_key)
+        assert storage.exists(blob.storage_key)
+
+    # Still inside the restore window: nothing is purged.
+    await PurgeService(db, storage).run_once()
+    assert all(storage.exists(key) for key in storage_keys)
+
+    with mock.patch.object(settings, "FILE_TRASH_RETENTION_DAYS", 0):
+        await PurgeService(db, storage).run_once()
+    assert not any(storage.exists(key) for key in storage_keys)
+    for file in files[3:]:
+        blob = await BlobRepository(db).get_by_sha256(file["sha256"])
+        assert storage.exists(blob.storage_key)
+
+
+@pytest.mark.integration
+async def test_restore_file(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    file = (await _upload_files(client, headers, 1))[0]
+    url = f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}"
+
+    res = await client.post(f"{url}/restore", headers=headers)
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    res = await client.delete(url, headers=headers)
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+
+    res = await client.post(
+        f"{url}/restore", headers=await get_auth_headers(user_service)
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    res = await client.post(f"{url}/restore", headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["id"] == file["id"]
+
+    res = await client.get(url, headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.integration
+async def test_restore_window_expired(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    file = (await _upload_files(client, headers, 1))[0]
+    url = f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}"
+
+    await client.delete(url, headers=headers)
+    with mock.patch.object(settings, "FILE_TRASH_RETENTION_DAYS", 0):
+        res = await client.post(f"{url}/restore", headers=headers)
+
+    assert res.status_code == status.HTTP_410_GONE
+
+
+@pytest.mark.integration
+async def test_purge_retries_failed_storage_deletes(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=512)
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files",
+        files={"file": ("a.txt", io.BytesIO(data), "text/plain")},
+        headers=headers,
+    )
+    file = res.json()
+    storage_key = (await BlobRepository(db).get_by_sha256(file["sha256"])).storage_key
+    await client.delete(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}", headers=headers
+    )
+
+    with mock.patch.object(
+        storage, "delete_many", return_value=[storage_key]
+    ) as delete_many, mock.patch.object(
+        settings, "FILE_TRASH_RETENTION_DAYS", 0
+    ), mock.patch(
+        "services.purge.RETRY_BACKOFF_SECONDS", 0
+    ):
+        await PurgeService(db, storage).run_once()
+    assert delete_many.call_count == settings.PURGE_MAX_ATTEMPTS
+    assert storage.exists(storage_key)
+
+    # Identical content uploaded while the old blob awaits deletion is
+    # stored as a new blob.
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files",
+        files={"file": ("again.txt", io.BytesIO(data), "text/plain")},
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_200_OK
+    new_blob = await BlobRepository(db).get_by_sha256(file["sha256"])
+    assert new_blob.storage_key != storage_key
+
+    await PurgeService(db, storage).run_once()
+    assert not storage.exists(storage_key)
+    assert storage.exists(new_blob.storage_key)
+
+
+@pytest.mark.integration
+async def test_concurrent_purgers_release_each_reference_once(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    data = Faker().binary(length=512)
+    owners = [await get_auth_headers(user_service) for _ in range(2)]
+    files = []
+    for headers in owners:
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files",
+            files={"file": ("a.txt", io.BytesIO(data), "text/plain")},
+            headers=headers,
+        )
+        files.append(res.json())
+    await client.delete(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{files[0]['id']}", headers=owners[0]
+    )
+
+    first = PurgeService(db, storage)
+    async with AsyncSessionLocal() as other_db:
+        second = PurgeService(other_db, storage)
+        get_expired = FileRepository.get_expired
+
+        async def racing_get_expired(repo, **kwargs):
+            expired = await get_expired(repo, **kwargs)
+            if repo is first.file_repo:
+                # The other worker purges the same batch in between.
+                assert await second.purge_expired_files() == 1
+            return expired
+
+        with mock.patch.object(
+            FileRepository, "get_expired", racing_get_expired
+        ), mock.patch.object(settings, "FILE_TRASH_RETENTION_DAYS", 0):
+            assert await first.purge_expired_files() == 1
+            await first.purge_unreferenced_blobs()
+
+    blob = await BlobRepository(db).get_by_sha256(files[1]["sha256"])
+    await db.refresh(blob)
+    assert blob.ref_count == 1
+    assert storage.exists(blob.storage_key)
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{files[1]['id']}/content",
+        headers=owners[1],
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.content == data
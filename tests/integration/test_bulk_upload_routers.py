@@ -0,0 +1,109 @@
+import hashlib
+import io
+from unittest import mock
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from repositories.blob import BlobRepository
+from services.user import UserService
+from storage.memory import InMemoryStorageBackend
+from tests.common import get_auth_headers
+
+
+@pytest.mark.integration
+async def test_bulk_upload(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    faker = Faker()
+    contents = [faker.binary(length=1024 + index) for index in range(10)]
+    # The last file repeats the first one's content.
+    contents.append(contents[0])
+    files = [
+        ("files", (f"file-{index}.bin", io.BytesIO(data), "application/octet-stream"))
+        for index, data in enumerate(contents)
+    ]
+
+    with mock.patch.object(storage, "upload", wraps=storage.upload) as upload:
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files/bulk", files=files, headers=headers
+        )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["uploaded"] == 11
+    assert res.json()["failed"] == 0
+    assert upload.call_count == 10
+
+    results = res.json()["data"]
+    assert [result["file_name"] for result in results] == [
+        f"file-{index}.bin" for index in range(11)
+    ]
+    for result, data in zip(results, contents):
+        assert result["error"] is None
+        assert result["file"]["sha256"] == hashlib.sha256(data).hexdigest()
+
+    blob = await BlobRepository(db).get_by_sha256(
+        hashlib.sha256(contents[0]).hexdigest()
+    )
+    assert blob.ref_count == 2
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{results[3]['file']['id']}/content",
+        headers=headers,
+    )
+    assert res.content == contents[3]
+
+
+@pytest.mark.integration
+async def test_bulk_upload_reports_storage_failures(
+    client: AsyncClient, user_service: UserService, storage: InMemoryStorageBackend
+):
+    headers = await get_auth_headers(user_service)
+    upload = storage.upload
+
+    def flaky_upload(name, file, **kwargs):
+        if file.read(4) == b"fail":
+            raise ConnectionError("storage unavailable")
+        file.seek(0)
+        return upload(name, file, **kwargs)
+
+    files = [
+        ("files", ("good.txt", io.BytesIO(b"good content"), "text/plain")),
+        ("files", ("bad.txt", io.BytesIO(b"fail content"), "text/plain")),
+    ]
+    with mock.patch.object(storage, "upload", side_effect=flaky_upload):
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files/bulk", files=files, headers=headers
+        )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["uploaded"] == 1
+    assert res.json()["failed"] == 1
+    good, bad = res.json()["data"]
+    assert good["file"]["name"] == "good.txt"
+    assert bad["file"] is None
+    assert bad["error"] == "Failed to store file"
+
+
+@pytest.mark.integration
+async def test_bulk_upload_limit(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    files = [
+        ("files", (f"{index}.txt", io.BytesIO(b"x"), "text/plain"))
+        for index in range(3)
+    ]
+
+    with mock.patch.object(settings, "BULK_UPLOAD_MAX_FILES", 2):
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files/bulk", files=files, headers=headers
+        )
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
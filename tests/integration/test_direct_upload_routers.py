@@ -0,0 +1,278 @@
+import io
+import uuid
+from unittest import mock
+
+import pytest
+from faker import Faker
+from fastapi import HTTPException, status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.principals import TokenClaims
+from configs.settings import settings
+from repositories.blob import BlobRepository
+from repositories.file import FileRepository
+from services.file import FileService
+from services.purge import PurgeService
+from services.user import UserService
+from storage.checksums import checksum_stream
+from storage.memory import InMemoryStorageBackend
+from tests.common import get_auth_headers, register_user
+from tests.conftest import AsyncSessionLocal
+
+FILES_URL = f"{settings.API_ENDPOINT_PREFIX}/files"
+
+
+async def _create_upload(client: AsyncClient, headers: dict, data: bytes) -> dict:
+    res = await client.post(
+        f"{FILES_URL}/direct-uploads",
+        json={
+            "file_name": "report.txt",
+            "mime_type": "text/plain",
+            "size": len(data),
+            "crc32c": checksum_stream(io.BytesIO(data)).crc32c,
+        },
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+    return res.json()
+
+
+@pytest.mark.integration
+async def test_direct_upload(client: AsyncClient, user_service: UserService):
+    user, headers = await register_user(user_service)
+    data = Faker().binary(length=4096)
+    upload = await _create_upload(client, headers, data)
+    assert upload["method"] == "PUT"
+
+    # Pending files are not visible until finalized.
+    res = await client.get(f"{FILES_URL}/{upload['file_id']}", headers=headers)
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/users/{user.id}/files", headers=headers
+    )
+    assert res.json()["total"] == 0
+
+    res = await client.put(
+        upload["upload_url"], content=data, headers=upload["headers"]
+    )
+    assert res.status_code == status.HTTP_200_OK
+
+    res = await client.post(
+        f"{FILES_URL}/{upload['file_id']}/finalize", headers=headers
+    )
+    assert res.status_code == status.HTTP_200_OK
+    file = res.json()
+    assert int(file["size"]) == len(data)
+    assert file["sha256"] == checksum_stream(io.BytesIO(data)).sha256
+
+    res = await client.get(f"{FILES_URL}/{file['id']}/content", headers=headers)
+    assert res.content == data
+
+    res = await client.post(f"{FILES_URL}/{file['id']}/finalize", headers=headers)
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    # The upload URL cannot replace the verified content.
+    res = await client.put(
+        upload["upload_url"], content=b"x" * len(data), headers=upload["headers"]
+    )
+    assert res.status_code == status.HTTP_409_CONFLICT
+    res = await client.get(f"{FILES_URL}/{file['id']}/content", headers=headers)
+    assert res.content == data
+
+
+@pytest.mark.integration
+async def test_direct_upload_deduplicates(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=1024)
+    res = await client.post(
+        FILES_URL,
+        files={"file": ("a.txt", io.BytesIO(data), "text/plain")},
+        headers=headers,
+    )
+    existing = res.json()
+
+    upload = await _create_upload(client, headers, data)
+    await client.put(upload["upload_url"], content=data, headers=upload["headers"])
+    res = await client.post(
+        f"{FILES_URL}/{upload['file_id']}/finalize", headers=headers
+    )
+    assert res.status_code == status.HTTP_200_OK
+
+    blob = await BlobRepository(db).get_by_sha256(existing["sha256"])
+    assert blob.ref_count == 2
+    # The duplicate upload is left for the purger.
+    await PurgeService(db, storage).run_once()
+    assert storage.exists(blob.storage_key)
+    assert len(storage._objects) == 1
+
+
+@pytest.mark.integration
+async def test_finalize_rejects_mismatched_content(
+    client: AsyncClient, user_service: UserService
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=1024)
+    upload = await _create_upload(client, headers, data)
+    finalize_url = f"{FILES_URL}/{upload['file_id']}/finalize"
+
+    res = await client.post(finalize_url, headers=headers)
+    assert res.status_code == status.HTTP_409_CONFLICT
+
+    await client.put(
+        upload["upload_url"], content=data[:512], headers=upload["headers"]
+    )
+    res = await client.post(finalize_url, headers=headers)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    # Another user cannot finalize the upload.
+    await client.put(upload["upload_url"], content=data, headers=upload["headers"])
+    res = await client.post(finalize_url, headers=await get_auth_headers(user_service))
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    res = await client.post(finalize_url, headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.integration
+async def test_concurrent_finalizes_count_the_file_once(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    user, headers = await register_user(user_service)
+    data = Faker().binary(length=1024)
+    upload = await _create_upload(client, headers, data)
+    await client.put(upload["upload_url"], content=data, headers=upload["headers"])
+    claims = TokenClaims(id=user.id, is_admin=False)
+    file_id = uuid.UUID(upload["file_id"])
+
+    first = FileService(db, storage)
+    async with AsyncSessionLocal() as other_db:
+        second = FileService(other_db, storage)
+        get_by_id = FileRepository.get_by_id
+
+        async def racing_get_by_id(repo, *args, **kwargs):
+            file = await get_by_id(repo, *args, **kwargs)
+            if repo is first.file_repo:
+                # The other request finalizes the upload in between.
+                await second.finalize_direct_upload(file_id, claims)
+            return file
+
+        with mock.patch.object(FileRepository, "get_by_id", racing_get_by_id):
+            with pytest.raises(HTTPException) as error:
+                await first.finalize_direct_upload(file_id, claims)
+    assert error.value.status_code == status.HTTP_404_NOT_FOUND
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/users/{claims.id}/files", headers=headers
+    )
+    assert res.json()["total"] == 1
+
+
+@pytest.mark.integration
+async def test_upload_beyond_declared_size_is_rejected(
+    client: AsyncClient, user_service: UserService, storage: InMemoryStorageBackend
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=1024)
+    upload = await _create_upload(client, headers, data)
+
+    res = await client.put(
+        upload["upload_url"], content=data + b"!", headers=upload["headers"]
+    )
+    assert res.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert not storage._objects
+
+    res = await client.put(
+        upload["upload_url"], content=data, headers=upload["headers"]
+    )
+    assert res.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.integration
+async def test_concurrent_puts_write_the_object_once(
+    client: AsyncClient, user_service: UserService, storage: InMemoryStorageBackend
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=1024)
+    upload = await _create_upload(client, headers, data)
+    res = await client.put(
+        upload["upload_url"], content=data, headers=upload["headers"]
+    )
+    assert res.status_code == status.HTTP_200_OK
+
+    # A second PUT that passed the existence check before the first committed.
+    with mock.patch.object(InMemoryStorageBackend, "exists", return_value=False):
+        res = await client.put(
+            upload["upload_url"], content=b"x" * len(data), headers=upload["headers"]
+        )
+    assert res.status_code == status.HTTP_409_CONFLICT
+    assert list(storage._objects.values()) == [data]
+
+
+@pytest.mark.integration
+async def test_download_url_cannot_upload(
+    client: AsyncClient, user_service: UserService
+):
+    headers = await get_auth_headers(user_service)
+    res = await client.post(
+        FILES_URL,
+        files={"file": ("a.txt", io.BytesIO(b"original"), "text/plain")},
+        headers=headers,
+    )
+    file = res.json()
+
+    res = await client.put(file["url"], content=b"replaced")
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+    res = await client.get(file["url"])
+    assert res.content == b"original"
+
+
+@pytest.mark.integration
+async def test_resumable_upload_not_supported(
+    client: AsyncClient, user_service: UserService
+):
+    res = await client.post(
+        f"{FILES_URL}/direct-uploads",
+        json={
+            "file_name": "a.txt",
+            "mime_type": "text/plain",
+            "size": 10,
+            "resumable": True,
+        },
+        headers=await get_auth_headers(user_service),
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.integration
+async def test_abandoned_upload_is_purged(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=256)
+    upload = await _create_upload(client, headers, data)
+    await client.put(upload["upload_url"], content=data, headers=upload["headers"])
+    assert len(storage._objects) == 1
+
+    await PurgeService(db, storage).run_once()
+    assert len(storage._objects) == 1
+
+    with mock.patch.object(settings, "DIRECT_UPLOAD_TTL_HOURS", 0):
+        await PurgeService(db, storage).run_once()
+    assert not storage._objects
+
+    res = await client.post(
+        f"{FILES_URL}/{upload['file_id']}/finalize", headers=headers
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
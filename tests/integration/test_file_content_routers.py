@@ -0,0 +1,128 @@
+import hashlib
+import io
+from email.parser import BytesParser
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+
+from configs.settings import settings
+from services.user import UserService
+from tests.common import get_auth_headers
+
+
+async def _upload(client: AsyncClient, headers: dict, data: bytes) -> dict:
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files",
+        files={"file": ("video.mp4", io.BytesIO(data), "video/mp4")},
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_200_OK
+    return res.json()
+
+
+@pytest.mark.integration
+async def test_download_whole_file(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=3 * 1024 * 1024 + 5)
+    file = await _upload(client, headers, data)
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}/content", headers=headers
+    )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.content == data
+    assert res.headers["content-length"] == str(len(data))
+    assert res.headers["content-type"] == "video/mp4"
+    assert res.headers["accept-ranges"] == "bytes"
+    assert res.headers["etag"] == f'"{hashlib.sha256(data).hexdigest()}"'
+
+
+@pytest.mark.integration
+async def test_download_single_range(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=10_000)
+    file = await _upload(client, headers, data)
+    url = f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}/content"
+
+    res = await client.get(url, headers={**headers, "Range": "bytes=100-199"})
+    assert res.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert res.content == data[100:200]
+    assert res.headers["content-range"] == "bytes 100-199/10000"
+    assert res.headers["content-length"] == "100"
+
+    res = await client.get(url, headers={**headers, "Range": "bytes=-10"})
+    assert res.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert res.content == data[-10:]
+
+    res = await client.get(url, headers={**headers, "Range": "bytes=10000-"})
+    assert res.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+    assert res.headers["content-range"] == "bytes */10000"
+
+
+@pytest.mark.integration
+async def test_download_multiple_ranges(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=10_000)
+    file = await _upload(client, headers, data)
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}/content",
+        headers={**headers, "Range": "bytes=0-9,5000-5099"},
+    )
+
+    assert res.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert res.headers["content-length"] == str(len(res.content))
+    assert res.headers["content-type"].startswith("multipart/byteranges; boundary=")
+
+    message = BytesParser().parsebytes(
+        f"Content-Type: {res.headers['content-type']}\r\n\r\n".encode() + res.content
+    )
+    parts = message.get_payload()
+    assert [part["Content-Range"] for part in parts] == [
+        "bytes 0-9/10000",
+        "bytes 5000-5099/10000",
+    ]
+    assert [part.get_payload(decode=True) for part in parts] == [
+        data[0:10],
+        data[5000:5100],
+    ]
+
+
+@pytest.mark.integration
+async def test_if_range_mismatch_serves_whole_file(
+    client: AsyncClient, user_service: UserService
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=1000)
+    file = await _upload(client, headers, data)
+    url = f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}/content"
+
+    res = await client.get(
+        url, headers={**headers, "Range": "bytes=0-9", "If-Range": '"stale"'}
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.content == data
+
+    res = await client.get(
+        url,
+        headers={**headers, "Range": "bytes=0-9", "If-Range": f'"{file["sha256"]}"'},
+    )
+    assert res.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert res.content == data[:10]
+
+
+@pytest.mark.integration
+async def test_download_requires_ownership(
+    client: AsyncClient, user_service: UserService
+):
+    file = await _upload(client, await get_auth_headers(user_service), b"private")
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{file['id']}/content",
+        headers=await get_auth_headers(user_service),
+    )
+
+    assert res.status_code == status.HTTP_404_NOT_FOUND
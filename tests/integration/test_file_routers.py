@@ -1,3 +1,4 @@
+import hashlib
 import io
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -5,18 +6,28 @@ from unittest import mock
 
 import pytest
 from faker import Faker
-from fastapi import status
+from fastapi import HTTPException, status
 from httpx import AsyncClient
+from sqlalchemy import literal, true
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.auth import create_access_token
+from auth.auth import create_access_token, decode_access_token
+from auth.principals import Principal
 from configs.settings import settings
+from repositories.blob import BlobRepository
+from repositories.file import FileRepository
 from services.file import FileService
+from services.purge import PurgeService
 from services.user import UserService
-from tests.common import get_random_user
+from storage.memory import InMemoryStorageBackend
+from tests.common import get_auth_headers, get_random_user, get_storage_key
+from tests.conftest import AsyncSessionLocal
 
 
 @pytest.mark.integration
-async def test_upload_file(client: AsyncClient):
+async def test_upload_file(
+    client: AsyncClient, db: AsyncSession, storage: InMemoryStorageBackend
+):
     new_user = get_random_user()
     payload = {
         "username": new_user.username,
@@ -36,12 +47,11 @@ async def test_upload_file(client: AsyncClient):
     file_name = faker.name()
     file = {"file": (file_name, file_stream, "text/plain")}
 
-    fake_signed_url = faker.url(schemes=["https"])
     with mock.patch.object(
-        FileService, "_upload_to_gcs", return_value=None
-    ) as _upload_to_gcs, mock.patch.object(
-        FileService, "_generate_signed_url", return_value=fake_signed_url
-    ) as _generate_signed_url:
+        storage, "upload", wraps=storage.upload
+    ) as upload, mock.patch.object(
+        storage, "generate_signed_url", wraps=storage.generate_signed_url
+    ) as generate_signed_url:
         res = await client.post(
             f"{settings.API_ENDPOINT_PREFIX}/files",
             files=file,
@@ -49,14 +59,53 @@ async def test_upload_file(client: AsyncClient):
         )
 
         assert res.status_code == status.HTTP_200_OK
-        assert _upload_to_gcs.called
-        assert _generate_signed_url.called
+        assert upload.called
+        assert generate_signed_url.called
         assert file_name in res.json()["name"]
-        assert fake_signed_url in res.json()["url"]
+        assert storage.exists(await get_storage_key(db, res.json()["sha256"]))
+        assert "signature=" in res.json()["url"]
+
+
+@pytest.mark.integration
+async def test_upload_file_checksums(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    new_user = get_random_user()
+    user = await user_service.register(
+        username=new_user.username, password=new_user.password, email=new_user.email
+    )
+    access_token = create_access_token(
+        id=user.id,
+        is_admin=user.is_admin,
+        expires_datetime=datetime.now(timezone.utc) + timedelta(days=1),
+    )
+
+    faker = Faker()
+    data = faker.binary(length=3 * 1024 * 1024 + 17)
+    file = {"file": ("large.bin", io.BytesIO(data), "application/octet-stream")}
+
+    with mock.patch.object(settings, "UPLOAD_CHUNK_SIZE", 1024 * 1024):
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files",
+            files=file,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["size"] == str(len(data))
+    assert res.json()["sha256"] == hashlib.sha256(data).hexdigest()
+    storage_key = await get_storage_key(db, res.json()["sha256"])
+    with storage.open_read(storage_key) as stream:
+        assert stream.read() == data
 
 
 @pytest.mark.integration
-async def test_get_file_by_id(client: AsyncClient, user_service: UserService):
+async def test_get_file_by_id(
+    client: AsyncClient, user_service: UserService, storage: InMemoryStorageBackend
+):
     new_user = get_random_user()
     user = await user_service.register(
         username=new_user.username, password=new_user.password, email=new_user.email
@@ -73,10 +122,10 @@ async def test_get_file_by_id(client: AsyncClient, user_service: UserService):
     file = {"file": (file_name, file_stream, "text/plain")}
 
     with mock.patch.object(
-        FileService, "_upload_to_gcs", return_value=None
-    ) as _upload_to_gcs, mock.patch.object(
-        FileService, "_generate_signed_url", return_value=faker.url(schemes=["https"])
-    ) as _generate_signed_url:
+        storage, "upload", wraps=storage.upload
+    ) as upload, mock.patch.object(
+        storage, "generate_signed_url", wraps=storage.generate_signed_url
+    ) as generate_signed_url:
         res = await client.post(
             f"{settings.API_ENDPOINT_PREFIX}/files",
             files=file,
@@ -84,8 +133,8 @@ async def test_get_file_by_id(client: AsyncClient, user_service: UserService):
         )
 
         assert res.status_code == status.HTTP_200_OK
-        assert _upload_to_gcs.called
-        assert _generate_signed_url.called
+        assert upload.called
+        assert generate_signed_url.called
 
         file_id = res.json()["id"]
 
@@ -138,7 +187,9 @@ async def test_get_file_by_id_not_found(client: AsyncClient, user_service: UserS
 
 
 @pytest.mark.integration
-async def test_delete_file_by_id(client: AsyncClient):
+async def test_delete_file_by_id(
+    client: AsyncClient, db: AsyncSession, storage: InMemoryStorageBackend
+):
     new_user = get_random_user()
     payload = {
         "username": new_user.username,
@@ -158,10 +209,10 @@ async def test_delete_file_by_id(client: AsyncClient):
     file = {"file": (file_name, file_stream, "text/plain")}
 
     with mock.patch.object(
-        FileService, "_upload_to_gcs", return_value=None
-    ) as _upload_to_gcs, mock.patch.object(
-        FileService, "_generate_signed_url", return_value=faker.url(schemes=["https"])
-    ) as _generate_signed_url:
+        storage, "upload", wraps=storage.upload
+    ) as upload, mock.patch.object(
+        storage, "generate_signed_url", wraps=storage.generate_signed_url
+    ) as generate_signed_url:
         res = await client.post(
             f"{settings.API_ENDPOINT_PREFIX}/files",
             files=file,
@@ -169,24 +220,36 @@ async def test_delete_file_by_id(client: AsyncClient):
         )
 
         assert res.status_code == status.HTTP_200_OK
-        assert _upload_to_gcs.called
-        assert _generate_signed_url.called
+        assert upload.called
+        assert generate_signed_url.called
 
         file_id = res.json()["id"]
+        object_name = await get_storage_key(db, res.json()["sha256"])
 
-        with mock.patch.object(
-            FileService, "_delete_from_gcs", return_value=None
-        ) as _delete_from_gcs:
+        with mock.patch.object(storage, "delete", wraps=storage.delete) as delete:
             res = await client.delete(
                 f"{settings.API_ENDPOINT_PREFIX}/files/{file_id}",
                 headers={"Authorization": f"Bearer {access_token}"},
             )
             assert res.status_code == status.HTTP_204_NO_CONTENT
-            assert _delete_from_gcs.called
+            # Deleting only moves the file to the trash.
+            assert not delete.called
+            assert storage.exists(object_name)
+
+        res = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/files/{file_id}",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+        await _purge(db, storage)
+        assert not storage.exists(object_name)
 
 
 @pytest.mark.integration
-async def delete_file_by_id_unauthenticated(client: AsyncClient):
+async def delete_file_by_id_unauthenticated(
+    client: AsyncClient, storage: InMemoryStorageBackend
+):
     new_user = get_random_user()
     payload = {
         "username": new_user.username,
@@ -205,10 +268,10 @@ async def delete_file_by_id_unauthenticated(client: AsyncClient):
     file = {"file": (file_name, file_stream, "text/plain")}
 
     with mock.patch.object(
-        FileService, "_upload_to_gcs", return_value=None
-    ) as _upload_to_gcs, mock.patch.object(
-        FileService, "_generate_signed_url", return_value=faker.url(schemes=["https"])
-    ) as _generate_signed_url:
+        storage, "upload", wraps=storage.upload
+    ) as upload, mock.patch.object(
+        storage, "generate_signed_url", wraps=storage.generate_signed_url
+    ) as generate_signed_url:
         res = await client.post(
             f"{settings.API_ENDPOINT_PREFIX}/files",
             files=file,
@@ -216,8 +279,8 @@ async def delete_file_by_id_unauthenticated(client: AsyncClient):
         )
 
         assert res.status_code == status.HTTP_200_OK
-        assert _upload_to_gcs.called
-        assert _generate_signed_url.called
+        assert upload.called
+        assert generate_signed_url.called
 
         file_id = res.json()["id"]
 
@@ -252,7 +315,9 @@ async def test_delete_file_by_id_not_found(
 
 
 @pytest.mark.integration
-async def test_get_all_files(client: AsyncClient, user_service: UserService):
+async def test_get_all_files(
+    client: AsyncClient, user_service: UserService, storage: InMemoryStorageBackend
+):
     new_user = get_random_user()
     user = await user_service.register(
         username=new_user.username,
@@ -268,17 +333,15 @@ async def test_get_all_files(client: AsyncClient, user_service: UserService):
 
     faker = Faker()
     for _ in range(20):
-        file_stream = io.BytesIO(b"Sample file data")
+        file_stream = io.BytesIO(faker.text().encode("utf-8"))
         file_name = faker.name()
         file = {"file": (file_name, file_stream, "text/plain")}
 
         with mock.patch.object(
-            FileService, "_upload_to_gcs", return_value=None
-        ) as _upload_to_gcs, mock.patch.object(
-            FileService,
-            "_generate_signed_url",
-            return_value=faker.url(schemes=["https"]),
-        ) as _generate_signed_url:
+            storage, "upload", wraps=storage.upload
+        ) as upload, mock.patch.object(
+            storage, "generate_signed_url", wraps=storage.generate_signed_url
+        ) as generate_signed_url:
             res = await client.post(
                 f"{settings.API_ENDPOINT_PREFIX}/files",
                 files=file,
@@ -286,8 +349,8 @@ async def test_get_all_files(client: AsyncClient, user_service: UserService):
             )
 
             assert res.status_code == status.HTTP_200_OK
-            assert _upload_to_gcs.called
-            assert _generate_signed_url.called
+            assert upload.called
+            assert generate_signed_url.called
 
     new_user = get_random_user()
     admin_user = await user_service.register(
@@ -302,3 +365,230 @@ async def test_get_all_files(client: AsyncClient, user_service: UserService):
         is_admin=admin_user.is_admin,
         expires_datetime=datetime.now(timezone.utc) + timedelta(days=1),
     )
+
+
+async def _purge(db: AsyncSession, storage: InMemoryStorageBackend):
+    with mock.patch.object(settings, "FILE_TRASH_RETENTION_DAYS", 0):
+        await PurgeService(db, storage).run_once()
+
+
+@pytest.mark.integration
+async def test_duplicate_uploads_share_one_blob(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    data = Faker().binary(length=4096)
+    uploads = []
+
+    with mock.patch.object(storage, "upload", wraps=storage.upload) as upload:
+        for file_name in ("a.bin", "b.bin"):
+            res = await client.post(
+                f"{settings.API_ENDPOINT_PREFIX}/files",
+                files={"file": (file_name, io.BytesIO(data), "text/plain")},
+                headers=await get_auth_headers(user_service),
+            )
+            assert res.status_code == status.HTTP_200_OK
+            uploads.append(res.json())
+
+        assert upload.call_count == 1
+
+    assert uploads[0]["id"] != uploads[1]["id"]
+    assert uploads[0]["sha256"] == uploads[1]["sha256"]
+    blob = await BlobRepository(db).get_by_sha256(uploads[0]["sha256"])
+    assert blob.ref_count == 2
+    assert storage.exists(blob.storage_key)
+
+
+@pytest.mark.integration
+async def test_blob_is_deleted_with_last_reference(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=4096)
+    file_ids = []
+    for file_name in ("a.bin", "copy of a.bin"):
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files",
+            files={"file": (file_name, io.BytesIO(data), "text/plain")},
+            headers=headers,
+        )
+        file_ids.append(res.json()["id"])
+    storage_key = await get_storage_key(db, hashlib.sha256(data).hexdigest())
+
+    res = await client.delete(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{file_ids[0]}", headers=headers
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    assert storage.exists(storage_key)
+
+    res = await client.delete(
+        f"{settings.API_ENDPOINT_PREFIX}/files/{file_ids[1]}", headers=headers
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    await _purge(db, storage)
+    assert not storage.exists(storage_key)
+    assert (
+        await BlobRepository(db).get_by_sha256(hashlib.sha256(data).hexdigest()) is None
+    )
+
+
+@pytest.mark.integration
+async def test_deleting_user_releases_blob_references(
+    client: AsyncClient, db: AsyncSession, user_service: UserService
+):
+    data = Faker().binary(length=4096)
+    owner = await get_auth_headers(user_service)
+    other = await get_auth_headers(user_service)
+    for headers in (owner, owner, other):
+        res = await client.post(
+            f"{settings.API_ENDPOINT_PREFIX}/files",
+            files={"file": ("a.bin", io.BytesIO(data), "text/plain")},
+            headers=headers,
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+    user_id = decode_access_token(owner["Authorization"].split()[1])["sub"]
+    res = await client.delete(
+        f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}", headers=owner
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+
+    blob = await BlobRepository(db).get_by_sha256(hashlib.sha256(data).hexdigest())
+    await db.refresh(blob)
+    assert blob.ref_count == 1
+
+
+@pytest.mark.integration
+async def test_user_file_count_follows_changes(
+    client: AsyncClient, user_service: UserService
+):
+    headers = await get_auth_headers(user_service)
+    user_id = decode_access_token(headers["Authorization"].split()[1])["sub"]
+    files_url = f"{settings.API_ENDPOINT_PREFIX}/files"
+    faker = Faker()
+
+    async def file_count() -> int:
+        res = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}/files", headers=headers
+        )
+        return res.json()["total"]
+
+    file_ids = []
+    for _ in range(2):
+        res = await client.post(
+            files_url,
+            files={
+                "file": ("a.txt", io.BytesIO(faker.binary(length=64)), "text/plain")
+            },
+            headers=headers,
+        )
+        file_ids.append(res.json()["id"])
+    res = await client.post(
+        f"{files_url}/bulk",
+        files=[
+            ("files", (f"{i}.txt", io.BytesIO(faker.binary(length=64)), "text/plain"))
+            for i in range(3)
+        ],
+        headers=headers,
+    )
+    file_ids += [result["file"]["id"] for result in res.json()["data"]]
+    # Pending direct uploads are not counted.
+    await client.post(
+        f"{files_url}/direct-uploads",
+        json={"file_name": "b.txt", "mime_type": "text/plain", "size": 10},
+        headers=headers,
+    )
+    assert await file_count() == 5
+
+    await client.delete(f"{files_url}/{file_ids[0]}", headers=headers)
+    await client.post(
+        f"{files_url}/bulk-delete",
+        json={"ids": file_ids[:3]},
+        headers=headers,
+    )
+    assert await file_count() == 2
+
+    await client.post(f"{files_url}/{file_ids[0]}/restore", headers=headers)
+    assert await file_count() == 3
+
+
+@pytest.mark.integration
+async def test_concurrent_restores_count_the_file_once(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    user_id = decode_access_token(headers["Authorization"].split()[1])["sub"]
+    files_url = f"{settings.API_ENDPOINT_PREFIX}/files"
+    res = await client.post(
+        files_url,
+        files={"file": ("a.txt", io.BytesIO(b"restore me"), "text/plain")},
+        headers=headers,
+    )
+    file_id = uuid.UUID(res.json()["id"])
+    await client.delete(f"{files_url}/{file_id}", headers=headers)
+    user = Principal.from_user(await user_service.get_by_id(uuid.UUID(user_id)))
+
+    first = FileService(db, storage)
+    async with AsyncSessionLocal() as other_db:
+        second = FileService(other_db, storage)
+        get_by_id = FileRepository.get_by_id
+
+        async def racing_get_by_id(repo, *args, **kwargs):
+            file = await get_by_id(repo, *args, **kwargs)
+            if repo is first.file_repo:
+                # The other request restores the file in between.
+                await second.restore_file(file_id, user)
+            return file
+
+        with mock.patch.object(FileRepository, "get_by_id", racing_get_by_id):
+            with pytest.raises(HTTPException) as error:
+                await first.restore_file(file_id, user)
+    assert error.value.status_code == status.HTTP_404_NOT_FOUND
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}/files", headers=headers
+    )
+    assert res.json()["total"] == 1
+
+
+@pytest.mark.integration
+async def test_admin_listing_uses_estimate_for_large_tables(
+    client: AsyncClient, user_service: UserService
+):
+    new_user = get_random_user()
+    admin_user = await user_service.register(
+        username=new_user.username,
+        password=new_user.password,
+        email=new_user.email,
+        is_admin=True,
+    )
+    access_token = create_access_token(
+        id=admin_user.id,
+        is_admin=admin_user.is_admin,
+        expires_datetime=datetime.now(timezone.utc) + timedelta(days=1),
+    )
+    url = f"{settings.API_ENDPOINT_PREFIX}/files"
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await client.post(
+        url,
+        files={"file": ("a.txt", io.BytesIO(b"content"), "text/plain")},
+        headers=headers,
+    )
+
+    res = await client.get(url, headers=headers)
+    assert res.json()["total"] == 1
+    assert res.json()["total_is_estimate"] is False
+
+    estimate = (literal(5_000_000).label("total"), true().label("estimate"))
+    with mock.patch("repositories.file.total_columns", return_value=estimate):
+        res = await client.get(url, headers=headers)
+    assert res.json()["total"] == 5_000_000
+    assert res.json()["total_is_estimate"] is True
@@ -0,0 +1,12 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest.mark.integration
+async def test_metrics(client: AsyncClient):
+    response = await client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE storage_executor_queue_depth gauge" in response.text
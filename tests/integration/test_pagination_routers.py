@@ -0,0 +1,196 @@
+import io
+import uuid
+from contextlib import contextmanager
+from unittest import mock
+
+import pytest
+from faker import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from services.insight import InsightService
+from services.user import UserService
+from tests.common import register_user
+from tests.conftest import engine
+
+
+async def _walk(client: AsyncClient, url: str, headers: dict, limit: int) -> list:
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        res = await client.get(url, params=params, headers=headers)
+        assert res.status_code == status.HTTP_200_OK
+        pages.append(res.json()["data"])
+        cursor = res.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.integration
+async def test_file_listing_cursor_pagination(
+    client: AsyncClient, user_service: UserService
+):
+    user, headers = await register_user(user_service)
+    faker = Faker()
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files/bulk",
+        files=[
+            ("files", (f"{i}.txt", io.BytesIO(faker.binary(length=64)), "text/plain"))
+            for i in range(25)
+        ],
+        headers=headers,
+    )
+    uploaded = [result["file"]["id"] for result in res.json()["data"]]
+
+    url = f"{settings.API_ENDPOINT_PREFIX}/users/{user.id}/files"
+    pages = await _walk(client, url, headers, limit=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+
+    files = [file for page in pages for file in page]
+    assert sorted(file["id"] for file in files) == sorted(uploaded)
+    keys = [(file["created_at"], file["id"]) for file in files]
+    assert keys == sorted(keys, reverse=True)
+
+    # Offset pages follow the same order.
+    res = await client.get(url, params={"limit": 10, "offset": 10}, headers=headers)
+    assert [file["id"] for file in res.json()["data"]] == [
+        file["id"] for file in pages[1]
+    ]
+
+
+@pytest.mark.integration
+async def test_user_listing_cursor_pagination(
+    client: AsyncClient, user_service: UserService
+):
+    _, headers = await register_user(user_service, is_admin=True)
+    for _ in range(6):
+        await register_user(user_service)
+
+    url = f"{settings.API_ENDPOINT_PREFIX}/users"
+    res = await client.get(url, params={"limit": 50}, headers=headers)
+    total = res.json()["total"]
+
+    pages = await _walk(client, url, headers, limit=3)
+    ids = [user["id"] for page in pages for user in page]
+    assert len(ids) == len(set(ids)) == total
+
+
+@pytest.mark.integration
+async def test_invalid_cursor(client: AsyncClient, user_service: UserService):
+    _, headers = await register_user(user_service, is_admin=True)
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/users",
+        params={"cursor": "not-a-cursor"},
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@contextmanager
+def _count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.integration
+async def test_listing_total_costs_no_extra_round_trip(
+    client: AsyncClient, user_service: UserService
+):
+    _, headers = await register_user(user_service, is_admin=True)
+    await register_user(user_service)
+    url = f"{settings.API_ENDPOINT_PREFIX}/users"
+    # Authenticate once so both measured requests hit the principal cache,
+    # and keep the revocation filter from refreshing in between.
+    await client.get(f"{settings.API_ENDPOINT_PREFIX}/users/me", headers=headers)
+
+    with mock.patch("auth.revocation.RevocationList.sync"):
+        with _count_statements() as with_total:
+            res = await client.get(url, params={"limit": 1}, headers=headers)
+        assert res.json()["total"] == 2
+
+        with _count_statements() as without_total:
+            res = await client.get(
+                url, params={"limit": 1, "include_total": False}, headers=headers
+            )
+    assert res.json()["total"] is None
+    assert len(res.json()["data"]) == 1
+    assert len(with_total) == len(without_total)
+
+    # Past the end the page has no rows to carry the total.
+    res = await client.get(url, params={"offset": 10}, headers=headers)
+    assert res.json()["data"] == []
+    assert res.json()["total"] == 2
+
+
+@pytest.mark.integration
+async def test_listings_select_only_rendered_columns(
+    client: AsyncClient, user_service: UserService
+):
+    user, headers = await register_user(user_service, is_admin=True)
+    await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files",
+        files={"file": ("a.txt", io.BytesIO(b"hello"), "text/plain")},
+        headers=headers,
+    )
+
+    with _count_statements() as statements:
+        res = await client.get(f"{settings.API_ENDPOINT_PREFIX}/users", headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+    assert "password_hash" not in statements[-1]
+
+    with _count_statements() as statements:
+        res = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/users/{user.id}/files", headers=headers
+        )
+    [file] = res.json()["data"]
+    assert file["name"] == "a.txt"
+    assert file["sha256"] and file["url"]
+    assert "files.user_id" not in statements[-1].split("WHERE")[0]
+
+
+@pytest.mark.integration
+async def test_insight_listing_defers_data(
+    client: AsyncClient, user_service: UserService, db: AsyncSession
+):
+    user, headers = await register_user(user_service)
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files",
+        files={"file": ("a.txt", io.BytesIO(b"hello"), "text/plain")},
+        headers=headers,
+    )
+    file_id = uuid.UUID(res.json()["id"])
+    insight = await InsightService(db).save_insight(
+        insight_data="x" * 4096,
+        prompt="Summarize this file",
+        user_id=user.id,
+        file_id=file_id,
+    )
+    url = f"{settings.API_ENDPOINT_PREFIX}/files/{file_id}/insights"
+
+    with _count_statements() as statements:
+        res = await client.get(url, headers=headers)
+    [listed] = res.json()["data"]
+    assert listed["id"] == str(insight.id)
+    assert listed["data"] is None
+    assert "insights.data" not in statements[-1]
+
+    res = await client.get(url, params={"include_data": True}, headers=headers)
+    assert res.json()["data"][0]["data"] == "x" * 4096
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/insights/{insight.id}", headers=headers
+    )
+    assert res.json()["data"] == "x" * 4096
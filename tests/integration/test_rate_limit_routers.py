@@ -0,0 +1,68 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from configs.rate_limit import get_rate_limiter
+from configs.settings import settings
+from main import app
+from ratelimit.base import RateLimit
+from ratelimit.limiter import RateLimiter
+from ratelimit.memory import InMemoryRateLimitStore
+from tests.common import register_through_api
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter(
+        InMemoryRateLimitStore(max_size=100),
+        ip_rate=RateLimit(6, 60),
+        user_rate=RateLimit(3, 60),
+        route_rates={
+            f"POST {settings.API_ENDPOINT_PREFIX}/auth/login": RateLimit(2, 60),
+        },
+        exempt_paths=["/health"],
+    )
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    yield limiter
+    app.dependency_overrides[get_rate_limiter] = lambda: None
+
+
+@pytest.mark.integration
+async def test_route_limit_returns_429_with_retry_after(
+    client: AsyncClient, limiter: RateLimiter
+):
+    url = f"{settings.API_ENDPOINT_PREFIX}/auth/login"
+    form = {"username": "nobody@example.com", "password": "wrong"}
+    for _ in range(2):
+        response = await client.post(url, data=form)
+        assert response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+    response = await client.post(url, data=form)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "30"
+
+    response = await client.get("/readiness")
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.integration
+async def test_users_are_limited_separately(client: AsyncClient, limiter: RateLimiter):
+    url = f"{settings.API_ENDPOINT_PREFIX}/users/me"
+    first = await register_through_api(client)
+    for _ in range(3):
+        response = await client.get(url, headers=first)
+        assert response.status_code == status.HTTP_200_OK
+    response = await client.get(url, headers=first)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    # A fresh user still has requests left, until the IP runs out.
+    second = await register_through_api(client)
+    response = await client.get(url, headers=second)
+    assert response.status_code == status.HTTP_200_OK
+    response = await client.get(url, headers=second)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    # Exempt paths are never limited.
+    for _ in range(3):
+        response = await client.get("/health")
+        assert response.status_code == status.HTTP_200_OK
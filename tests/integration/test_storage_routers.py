@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from configs.settings import settings
+from storage.memory import InMemoryStorageBackend
+from tests.common import get_random_user
+
+
+@pytest.mark.integration
+async def test_download_signed_url(
+    client: AsyncClient, storage: InMemoryStorageBackend
+):
+    new_user = get_random_user()
+    payload = {
+        "username": new_user.username,
+        "password": new_user.password,
+        "email": new_user.email,
+    }
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/auth/register", json=payload
+    )
+    access_token = res.json()["access_token"]
+
+    file = {"file": ("notes.txt", io.BytesIO(b"Sample file data"), "text/plain")}
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/files",
+        files=file,
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == status.HTTP_200_OK
+
+    res = await client.get(res.json()["url"])
+    assert res.status_code == status.HTTP_200_OK
+    assert res.content == b"Sample file data"
+    assert res.headers["content-type"].startswith("text/plain")
+
+
+@pytest.mark.integration
+async def test_download_invalid_signature(
+    client: AsyncClient, storage: InMemoryStorageBackend
+):
+    storage.upload("object.txt", io.BytesIO(b"data"))
+    url = storage.generate_signed_url("object.txt", expiration=60)
+
+    res = await client.get(url.replace("signature=", "signature=0"))
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.integration
+async def test_download_missing_object(
+    client: AsyncClient, storage: InMemoryStorageBackend
+):
+    url = storage.generate_signed_url("missing.txt", expiration=60)
+
+    res = await client.get(url)
+    assert res.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,285 @@
+import base64
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from unittest import mock
+
+import google_crc32c
+import pytest
+from faker import Faker
+from fastapi import HTTPException, status
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from models.upload_session import UploadSession
+from repositories.upload_session import UploadSessionRepository
+from services.purge import PurgeService
+from services.upload_session import MAX_MISSING_CHUNKS, UploadSessionService
+from services.user import UserService
+from storage.memory import InMemoryStorageBackend
+from tests.common import get_auth_headers, get_storage_key, register_user
+from tests.conftest import AsyncSessionLocal
+
+CHUNK_SIZE = 256 * 1024
+
+
+async def _create_session(client: AsyncClient, headers: dict, size: int) -> dict:
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads",
+        json={
+            "file_name": "video.mp4",
+            "mime_type": "video/mp4",
+            "size": size,
+            "chunk_size": CHUNK_SIZE,
+        },
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+    return res.json()
+
+
+async def _put_chunk(
+    client: AsyncClient, headers: dict, session_id: str, data: bytes, index: int
+):
+    return await client.put(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session_id}/chunks/{index}",
+        params={"offset": index * CHUNK_SIZE},
+        content=data[index * CHUNK_SIZE : (index + 1) * CHUNK_SIZE],
+        headers=headers,
+    )
+
+
+@pytest.mark.integration
+async def test_resumable_upload(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=2 * CHUNK_SIZE + 1000)
+    session = await _create_session(client, headers, size=len(data))
+
+    assert session["total_chunks"] == 3
+    assert session["missing_chunks"] == [0, 1, 2]
+
+    for index in (2, 0):
+        res = await _put_chunk(client, headers, session["id"], data, index)
+        assert res.status_code == status.HTTP_200_OK
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}", headers=headers
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["missing_chunks"] == [1]
+    assert res.json()["received_ranges"] == [
+        {"start": 0, "end": CHUNK_SIZE},
+        {"start": 2 * CHUNK_SIZE, "end": len(data)},
+    ]
+
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}/complete",
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    res = await _put_chunk(client, headers, session["id"], data, 1)
+    assert res.status_code == status.HTTP_200_OK
+
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}/complete",
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["size"] == str(len(data))
+    assert res.json()["sha256"] == hashlib.sha256(data).hexdigest()
+    storage_key = await get_storage_key(db, res.json()["sha256"])
+    with storage.open_read(storage_key) as stream:
+        assert stream.read() == data
+
+    for index in range(3):
+        assert not storage.exists(f"upload-sessions/{session['id']}/{index:06d}")
+
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}/complete",
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.integration
+async def test_concurrent_completes_create_one_file(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    user, headers = await register_user(user_service)
+    data = Faker().binary(length=CHUNK_SIZE)
+    session = await _create_session(client, headers, size=len(data))
+    await _put_chunk(client, headers, session["id"], data, 0)
+    session_id, user_id = uuid.UUID(session["id"]), user.id
+
+    first = UploadSessionService(db, storage)
+    async with AsyncSessionLocal() as other_db:
+        second = UploadSessionService(other_db, storage)
+        get_chunks = UploadSessionRepository.get_chunks
+
+        async def racing_get_chunks(repo, *args, **kwargs):
+            chunks = await get_chunks(repo, *args, **kwargs)
+            if repo is first.session_repo:
+                # The other request completes the session in between.
+                await second.complete_session(session_id, user_id)
+            return chunks
+
+        with mock.patch.object(
+            UploadSessionRepository, "get_chunks", racing_get_chunks
+        ):
+            with pytest.raises(HTTPException) as error:
+                await first.complete_session(session_id, user_id)
+    assert error.value.status_code == status.HTTP_409_CONFLICT
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}/files", headers=headers
+    )
+    assert res.json()["total"] == 1
+
+
+@pytest.mark.integration
+async def test_missing_chunks_are_capped(
+    client: AsyncClient, user_service: UserService
+):
+    headers = await get_auth_headers(user_service)
+    session = await _create_session(client, headers, size=5000 * CHUNK_SIZE)
+    assert session["total_chunks"] == 5000
+    assert session["missing_chunks"] == list(range(MAX_MISSING_CHUNKS))
+
+    res = await client.post(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads",
+        json={"file_name": "a.bin", "mime_type": "video/mp4", "size": 6 * 1024**4},
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.integration
+async def test_upload_chunk_validation(client: AsyncClient, user_service: UserService):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=2 * CHUNK_SIZE)
+    session = await _create_session(client, headers, size=len(data))
+    url = f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}/chunks"
+
+    res = await client.put(
+        f"{url}/1", params={"offset": 0}, content=data[:CHUNK_SIZE], headers=headers
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    res = await client.put(
+        f"{url}/0", params={"offset": 0}, content=data[:100], headers=headers
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    res = await client.put(
+        f"{url}/2",
+        params={"offset": 2 * CHUNK_SIZE},
+        content=data[:100],
+        headers=headers,
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    res = await client.put(
+        f"{url}/0",
+        params={"offset": 0},
+        content=data[:CHUNK_SIZE],
+        headers={**headers, "X-Checksum-CRC32C": "AAAAAA=="},
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    crc32c = base64.b64encode(
+        google_crc32c.Checksum(data[:CHUNK_SIZE]).digest()
+    ).decode()
+    res = await client.put(
+        f"{url}/0",
+        params={"offset": 0},
+        content=data[:CHUNK_SIZE],
+        headers={**headers, "X-Checksum-CRC32C": crc32c},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["crc32c"] == crc32c
+
+
+@pytest.mark.integration
+async def test_upload_session_other_user(
+    client: AsyncClient, user_service: UserService
+):
+    headers = await get_auth_headers(user_service)
+    session = await _create_session(client, headers, size=CHUNK_SIZE)
+
+    other_headers = await get_auth_headers(user_service)
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}",
+        headers=other_headers,
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    res = await client.get(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{uuid.uuid4()}", headers=headers
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.integration
+async def test_abort_upload_session(
+    client: AsyncClient, user_service: UserService, storage: InMemoryStorageBackend
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=CHUNK_SIZE)
+    session = await _create_session(client, headers, size=len(data))
+
+    res = await _put_chunk(client, headers, session["id"], data, 0)
+    assert res.status_code == status.HTTP_200_OK
+    assert storage.exists(f"upload-sessions/{session['id']}/000000")
+
+    res = await client.delete(
+        f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}", headers=headers
+    )
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    assert not storage.exists(f"upload-sessions/{session['id']}/000000")
+
+
+@pytest.mark.integration
+async def test_expired_upload_sessions_are_purged(
+    client: AsyncClient,
+    db: AsyncSession,
+    user_service: UserService,
+    storage: InMemoryStorageBackend,
+):
+    headers = await get_auth_headers(user_service)
+    data = Faker().binary(length=2 * CHUNK_SIZE)
+    expired, live = [
+        await _create_session(client, headers, size=len(data)) for _ in range(2)
+    ]
+    for session in (expired, live):
+        await _put_chunk(client, headers, session["id"], data, 0)
+    await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == uuid.UUID(expired["id"]))
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    )
+    await db.commit()
+
+    await PurgeService(db, storage).run_once()
+
+    assert not storage.exists(f"upload-sessions/{expired['id']}/000000")
+    assert storage.exists(f"upload-sessions/{live['id']}/000000")
+    for session, code in [
+        (expired, status.HTTP_404_NOT_FOUND),
+        (live, status.HTTP_200_OK),
+    ]:
+        res = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/uploads/{session['id']}", headers=headers
+        )
+        assert res.status_code == code
@@ -11,8 +11,8 @@ from httpx import AsyncClient
 from auth.auth import create_access_token, decode_access_token
 from configs.settings import settings
 from models.user import User
-from services.file import FileService
 from services.user import UserService
+from storage.memory import InMemoryStorageBackend
 from tests.common import get_random_user
 
 
@@ -122,6 +122,25 @@ class TestUserRouters:
         assert payload["limit"] == 5
         assert payload["offset"] == 0
 
+    async def test_admin_flag_change_takes_effect_immediately(
+        self, client: AsyncClient, user_service: UserService, admin_user: User
+    ):
+        access_token = create_access_token(
+            id=admin_user.id,
+            is_admin=admin_user.is_admin,
+            expires_datetime=datetime.now(tz=timezone.utc) + timedelta(hours=2),
+        )
+        headers = {"Authorization": f"Bearer {access_token}"}
+        url = f"{settings.API_ENDPOINT_PREFIX}/users"
+
+        res = await client.get(url, headers=headers)
+        assert res.status_code == status.HTTP_200_OK
+
+        # The cached principal is dropped, even though the token still says admin.
+        await user_service.set_admin(admin_user.id, is_admin=False)
+        res = await client.get(url, headers=headers)
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
     async def test_get_all_users_unauthorized(self, client: AsyncClient):
         res = await client.get(f"{settings.API_ENDPOINT_PREFIX}/users")
         assert res.status_code == status.HTTP_401_UNAUTHORIZED
@@ -150,7 +169,9 @@ class TestUserRouters:
 
         assert res.status_code == status.HTTP_403_FORBIDDEN
 
-    async def test_get_user_files(self, client: AsyncClient):
+    async def test_get_user_files(
+        self, client: AsyncClient, storage: InMemoryStorageBackend
+    ):
         new_user = get_random_user()
         payload = {
             "username": new_user.username,
@@ -174,24 +195,23 @@ class TestUserRouters:
             message = faker.text(max_nb_chars=200)
             file = {"file": (file_name, message.encode("utf-8"), "text/plain")}
 
-            fake_signed_url = faker.url(schemes=["https"])
             with mock.patch.object(
-                FileService, "_upload_to_gcs", return_value=None
-            ) as _upload_to_gcs, mock.patch.object(
-                FileService, "_generate_signed_url", return_value=fake_signed_url
-            ) as _generate_signed_url:
+                storage, "upload", wraps=storage.upload
+            ) as upload, mock.patch.object(
+                storage, "generate_signed_url", wraps=storage.generate_signed_url
+            ) as generate_signed_url:
                 res = await client.post(
                     f"{settings.API_ENDPOINT_PREFIX}/files",
                     files=file,
                     headers={"Authorization": f"Bearer {access_token}"},
                 )
                 assert res.status_code == status.HTTP_200_OK
-                assert _upload_to_gcs.called
-                assert _generate_signed_url.called
+                assert upload.called
+                assert generate_signed_url.called
 
         with mock.patch.object(
-            FileService, "_generate_signed_url", return_value=fake_signed_url
-        ) as _generate_signed_url:
+            storage, "generate_signed_url", wraps=storage.generate_signed_url
+        ) as generate_signed_url:
             params = {"limit": 10, "offset": 0}
             res = await client.get(
                 f"{settings.API_ENDPOINT_PREFIX}/users/{user_id}/files",
@@ -199,7 +219,8 @@ class TestUserRouters:
                 params=params,
             )
             assert res.status_code == status.HTTP_200_OK
-            assert _generate_signed_url.called
+            # URLs signed at upload time are served from the cache.
+            assert not generate_signed_url.called
             assert len(res.json()["data"]) == params["limit"]
             assert res.json()["total"] == 20
 
@@ -370,6 +391,12 @@ class TestUserRouters:
 
         assert res.status_code == status.HTTP_204_NO_CONTENT
 
+        res = await client.get(
+            f"{settings.API_ENDPOINT_PREFIX}/users/me",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
     async def test_delete_user_wrong_user_id(self, client: AsyncClient):
         new_user = get_random_user()
         payload = {
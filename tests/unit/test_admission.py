@@ -0,0 +1,67 @@
+import pytest
+
+from admission.controller import AdmissionController, ConcurrencyLimiter
+from admission.limits import GradientLimit
+
+
+def test_limit_grows_while_latency_holds():
+    limit = GradientLimit(initial=10, min_limit=2, max_limit=50)
+    for _ in range(50):
+        limit.update(0.1, in_flight=10)
+
+    assert 10 < limit.limit <= 50
+
+
+def test_limit_shrinks_when_latency_climbs():
+    limit = GradientLimit(initial=40, min_limit=2, max_limit=50)
+    for _ in range(20):
+        limit.update(0.1, in_flight=40)
+    before = limit.limit
+    for _ in range(20):
+        limit.update(1.0, in_flight=40)
+
+    assert 2 <= limit.limit < before / 2
+
+
+def test_idle_limit_and_drops():
+    limit = GradientLimit(initial=20, min_limit=4, max_limit=50)
+    limit.update(0.1, in_flight=1)
+    assert limit.limit == 20
+
+    assert limit.drop() == pytest.approx(18)
+    for _ in range(50):
+        limit.drop()
+    assert limit.limit == 4
+
+
+def test_limiter_sheds_beyond_its_limit():
+    limiter = ConcurrencyLimiter("test", GradientLimit(2, 1, 10))
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+    limiter.release(0.1)
+    assert limiter.in_flight == 1
+    assert limiter.try_acquire()
+
+
+@pytest.mark.parametrize(
+    "method, path, route_class",
+    [
+        ("POST", "/api/v1/insights", "insight"),
+        ("GET", "/api/v1/insights/1", "metadata"),
+        ("POST", "/api/v1/auth/login", "auth"),
+        ("DELETE", "/api/v1/api-keys/1", "auth"),
+        ("POST", "/api/v1/files", "upload"),
+        ("PUT", "/api/v1/uploads/1/chunks/0", "upload"),
+        ("GET", "/api/v1/files/1/content", "download"),
+        ("GET", "/api/v1/storage/a/b", "download"),
+        ("GET", "/api/v1/files", "metadata"),
+        ("POST", "/api/v1/files/bulk-delete", "metadata"),
+        ("GET", "/health", None),
+    ],
+)
+def test_route_classes(method: str, path: str, route_class: str | None):
+    controller = AdmissionController("/api/v1", initial=10, min_limit=1, max_limit=10)
+
+    assert controller.route_class({"method": method, "path": path}) == route_class
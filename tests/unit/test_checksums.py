@@ -0,0 +1,52 @@
+import hashlib
+import io
+
+from faker import Faker
+
+from storage.checksums import ChecksumAccumulator, checksum_stream, copy_stream
+
+faker = Faker()
+
+
+def test_checksum_known_vector():
+    accumulator = ChecksumAccumulator()
+    accumulator.update(b"1234")
+    accumulator.update(b"56789")
+
+    result = accumulator.result()
+
+    assert result.size == 9
+    assert result.sha256 == hashlib.sha256(b"123456789").hexdigest()
+    # CRC32C check value for "123456789" is 0xE3069283.
+    assert result.crc32c == "4waSgw=="
+
+
+def test_copy_stream_reads_in_chunks():
+    data = faker.binary(length=10_000)
+    source = io.BytesIO(data)
+    destination = io.BytesIO()
+    reads = []
+    original_read = source.read
+
+    def read(size=-1):
+        reads.append(size)
+        return original_read(size)
+
+    source.read = read
+    result = copy_stream(source, destination, chunk_size=1024)
+
+    assert destination.getvalue() == data
+    assert result.size == len(data)
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert set(reads) == {1024}
+
+
+def test_checksum_stream_rewinds_source():
+    data = b"x" * 1000
+    source = io.BytesIO(data)
+
+    checksums = checksum_stream(source, chunk_size=64)
+
+    assert checksums.size == len(data)
+    assert checksums.sha256 == hashlib.sha256(data).hexdigest()
+    assert source.read() == data
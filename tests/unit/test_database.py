@@ -0,0 +1,159 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from configs.database import (InstrumentedQueuePool, ReplicaSet,
+                              RoutingSession, engine_options, pool_timeouts,
+                              pool_wait_seconds)
+from configs.settings import settings
+
+POSTGRES_URL = "postgresql+asyncpg://user:password@db/file_drive"
+
+
+def test_sqlite_keeps_defaults():
+    assert engine_options("sqlite+aiosqlite:///./test.db") == {}
+
+
+def test_postgres_pool_options():
+    with mock.patch.object(settings, "DATABASE_POOL_SIZE", 7), mock.patch.object(
+        settings, "DATABASE_STATEMENT_TIMEOUT_MS", 5000
+    ):
+        options = engine_options(POSTGRES_URL)
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+
+def test_pgbouncer_mode_disables_prepared_statement_caches():
+    with mock.patch.object(settings, "DATABASE_PGBOUNCER_MODE", True):
+        connect_args = engine_options(POSTGRES_URL)["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+    assert "server_settings" not in connect_args
+
+
+async def test_pool_records_waits_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    waits, timeouts = pool_wait_seconds.count, pool_timeouts.value
+    try:
+        async with engine.connect():
+            assert pool_wait_seconds.count == waits + 1
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    assert pool_timeouts.value == timeouts + 1
+    assert pool_wait_seconds.count == waits + 2
+
+
+metadata = MetaData()
+servers = Table(
+    "servers",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String),
+)
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    engines = {}
+    for name in ("primary", "replica-1", "replica-2"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(servers).values(name=name))
+        engines[name] = engine
+    yield engines
+    for engine in engines.values():
+        await engine.dispose()
+
+
+def _session_factory(engines: dict) -> tuple[sessionmaker, ReplicaSet]:
+    replicas = ReplicaSet([engines["replica-1"], engines["replica-2"]], retry_after=60)
+    factory = sessionmaker(
+        bind=engines["primary"],
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        info={"replicas": replicas},
+    )
+    return factory, replicas
+
+
+async def _server(session: AsyncSession, read_replica: bool = True) -> str:
+    result = await session.execute(
+        select(servers.c.name)
+        .order_by(servers.c.id)
+        .execution_options(read_replica=read_replica)
+    )
+    return result.scalars().first()
+
+
+async def test_marked_reads_round_robin_over_replicas(engines):
+    factory, _ = _session_factory(engines)
+    async with factory() as session:
+        assert await _server(session, read_replica=False) == "primary"
+        assert {await _server(session), await _server(session)} == {
+            "replica-1",
+            "replica-2",
+        }
+
+
+async def test_session_reads_own_writes_from_primary(engines):
+    factory, _ = _session_factory(engines)
+    async with factory() as session:
+        await session.execute(insert(servers).values(name="new"))
+        await session.commit()
+        assert await _server(session) == "primary"
+
+    async with factory() as session:
+        assert await _server(session) != "primary"
+
+
+async def test_failed_replicas_are_skipped(engines):
+    factory, replicas = _session_factory(engines)
+    replicas.mark_down(engines["replica-1"])
+    async with factory() as session:
+        assert {await _server(session), await _server(session)} == {"replica-2"}
+
+    replicas.mark_down(engines["replica-2"])
+    assert replicas.healthy() == []
+    async with factory() as session:
+        assert await _server(session) == "primary"
+
+
+async def test_connection_failure_marks_replica_down(engines, tmp_path):
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir.db")
+    replicas = ReplicaSet([broken], retry_after=60)
+    factory = sessionmaker(
+        bind=engines["primary"],
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        info={"replicas": replicas},
+    )
+    async with factory() as session:
+        with pytest.raises(OperationalError):
+            await _server(session)
+    assert replicas.healthy() == []
+
+    async with factory() as session:
+        assert await _server(session) == "primary"
+    await broken.dispose()
@@ -0,0 +1,53 @@
+from metrics.registry import MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    in_flight = registry.gauge("in_flight", "In-flight requests")
+    registry.gauge("queued", "Queued calls", callback=lambda: 7)
+
+    requests.labels(route="auth").inc()
+    requests.labels(route="auth").inc(2)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    output = registry.render()
+
+    assert "# TYPE requests_total counter" in output
+    assert 'requests_total{route="auth"} 3.0' in output
+    assert "in_flight 1.0" in output
+    assert "queued 7.0" in output
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value)
+
+    output = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{le="1.0"} 3' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in output
+    assert "latency_seconds_count 4" in output
+    assert latency.sum == 6.05
+
+
+def test_registry_returns_existing_metric():
+    registry = MetricsRegistry()
+
+    assert registry.counter("hits", "Hits") is registry.counter("hits", "Hits")
+
+
+def test_gauge_callback_follows_latest_registration():
+    registry = MetricsRegistry()
+    first = registry.gauge("cache_size", "Cached entries", callback=lambda: 1)
+    second = registry.gauge("cache_size", "Cached entries", callback=lambda: 2)
+
+    assert first is second
+    assert second.value == 2
+    assert "cache_size 2.0" in registry.render()
@@ -1,8 +1,10 @@
+import asyncio
 import random
 
 import pytest
 from faker import Faker
 
+from security.hasher import HasherSaturatedError, PasswordHasher, rejections
 from security.password import get_password_hash, verify_password
 
 
@@ -24,3 +26,30 @@ def test_get_password_hash():
     assert hashed_password != password
     assert verify_password(password, hashed_password)
     assert not verify_password(str(faker.password()), hashed_password)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=1, max_concurrency=1, queue_timeout=0.05)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_hasher_runs_bcrypt_in_worker_processes(hasher: PasswordHasher):
+    hashed_password = await hasher.hash("correct horse")
+
+    assert await hasher.verify("correct horse", hashed_password)
+    assert not await hasher.verify("battery staple", hashed_password)
+    with pytest.raises(ValueError, match="Password must be a string or bytes"):
+        await hasher.hash(1234)
+
+
+async def test_hasher_rejects_callers_past_the_queue_timeout(hasher: PasswordHasher):
+    rejected = rejections.value
+    running = asyncio.create_task(hasher.hash("first"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HasherSaturatedError):
+        await hasher.hash("second")
+    assert rejections.value == rejected + 1
+    assert await running
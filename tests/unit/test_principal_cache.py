@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime, timezone
+from unittest import mock
+
+from auth.principals import Principal, PrincipalCache
+
+
+def _principal(**overrides) -> Principal:
+    now = datetime.now(tz=timezone.utc)
+    fields = {
+        "id": uuid.uuid4(),
+        "email": "a@example.com",
+        "username": "a",
+        "is_admin": False,
+        "created_at": now,
+        "updated_at": now,
+        "last_login_at": None,
+    }
+    return Principal(**(fields | overrides))
+
+
+def test_principal_expires_after_ttl():
+    cache = PrincipalCache(max_size=10, ttl=30)
+    principal = _principal()
+
+    with mock.patch("auth.principals.time.monotonic", return_value=1000.0):
+        cache.set(principal)
+    with mock.patch("auth.principals.time.monotonic", return_value=1029.0):
+        assert cache.get(principal.id) is principal
+    with mock.patch("auth.principals.time.monotonic", return_value=1030.0):
+        assert cache.get(principal.id) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_principal_is_evicted():
+    cache = PrincipalCache(max_size=2, ttl=30)
+    first, second, third = _principal(), _principal(), _principal()
+    cache.set(first)
+    cache.set(second)
+    cache.get(first.id)
+    cache.set(third)
+
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) is first
+    assert cache.get(third.id) is third
+
+
+def test_invalidate_drops_the_entry():
+    cache = PrincipalCache(max_size=10, ttl=30)
+    principal = _principal()
+    cache.set(principal)
+    cache.invalidate(principal.id)
+    cache.invalidate(uuid.uuid4())
+
+    assert cache.get(principal.id) is None
+
+
+def test_invalidate_drops_entries_under_other_keys():
+    cache = PrincipalCache(max_size=10, ttl=30)
+    principal, other = _principal(), _principal()
+    cache.set(principal)
+    cache.set(principal, key=("api_key", "digest"))
+    cache.set(other, key=("api_key", "other"))
+
+    cache.invalidate(principal.id)
+
+    assert cache.get(principal.id) is None
+    assert cache.get(("api_key", "digest")) is None
+    assert cache.get(("api_key", "other")) is other
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from storage.ranges import (
+    RangeNotSatisfiableError,
+    http_date,
+    if_range_matches,
+    parse_range_header,
+)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", [(0, 99)]),
+        ("bytes=900-", [(900, 999)]),
+        ("bytes=-100", [(900, 999)]),
+        ("bytes=-5000", [(0, 999)]),
+        ("bytes=950-2000", [(950, 999)]),
+        ("bytes=0-9, 20-29", [(0, 9), (20, 29)]),
+        ("bytes=20-29,0-9", [(0, 9), (20, 29)]),
+        ("bytes=0-9,5-19,20-29", [(0, 29)]),
+        ("bytes=0-9,1000-1100", [(0, 9)]),
+    ],
+)
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, size=1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        None,
+        "",
+        "items=0-9",
+        "bytes=",
+        "bytes=9-0",
+        "bytes=a-9",
+        "bytes=-",
+        "bytes=1--5",
+    ],
+)
+def test_invalid_range_header_is_ignored(header):
+    assert parse_range_header(header, size=1000) is None
+
+
+def test_too_many_ranges_are_ignored():
+    header = "bytes=" + ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(20))
+    assert parse_range_header(header, size=1000, max_ranges=16) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0", "bytes=2000-3000"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range_header(header, size=1000)
+
+
+def test_if_range():
+    last_modified = datetime(2024, 5, 1, 12, 30, 15, 500, tzinfo=timezone.utc)
+
+    assert if_range_matches(None, '"abc"', last_modified)
+    assert if_range_matches('"abc"', '"abc"', last_modified)
+    assert not if_range_matches('"def"', '"abc"', last_modified)
+    assert not if_range_matches('W/"abc"', '"abc"', last_modified)
+    assert if_range_matches(http_date(last_modified), '"abc"', last_modified)
+    assert not if_range_matches("Wed, 01 May 2024 12:00:00 GMT", '"abc"', last_modified)
+    assert not if_range_matches("not a date", '"abc"', last_modified)
@@ -0,0 +1,82 @@
+import math
+from unittest import mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ratelimit.base import RateLimit
+from ratelimit.database import DatabaseRateLimitStore
+from ratelimit.memory import InMemoryRateLimitStore
+from tests.conftest import AsyncSessionLocal
+
+
+def test_parse_rate_limit():
+    assert RateLimit.parse("10/minute") == RateLimit(10, 60)
+    assert RateLimit.parse("5/seconds") == RateLimit(5, 1)
+    for value in ["10", "ten/minute", "10/fortnight", "0/minute"]:
+        with pytest.raises(ValueError):
+            RateLimit.parse(value)
+
+
+async def _hits(store, rate: RateLimit, now: float, count: int, clock: str):
+    with mock.patch(clock, return_value=now):
+        return [await store.hit("client", rate) for _ in range(count)]
+
+
+STORES = [
+    (
+        lambda: InMemoryRateLimitStore(max_size=10),
+        "ratelimit.memory.time.monotonic",
+    ),
+    (
+        lambda: DatabaseRateLimitStore(AsyncSessionLocal),
+        "ratelimit.database.time.time",
+    ),
+]
+
+
+@pytest.mark.parametrize("make_store, clock", STORES)
+async def test_bucket_allows_a_burst_then_refills(
+    db: AsyncSession, make_store, clock: str
+):
+    store = make_store()
+    rate = RateLimit(3, 1)
+
+    decisions = await _hits(store, rate, 1000.0, 4, clock)
+    assert [decision.allowed for decision in decisions] == [True, True, True, False]
+    assert math.isclose(decisions[-1].retry_after, 1 / 3)
+
+    # One request is earned back every third of a second.
+    decisions = await _hits(store, rate, 1000.0 + 1 / 3, 2, clock)
+    assert [decision.allowed for decision in decisions] == [True, False]
+    decisions = await _hits(store, rate, 1010.0, 3, clock)
+    assert all(decision.allowed for decision in decisions)
+
+
+@pytest.mark.parametrize("make_store, clock", STORES)
+async def test_denied_request_charges_no_bucket(
+    db: AsyncSession, make_store, clock: str
+):
+    store = make_store()
+    tight, broad = RateLimit(1, 60), RateLimit(2, 60)
+
+    with mock.patch(clock, return_value=1000.0):
+        decisions = await store.hit_all([("ip", broad), ("route", tight)])
+        assert [decision.allowed for decision in decisions] == [True, True]
+        decisions = await store.hit_all([("ip", broad), ("route", tight)])
+        assert [decision.allowed for decision in decisions] == [True, False]
+
+        # The IP bucket still has its second request.
+        assert (await store.hit("ip", broad)).allowed
+        assert not (await store.hit("ip", broad)).allowed
+
+
+async def test_memory_store_forgets_least_recently_used_keys():
+    store = InMemoryRateLimitStore(max_size=2)
+    rate = RateLimit(1, 60)
+    for key in ["a", "b", "c"]:
+        assert (await store.hit(key, rate)).allowed
+
+    assert len(store) == 2
+    assert not (await store.hit("c", rate)).allowed
+    assert (await store.hit("a", rate)).allowed
@@ -0,0 +1,75 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.revocation import BloomFilter, RevocationList, jti_key, user_key
+from models.mixins import utcnow
+from repositories.revoked_token import RevokedTokenRepository
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    members = [uuid.uuid4().hex for _ in range(1000)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+async def test_revocation_list_syncs_new_revocations(db: AsyncSession):
+    revocations = RevocationList(
+        capacity=100, error_rate=0.01, refresh_interval=5, rebuild_interval=600
+    )
+    repo = RevokedTokenRepository(db)
+    expires_at = utcnow() + timedelta(minutes=15)
+    user_id = uuid.uuid4()
+
+    with mock.patch("auth.revocation.time.monotonic", return_value=1000.0):
+        assert not await revocations.is_revoked(db, user_id, "a", None)
+    await repo.revoke(jti_key("a"), expires_at)
+    await db.commit()
+
+    # Other processes' revocations show up once the filter refreshes.
+    with mock.patch("auth.revocation.time.monotonic", return_value=1004.0):
+        assert not await revocations.is_revoked(db, user_id, "a", None)
+    with mock.patch("auth.revocation.time.monotonic", return_value=1005.0):
+        assert await revocations.is_revoked(db, user_id, "a", None)
+        assert not await revocations.is_revoked(db, user_id, "b", None)
+
+
+async def test_user_revocation_covers_tokens_issued_before_it(db: AsyncSession):
+    revocations = RevocationList(
+        capacity=100, error_rate=0.01, refresh_interval=5, rebuild_interval=600
+    )
+    user_id = uuid.uuid4()
+    revoked = await RevokedTokenRepository(db).revoke(
+        user_key(user_id), utcnow() + timedelta(minutes=15)
+    )
+    await db.commit()
+    revoked_at = revoked.revoked_at.timestamp()
+
+    assert await revocations.is_revoked(db, user_id, "a", revoked_at - 1)
+    assert not await revocations.is_revoked(db, user_id, "a", revoked_at + 1)
+    assert not await revocations.is_revoked(db, uuid.uuid4(), "a", revoked_at - 1)
+
+
+async def test_rebuild_keeps_revocations_added_while_it_reads(db: AsyncSession):
+    revocations = RevocationList(
+        capacity=100, error_rate=0.01, refresh_interval=5, rebuild_interval=600
+    )
+    get_keys = RevokedTokenRepository.get_keys
+
+    async def racing_get_keys(repo, *args, **kwargs):
+        rows = await get_keys(repo, *args, **kwargs)
+        # A revocation this process records after the rebuild's read.
+        revocations.add(jti_key("a"))
+        return rows
+
+    with mock.patch.object(RevokedTokenRepository, "get_keys", racing_get_keys):
+        await revocations.sync(db)
+
+    assert jti_key("a") in revocations._filter
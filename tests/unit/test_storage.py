@@ -0,0 +1,168 @@
+import io
+import time
+from unittest import mock
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+from faker import Faker
+
+from storage.base import SignedURLStorageBackend
+from storage.local import LocalStorageBackend
+from storage.memory import InMemoryStorageBackend
+
+faker = Faker()
+
+
+@pytest.fixture(params=["memory", "local"])
+def backend(request, tmp_path) -> SignedURLStorageBackend:
+    if request.param == "local":
+        return LocalStorageBackend(
+            root=str(tmp_path), signing_key="secret", base_url="http://test/storage"
+        )
+    return InMemoryStorageBackend(signing_key="secret", base_url="http://test/storage")
+
+
+def _signed_params(url: str) -> tuple[str, dict]:
+    parsed = urlparse(url)
+    name = unquote(parsed.path.removeprefix("/storage/"))
+    params = {key: value[0] for key, value in parse_qs(parsed.query).items()}
+    return name, params
+
+
+def test_upload_read_delete(backend: SignedURLStorageBackend):
+    name = f"{faker.uuid4()}-{faker.file_name()}"
+    data = faker.binary(length=4096)
+
+    backend.upload(name, io.BytesIO(data), content_type="application/octet-stream")
+
+    assert backend.exists(name)
+    with backend.open_read(name) as stream:
+        assert stream.read() == data
+
+    backend.delete(name)
+    assert not backend.exists(name)
+
+    with pytest.raises(FileNotFoundError):
+        backend.open_read(name)
+
+    with pytest.raises(FileNotFoundError):
+        backend.delete(name)
+
+
+def test_delete_many(backend: SignedURLStorageBackend):
+    names = [f"{faker.uuid4()}.bin" for _ in range(3)]
+    for name in names[:2]:
+        backend.upload(name, io.BytesIO(b"data"))
+    delete = backend.delete
+
+    def flaky_delete(name):
+        if name == names[1]:
+            raise ConnectionError("unavailable")
+        delete(name)
+
+    with mock.patch.object(backend, "delete", side_effect=flaky_delete):
+        failed = backend.delete_many(names)
+
+    # Missing objects count as deleted; failures are reported for retry.
+    assert failed == [names[1]]
+    assert not backend.exists(names[0])
+    assert backend.exists(names[1])
+
+
+def test_signed_url_round_trip(backend: SignedURLStorageBackend):
+    name = "some user/file name.txt"
+    url = backend.generate_signed_url(name, expiration=60, content_type="text/plain")
+
+    object_name, params = _signed_params(url)
+    assert object_name == name
+    assert backend.verify_signature(
+        name=object_name,
+        expires=int(params["expires"]),
+        disposition=params["disposition"],
+        content_type=params["content_type"],
+        signature=params["signature"],
+    )
+    assert not backend.verify_signature(
+        name=object_name,
+        expires=int(params["expires"]),
+        disposition="attachment",
+        content_type=params["content_type"],
+        signature=params["signature"],
+    )
+
+
+def test_signed_url_expired(backend: SignedURLStorageBackend):
+    url = backend.generate_signed_url("file.txt", expiration=-1)
+    name, params = _signed_params(url)
+
+    assert not backend.verify_signature(
+        name=name,
+        expires=int(params["expires"]),
+        disposition=params["disposition"],
+        content_type=None,
+        signature=params["signature"],
+    )
+    assert int(params["expires"]) < time.time()
+
+
+def test_upload_url_is_bound_to_put(backend: SignedURLStorageBackend):
+    url, headers = backend.generate_upload_url(
+        "blobs/abc", expiration=60, size=10, content_type="text/plain"
+    )
+    name, params = _signed_params(url)
+
+    assert headers == {"Content-Type": "text/plain"}
+    signature = dict(
+        name=name,
+        expires=int(params["expires"]),
+        disposition="",
+        content_type=params["content_type"],
+        signature=params["signature"],
+    )
+    assert backend.verify_signature(**signature, method="PUT")
+    assert not backend.verify_signature(**signature)
+
+    download_url = backend.generate_signed_url(name, expiration=60)
+    _, params = _signed_params(download_url)
+    assert not backend.verify_signature(
+        name=name,
+        expires=int(params["expires"]),
+        disposition=params["disposition"],
+        content_type=None,
+        signature=params["signature"],
+        method="PUT",
+    )
+
+
+def test_checksum(backend: SignedURLStorageBackend):
+    data = faker.binary(length=2048)
+    backend.upload("file.bin", io.BytesIO(data))
+
+    checksums = backend.checksum("file.bin")
+    assert checksums.size == len(data)
+    assert checksums.sha256 is not None
+    with pytest.raises(FileNotFoundError):
+        backend.checksum("missing.bin")
+
+
+def test_create_only_write_never_replaces(backend: SignedURLStorageBackend):
+    first = backend.open_write("file.bin", create_only=True)
+    second = backend.open_write("file.bin", create_only=True)
+    writer = second.__enter__()
+    writer.write(b"second")
+    with first as writer:
+        writer.write(b"first")
+
+    with pytest.raises(FileExistsError):
+        second.__exit__(None, None, None)
+    with backend.open_read("file.bin") as stream:
+        assert stream.read() == b"first"
+
+
+def test_local_rejects_path_traversal(tmp_path):
+    backend = LocalStorageBackend(
+        root=str(tmp_path / "root"), signing_key="secret", base_url="http://test"
+    )
+
+    with pytest.raises(ValueError):
+        backend.upload("../escape.txt", io.BytesIO(b"data"))
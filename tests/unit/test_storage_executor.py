@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from storage.executor import StorageExecutor, active_calls, queue_depth
+from storage.memory import InMemoryStorageBackend
+
+
+@pytest.fixture
+def backend() -> InMemoryStorageBackend:
+    return InMemoryStorageBackend(signing_key="secret", base_url="http://test")
+
+
+async def test_run_happens_off_the_event_loop():
+    executor = StorageExecutor(max_workers=2)
+    loop_thread = threading.get_ident()
+
+    worker_thread = await executor.run(threading.get_ident)
+
+    assert worker_thread != loop_thread
+    assert queue_depth.value == 0
+    assert active_calls.value == 0
+
+
+async def test_run_is_bounded_by_max_workers():
+    executor = StorageExecutor(max_workers=2)
+    release = threading.Event()
+    running = []
+
+    def block():
+        running.append(1)
+        release.wait(timeout=5)
+
+    tasks = [asyncio.create_task(executor.run(block)) for _ in range(5)]
+    while len(running) < 2:
+        await asyncio.sleep(0.01)
+
+    assert len(running) == 2
+    assert queue_depth.value == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert queue_depth.value == 0
+
+
+async def test_cancelled_queued_call_leaves_the_queue():
+    executor = StorageExecutor(max_workers=1)
+    release = threading.Event()
+    blocked = asyncio.create_task(executor.run(release.wait, 5))
+    queued = asyncio.create_task(executor.run(time.sleep, 0))
+    while queue_depth.value != 1:
+        await asyncio.sleep(0.01)
+
+    queued.cancel()
+    await asyncio.sleep(0.01)
+    assert queue_depth.value == 0
+
+    release.set()
+    await blocked
+    assert queue_depth.value == 0
+    executor.shutdown()
+
+
+async def test_open_write_commits_buffered_data(backend: InMemoryStorageBackend):
+    executor = StorageExecutor(max_workers=2)
+
+    async with executor.open_write(backend, "object", buffer_size=4) as writer:
+        for piece in (b"ab", b"cd", b"e"):
+            await writer.write(piece)
+
+    with backend.open_read("object") as stream:
+        assert stream.read() == b"abcde"
+
+
+async def test_open_write_discards_on_error(backend: InMemoryStorageBackend):
+    executor = StorageExecutor(max_workers=2)
+
+    with pytest.raises(RuntimeError):
+        async with executor.open_write(backend, "object") as writer:
+            await writer.write(b"partial")
+            raise RuntimeError("client went away")
+
+    assert not backend.exists("object")
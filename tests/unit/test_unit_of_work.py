@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from repositories.unit_of_work import UnitOfWork, on_commit, transactional
+
+metadata = MetaData()
+notes = Table(
+    "notes",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("text", String),
+)
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def _texts(engine) -> list[str]:
+    async with AsyncSession(engine) as session:
+        result = await session.execute(select(notes.c.text).order_by(notes.c.id))
+        return result.scalars().all()
+
+
+class NoteService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @transactional
+    async def add(self, text: str):
+        await self.db.execute(insert(notes).values(text=text))
+        if text == "fail":
+            raise ValueError(text)
+
+    @transactional
+    async def add_many(self, texts: list[str]):
+        for text in texts:
+            await self.add(text)
+
+
+async def test_nested_units_commit_once(engine):
+    async with AsyncSession(engine) as session:
+        commits = []
+        original_commit = session.commit
+
+        async def commit():
+            commits.append(True)
+            await original_commit()
+
+        session.commit = commit
+        await NoteService(session).add_many(["a", "b"])
+
+    assert commits == [True]
+    assert await _texts(engine) == ["a", "b"]
+
+
+async def test_failure_rolls_back_the_whole_unit(engine):
+    async with AsyncSession(engine) as session:
+        with pytest.raises(ValueError):
+            await NoteService(session).add_many(["a", "fail"])
+
+        # The session is usable again afterwards.
+        await NoteService(session).add("b")
+
+    assert await _texts(engine) == ["b"]
+
+
+async def test_unit_of_work_commits_on_exit(engine):
+    async with AsyncSession(engine) as session:
+        async with UnitOfWork(session):
+            await session.execute(insert(notes).values(text="a"))
+            assert await _texts(engine) == []
+
+    assert await _texts(engine) == ["a"]
+
+
+async def test_on_commit_runs_only_after_commit(engine):
+    calls = []
+    async with AsyncSession(engine) as session:
+        async with UnitOfWork(session):
+            on_commit(session, lambda: calls.append(len(calls)))
+            async with UnitOfWork(session):
+                on_commit(session, lambda: calls.append(len(calls)))
+            assert calls == []
+        assert calls == [0, 1]
+
+        with pytest.raises(ValueError):
+            async with UnitOfWork(session):
+                on_commit(session, lambda: calls.append("rolled back"))
+                raise ValueError
+        await NoteService(session).add("a")
+
+    assert calls == [0, 1]
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from storage.base import SignedURLRequest
+from storage.memory import InMemoryStorageBackend
+from storage.url_cache import SignedURLCache, cache_hits, cache_misses
+
+
+def test_cached_url_is_reused_until_reuse_fraction_elapses():
+    cache = SignedURLCache(max_size=10, reuse_fraction=0.5)
+    request = SignedURLRequest("a.txt", content_type="text/plain")
+
+    with mock.patch("storage.url_cache.time.monotonic", return_value=1000.0):
+        assert cache.get(request) is None
+        cache.set(request, "https://signed/a", expiration=100)
+
+    with mock.patch("storage.url_cache.time.monotonic", return_value=1049.0):
+        assert cache.get(request) == "https://signed/a"
+
+    with mock.patch("storage.url_cache.time.monotonic", return_value=1050.0):
+        assert cache.get(request) is None
+    assert len(cache) == 0
+
+
+def test_key_includes_disposition_and_content_type():
+    cache = SignedURLCache(max_size=10, reuse_fraction=0.5)
+    cache.set(SignedURLRequest("a.txt"), "https://signed/inline", expiration=100)
+
+    assert cache.get(SignedURLRequest("a.txt", disposition="attachment")) is None
+    assert cache.get(SignedURLRequest("a.txt", content_type="text/plain")) is None
+    assert cache.get(SignedURLRequest("a.txt")) == "https://signed/inline"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SignedURLCache(max_size=2, reuse_fraction=0.5)
+    a, b, c = (SignedURLRequest(name) for name in ("a", "b", "c"))
+    cache.set(a, "url-a", expiration=100)
+    cache.set(b, "url-b", expiration=100)
+
+    assert cache.get(a) == "url-a"
+    cache.set(c, "url-c", expiration=100)
+
+    assert cache.get(b) is None
+    assert cache.get(a) == "url-a"
+    assert cache.get(c) == "url-c"
+
+
+def test_hits_and_misses_are_counted():
+    cache = SignedURLCache(max_size=10, reuse_fraction=0.5)
+    request = SignedURLRequest("counted")
+    hits, misses = cache_hits.value, cache_misses.value
+
+    cache.get(request)
+    cache.set(request, "url", expiration=100)
+    cache.get(request)
+
+    assert cache_misses.value == misses + 1
+    assert cache_hits.value == hits + 1
+
+
+def test_generate_signed_urls_signs_every_request():
+    backend = InMemoryStorageBackend(signing_key="secret", base_url="http://test")
+    requests = [
+        SignedURLRequest("a.txt", content_type="text/plain"),
+        SignedURLRequest("b.bin", disposition="attachment"),
+    ]
+
+    urls = backend.generate_signed_urls(requests, expiration=60)
+
+    assert len(urls) == 2
+    assert urls[0].startswith("http://test/a.txt?")
+    assert "content_type=text%2Fplain" in urls[0]
+    assert "disposition=attachment" in urls[1]
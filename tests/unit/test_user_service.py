@@ -1,9 +1,11 @@
 import uuid
+from unittest import mock
 
 import pytest
 from faker import Faker
-from fastapi import HTTPException
+from fastapi import HTTPException, status
 
+from security.hasher import HasherSaturatedError
 from services.user import UserService
 from tests.common import get_random_user
 
@@ -172,3 +174,19 @@ async def test_change_password_wrong_password(user_service: UserService):
         await user_service.change_password(
             user=user, old_password=faker.password(), new_password=new_password
         )
+
+
+async def test_login_when_hashing_is_saturated(user_service: UserService):
+    new_user = get_random_user()
+    await user_service.register(
+        username=new_user.username, email=new_user.email, password=new_user.password
+    )
+
+    with mock.patch.object(
+        user_service.hasher, "verify", side_effect=HasherSaturatedError
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            await user_service.login(email=new_user.email, password=new_user.password)
+
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.headers == {"Retry-After": "1"}
@@ -0,0 +1,23 @@
+import time
+import uuid
+
+from models.mixins import uuid7
+
+
+def test_uuid7_layout():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after + 1
+
+
+def test_uuid7_strictly_increasing():
+    values = [uuid7() for _ in range(10_000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    # The hex form the SQLite tests store sorts the same way.
+    assert [value.hex for value in values] == sorted(value.hex for value in values)